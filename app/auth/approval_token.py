@@ -0,0 +1,149 @@
+"""
+HMAC 서명 승인 토큰
+
+승인 대기 ID와 만료 시각만 담은 짧은 토큰 (DB에 저장하지 않음).
+형식: base64url(버전 1바이트 + 승인 대기 ID 8바이트 + 만료 unix 시각 4바이트) "." base64url(HMAC-SHA256 앞 16바이트)
+검증에 성공한 토큰은 제한된 크기의 LRU에 보관해 이메일 발송 직후 몰리는 승인 페이지 요청의 재검증을 생략한다.
+
+이전에 이메일로 발송된 JWT 승인 링크(유효기간 7일)는 APPROVAL_LEGACY_JWT=true(기본값)인 동안
+jwt_handler.verify_approval_token으로 계속 검증한다. 배포 후 7일이 지나면 false로 꺼도 된다.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import struct
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Tuple
+
+from app.auth.jwt_handler import SECRET_KEY, verify_approval_token
+from app.services.metrics import metrics
+
+
+TOKEN_VERSION = 1
+_PAYLOAD = struct.Struct(">BQI")
+_SIGNATURE_BYTES = 16
+
+# 서명 키 (JWT 키에서 용도별로 분리)
+_SIGNING_KEY = hmac.new(SECRET_KEY.encode("utf-8"), b"kb-approval-token", hashlib.sha256).digest()
+
+APPROVAL_TOKEN_CACHE_SIZE = int(os.getenv("APPROVAL_TOKEN_CACHE_SIZE", "4096"))
+# 기존 JWT 승인/수정 링크 허용 (전환 기간)
+APPROVAL_LEGACY_JWT = os.getenv("APPROVAL_LEGACY_JWT", "true").lower() == "true"
+
+APPROVAL_TOKEN_VERIFY = metrics.counter("approval_token_verify_total", "승인 토큰 검증 수 (cache_hit/verified/invalid/expired/legacy_jwt)")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_SIGNING_KEY, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def create_signed_token(pending_approval_id: int, expires_at: datetime) -> str:
+    """
+    승인/수정 공용 토큰 생성
+
+    Args:
+        pending_approval_id: 승인 대기 ID
+        expires_at: 만료 시각 (UTC, PendingApproval.token_expires_at)
+    """
+    expires = int((expires_at - datetime(1970, 1, 1)).total_seconds())
+    payload = _PAYLOAD.pack(TOKEN_VERSION, int(pending_approval_id), expires)
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+class ApprovalTokenVerifier:
+    """서명 검증 + 검증된 토큰 LRU 캐시"""
+
+    def __init__(self, cache_size: int = APPROVAL_TOKEN_CACHE_SIZE, legacy_jwt: bool = APPROVAL_LEGACY_JWT):
+        self.cache_size = cache_size
+        self.legacy_jwt = legacy_jwt
+        self._cache: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+
+    def verify(self, token: str) -> Dict:
+        """
+        토큰 검증
+
+        Returns:
+            Dict: {"pending_approval_id", "exp"} (유효한 경우)
+                  {"error": 메시지} (유효하지 않은 경우, verify_approval_token과 같은 형태)
+        """
+        if not token or not isinstance(token, str):
+            return {"error": "토큰이 제공되지 않았습니다."}
+
+        if token.count(".") == 2:
+            return self._verify_legacy_jwt(token)
+
+        cached = self._cache.get(token)
+        if cached is not None:
+            self._cache.move_to_end(token)
+            APPROVAL_TOKEN_VERIFY.inc(result="cache_hit")
+            pending_approval_id, expires = cached
+        else:
+            parsed = self._verify_signature(token)
+            if "error" in parsed:
+                APPROVAL_TOKEN_VERIFY.inc(result="invalid")
+                return parsed
+            APPROVAL_TOKEN_VERIFY.inc(result="verified")
+            pending_approval_id, expires = parsed["pending_approval_id"], parsed["exp"]
+            self._remember(token, pending_approval_id, expires)
+
+        if expires < (datetime.utcnow() - datetime(1970, 1, 1)).total_seconds():
+            APPROVAL_TOKEN_VERIFY.inc(result="expired")
+            return {"error": "토큰이 만료되었습니다."}
+
+        return {"pending_approval_id": pending_approval_id, "exp": expires}
+
+    def _verify_legacy_jwt(self, token: str) -> Dict:
+        """이전 버전이 발송한 JWT 링크 (만료는 JWT exp로 확인)"""
+        if not self.legacy_jwt:
+            APPROVAL_TOKEN_VERIFY.inc(result="invalid")
+            return {"error": "더 이상 지원하지 않는 토큰입니다."}
+
+        payload = verify_approval_token(token)
+        if "error" in payload:
+            APPROVAL_TOKEN_VERIFY.inc(result="invalid")
+            return payload
+        APPROVAL_TOKEN_VERIFY.inc(result="legacy_jwt")
+        return {"pending_approval_id": payload["pending_approval_id"], "exp": payload["exp"]}
+
+    def _verify_signature(self, token: str) -> Dict:
+        payload_part, _, signature_part = token.partition(".")
+        try:
+            payload = _b64decode(payload_part)
+            signature = _b64decode(signature_part)
+        except (binascii.Error, ValueError):
+            return {"error": "잘못된 토큰 형식입니다."}
+
+        if len(payload) != _PAYLOAD.size or len(signature) != _SIGNATURE_BYTES:
+            return {"error": "잘못된 토큰 형식입니다."}
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return {"error": "토큰 서명이 유효하지 않습니다."}
+
+        version, pending_approval_id, expires = _PAYLOAD.unpack(payload)
+        if version != TOKEN_VERSION:
+            return {"error": "지원하지 않는 토큰 버전입니다."}
+        return {"pending_approval_id": pending_approval_id, "exp": expires}
+
+    def _remember(self, token: str, pending_approval_id: int, expires: int) -> None:
+        self._cache[token] = (pending_approval_id, expires)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+# 전역 인스턴스
+approval_token_verifier = ApprovalTokenVerifier()
+
+
+def verify_signed_token(token: str) -> Dict:
+    """전역 검증기로 승인 토큰 검증"""
+    return approval_token_verifier.verify(token)
@@ -3,6 +3,7 @@ PostgreSQL 데이터베이스 연결
 """
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.db.models import Base
 
@@ -13,15 +14,44 @@ DB_NAME = os.getenv("DB_NAME", "ci_agent")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 
+# 비동기 엔진 커넥션 풀 설정 (PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+USE_SQLITE = os.getenv("USE_SQLITE", "false").lower() == "true"
 
 # SQLite fallback for local development
-if os.getenv("USE_SQLITE", "false").lower() == "true":
+if USE_SQLITE:
     DATABASE_URL = "sqlite:///./data/ci_agent.db"
+    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./data/ci_agent.db"
 
 engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+if USE_SQLITE:
+    # SQLite는 파일 잠금으로 쓰기가 직렬화되므로 풀 크기 조정은 의미가 없다
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE
+    )
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def init_db():
     """데이터베이스 초기화"""
@@ -36,3 +66,8 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """비동기 데이터베이스 세션 가져오기"""
+    async with AsyncSessionLocal() as db:
+        yield db
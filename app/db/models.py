@@ -2,8 +2,8 @@
 PostgreSQL 데이터베이스 모델
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import declarative_base, deferred, relationship
 
 Base = declarative_base()
 
@@ -34,15 +34,33 @@ class KnowledgeBase(Base):
     analysis_history = relationship("AnalysisHistory", back_populates="kb_entry")
 
 
+class LogBlob(Base):
+    """CI 로그 저장소 (내용 해시 기준, 압축 저장 - 같은 로그는 한 번만 저장)"""
+    __tablename__ = "log_blobs"
+    
+    hash = Column(String(64), primary_key=True)  # 원본 로그의 SHA-256
+    codec = Column(String(10), nullable=False)  # zstd, gzip
+    data = deferred(Column(LargeBinary, nullable=False))  # 읽을 때만 로드
+    raw_size = Column(Integer, nullable=False)
+    compressed_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class AnalysisHistory(Base):
     """분석 이력 테이블"""
     __tablename__ = "analysis_history"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ci_log = Column(Text, nullable=False)
+    
+    # CI 로그는 log_blobs 테이블에 압축 저장 (ci_log는 이전 버전 행 호환용)
+    log_hash = Column(String(64), ForeignKey("log_blobs.hash"), nullable=True, index=True)
+    ci_log = deferred(Column(Text, nullable=True))
     context = Column(Text, nullable=True)
     repository = Column(String(200), nullable=True)
     
+    # 정규화된 로그 지문 (동일/템플릿 동일 로그 결과 재사용)
+    log_fingerprint = Column(String(64), nullable=True, index=True)
+    
     # 분석 결과
     error_type = Column(String(50), nullable=True, index=True)
     symptoms = Column(Text, nullable=True)  # JSON 형태
@@ -51,6 +69,13 @@ class AnalysisHistory(Base):
     kb_confidence = Column(Float, nullable=True)
     security_status = Column(String(50), nullable=True)
     
+    # LLM 호출 사용량 (LLM을 직접 호출한 분석만, 재사용/공유 결과는 NULL)
+    llm_tokens_in = Column(Integer, nullable=True)
+    llm_tokens_out = Column(Integer, nullable=True)
+    llm_queue_seconds = Column(Float, nullable=True)
+    llm_ttft_seconds = Column(Float, nullable=True)
+    llm_total_seconds = Column(Float, nullable=True)
+    
     # KB 연결
     kb_entry_id = Column(Integer, ForeignKey("knowledge_base.id"), nullable=True)
     kb_entry = relationship("KnowledgeBase", back_populates="analysis_history")
@@ -81,8 +106,7 @@ class PendingApproval(Base):
     tags = Column(String(512), nullable=True)
     error_type = Column(String(50), nullable=True)
     
-    # 승인 정보
-    token = Column(String(500), unique=True, nullable=False, index=True)
+    # 승인 정보 (토큰은 id + token_expires_at 에서 HMAC으로 계산하므로 저장하지 않음)
     token_expires_at = Column(DateTime, nullable=False)
     
     approved_by = Column(String(100), nullable=True)
@@ -102,3 +126,46 @@ class PendingApproval(Base):
     recipient_email = Column(String(200), nullable=True)
     admin_email = Column(String(200), nullable=True)
 
+
+
+class LLMAnalysisCache(Base):
+    """LLM 분석 캐시 (오류 타입 + 정규화된 증상 지문 → 분석 결과)"""
+    __tablename__ = "llm_analysis_cache"
+    __table_args__ = (UniqueConstraint("error_type", "symptom_fingerprint"),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    error_type = Column(String(50), nullable=False, index=True)
+    symptom_fingerprint = Column(String(64), nullable=False)
+    symptoms = Column(Text, nullable=False)  # JSON 형태 (유사도 검색용)
+    
+    analysis = Column(Text, nullable=False)
+    confidence = Column(Float, nullable=False)
+    
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class AnalysisJob(Base):
+    """비동기 분석 작업 테이블 (POST /analyze/jobs)"""
+    __tablename__ = "analysis_jobs"
+    
+    id = Column(String(36), primary_key=True)  # UUID
+    status = Column(String(20), default="queued", index=True)  # queued, running, succeeded, failed, timeout
+    
+    # 요청/결과 (JSON 형태)
+    request_payload = Column(Text, nullable=False)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    # 분석 이력 연결 (성공 시)
+    analysis_id = Column(Integer, ForeignKey("analysis_history.id"), nullable=True)
+    
+    # 실행 제어
+    deadline_seconds = Column(Integer, nullable=False)
+    attempts = Column(Integer, default=0)
+    
+    # 메타데이터
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
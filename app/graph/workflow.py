@@ -38,6 +38,7 @@ class CIErrorAnalyzer:
     
     def __init__(self):
         ensure_initialized()
+        self._workflow = None
     
     def extract_symptoms_node(self, state: CIWorkflowState) -> Dict:
         """증상 추출 노드"""
@@ -380,6 +381,15 @@ docker build --no-cache .
         workflow.add_edge("generate_analysis", END)
         
         return workflow.compile()
+    
+    def get_workflow(self):
+        """컴파일된 워크플로우 반환 (인스턴스당 한 번만 컴파일)"""
+        if self._workflow is None:
+            self._workflow = self.create_workflow()
+        return self._workflow
+
+
+_default_analyzer: CIErrorAnalyzer | None = None
 
 
 def create_ci_analyzer() -> CIErrorAnalyzer:
@@ -387,10 +397,17 @@ def create_ci_analyzer() -> CIErrorAnalyzer:
     return CIErrorAnalyzer()
 
 
+def get_ci_analyzer() -> CIErrorAnalyzer:
+    """프로세스 공용 CI 분석기 반환 (최초 호출 시 생성)"""
+    global _default_analyzer
+    if _default_analyzer is None:
+        _default_analyzer = create_ci_analyzer()
+    return _default_analyzer
+
+
 def run_analysis(ci_log: str, context: str | None = None, repository: str | None = None) -> Dict:
     """CI 오류 분석 실행"""
-    analyzer = create_ci_analyzer()
-    workflow = analyzer.create_workflow()
+    workflow = get_ci_analyzer().get_workflow()
     
     initial_state = {
         "ci_log": ci_log,
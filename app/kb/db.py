@@ -25,8 +25,14 @@ SEED_JSON = os.path.join(str(Path(__file__).resolve().parents[2]), "data", "seed
 engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# 프로세스 단위 초기화 여부 (create_all + seed 확인은 한 번만 수행)
+_initialized = False
+
 
 def ensure_initialized() -> None:
+    global _initialized
+    if _initialized:
+        return
     Base.metadata.create_all(engine)
     session = SessionLocal()
     try:
@@ -43,6 +49,7 @@ def ensure_initialized() -> None:
                 )
                 session.add(article)
             session.commit()
+        _initialized = True
     finally:
         session.close()
 
@@ -65,38 +72,90 @@ def get_all_documents() -> List[Dict[str, Any]]:
         session.close()
 
 
+class SearchIndex:
+    """
+    KB 검색 인덱스
+
+    문서 목록으로 한 번만 구축하고 검색마다 재사용한다.
+    scikit-learn이 있으면 TF-IDF 행렬을, 없으면 키워드 매칭을 사용한다.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self._vectorizer = None
+        self._matrix = None
+        if not docs:
+            return
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            corpus = [f"{d['title']}\n{d['summary']}\n{d['fix']}\n{d['tags']}" for d in docs]
+            self._vectorizer = TfidfVectorizer(max_features=8000, ngram_range=(1, 2))
+            self._matrix = self._vectorizer.fit_transform(corpus)
+        except ImportError:
+            # scikit-learn 없으면 키워드 매칭으로 대체
+            self._vectorizer = None
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        return self.search_many([query], top_k=top_k)[0]
+
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리를 한 번에 검색 (TF-IDF는 행렬 연산 한 번으로 처리)"""
+        if not self.docs:
+            return [[] for _ in queries]
+        if self._vectorizer is None:
+            return [_simple_keyword_search(self.docs, q, top_k) for q in queries]
+
+        from sklearn.metrics.pairwise import linear_kernel
+
+        q_vecs = self._vectorizer.transform(queries)
+        score_rows = linear_kernel(q_vecs, self._matrix)
+
+        all_results: List[List[Dict[str, Any]]] = []
+        for scores in score_rows:
+            ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)[:top_k]
+            results: List[Dict[str, Any]] = []
+            for idx, score in ranked:
+                d_copy = dict(self.docs[idx])
+                d_copy["score"] = float(score)
+                results.append(d_copy)
+            all_results.append(results)
+        return all_results
+
+
+_index: SearchIndex | None = None
+
+
+def load_index() -> SearchIndex:
+    """KB 문서를 읽어 검색 인덱스를 (재)구축"""
+    global _index
+    _index = SearchIndex(get_all_documents())
+    return _index
+
+
+def get_index() -> SearchIndex:
+    """캐시된 검색 인덱스 반환 (없으면 구축)"""
+    if _index is None:
+        return load_index()
+    return _index
+
+
+def invalidate_index() -> None:
+    """KB 변경 시 인덱스 캐시 무효화"""
+    global _index
+    _index = None
+
+
 def search_kb(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     """
     KB 검색 (TF-IDF 또는 간단한 키워드 매칭)
     """
-    docs = get_all_documents()
-    if not docs:
-        return []
-    
-    try:
-        # TF-IDF 사용 (scikit-learn 있을 때)
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import linear_kernel
+    return get_index().search(query, top_k=top_k)
 
-        corpus = [f"{d['title']}\n{d['summary']}\n{d['fix']}\n{d['tags']}" for d in docs]
-        vectorizer = TfidfVectorizer(max_features=8000, ngram_range=(1, 2))
-        tfidf_matrix = vectorizer.fit_transform(corpus)
-
-        q_vec = vectorizer.transform([query])
-        scores = linear_kernel(q_vec, tfidf_matrix).flatten()
-        ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)[:top_k]
-
-        results: List[Dict[str, Any]] = []
-        for idx, score in ranked:
-            d = docs[idx]
-            d_copy = dict(d)
-            d_copy["score"] = float(score)
-            results.append(d_copy)
-        return results
-    
-    except ImportError:
-        # scikit-learn 없으면 간단한 키워드 매칭으로 대체
-        return _simple_keyword_search(docs, query, top_k)
+
+def search_kb_batch(queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+    """여러 쿼리 KB 검색 (쿼리 순서대로 결과 반환)"""
+    return get_index().search_many(queries, top_k=top_k)
 
 
 def _simple_keyword_search(docs: List[Dict], query: str, top_k: int) -> List[Dict[str, Any]]:
@@ -167,6 +226,7 @@ def add_to_kb(
         )
         session.add(article)
         session.commit()
+        invalidate_index()
         
         return {
             "status": "success",
@@ -223,6 +283,7 @@ def update_kb(
             article.tags = ",".join(tags)
         
         session.commit()
+        invalidate_index()
         
         return {
             "status": "success",
@@ -261,6 +322,7 @@ def delete_from_kb(kb_id: int) -> Dict[str, Any]:
         title = article.title
         session.delete(article)
         session.commit()
+        invalidate_index()
         
         return {
             "status": "success",
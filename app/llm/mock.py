@@ -0,0 +1,198 @@
+"""
+Mock LLM backend (부하 테스트 / 오프라인 벤치마크용)
+
+네트워크 없이 LLM webhook과 provider.py 클라이언트를 대신한다.
+- 같은 프롬프트에는 항상 같은 분석을 반환 (프롬프트 해시 기반)
+- 응답 지연: fixed:<초> / lognormal:<중앙값>,<sigma> / replay:<파일> (기록된 지연을 순서대로 반복)
+- 오류율, 토큰 스트리밍 속도 설정
+- cassette: record 모드는 실제 provider 응답/지연을 JSONL로 기록, replay 모드는 기록된 응답을 재생
+
+mock_llm_server.py가 이 클라이언트로 LLM webhook(/webhook/llm-analyze[/stream])을 흉내 낸다.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.metrics import metrics
+
+
+MOCK_LLM_LATENCY = os.getenv("MOCK_LLM_LATENCY", "fixed:0.5")
+MOCK_LLM_ERROR_RATE = float(os.getenv("MOCK_LLM_ERROR_RATE", "0"))
+# 0이면 토큰 사이 지연 없음
+MOCK_LLM_TOKENS_PER_SECOND = float(os.getenv("MOCK_LLM_TOKENS_PER_SECOND", "50"))
+MOCK_LLM_SEED = int(os.getenv("MOCK_LLM_SEED", "0"))
+MOCK_LLM_CASSETTE = os.getenv("MOCK_LLM_CASSETTE", "")
+MOCK_LLM_CASSETTE_MODE = os.getenv("MOCK_LLM_CASSETTE_MODE", "replay")  # replay, record
+# record 모드에서 실제로 호출할 provider (openai, azure, private)
+MOCK_LLM_RECORD_PROVIDER = os.getenv("MOCK_LLM_RECORD_PROVIDER", "openai")
+
+MOCK_CALLS = metrics.counter("mock_llm_calls_total", "Mock LLM 호출 결과 (ok/error, synthetic/cassette)")
+
+_ERROR_KEYWORDS = ("error", "exception", "fail", "undefined", "missing", "not found", "timeout")
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+class MockLLMError(RuntimeError):
+    """MOCK_LLM_ERROR_RATE에 따라 발생시키는 가짜 LLM 오류"""
+
+
+class LatencyProfile:
+    """응답 지연 분포 (fixed / lognormal / replay)"""
+
+    def __init__(self, kind: str, median: float = 0.0, sigma: float = 0.0, samples: Optional[List[float]] = None):
+        self.kind = kind
+        self.median = median
+        self.sigma = sigma
+        self.samples = samples or []
+        self._next = 0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        """'fixed:0.5', 'lognormal:1.2,0.6', 'replay:timings.json' 파싱"""
+        kind, _, args = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind == "fixed":
+            return cls("fixed", median=float(args or 0))
+        if kind == "lognormal":
+            median, _, sigma = args.partition(",")
+            return cls("lognormal", median=float(median), sigma=float(sigma or 0.5))
+        if kind == "replay":
+            # 파일 없이 replay면 cassette에 기록된 지연만 사용
+            return cls("replay", samples=load_timings(args) if args else [])
+        raise ValueError(f"알 수 없는 지연 프로필: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.median), self.sigma) if self.median > 0 else 0.0
+        if self.kind == "replay" and self.samples:
+            value = self.samples[self._next % len(self.samples)]
+            self._next += 1
+            return value
+        return self.median
+
+
+def load_timings(path: str) -> List[float]:
+    """기록된 지연(초) 목록: JSON 배열 또는 cassette(JSONL)의 latency 필드"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [float(json.loads(line)["latency"]) for line in f if line.strip()]
+        return [float(value) for value in json.load(f)]
+
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def synthetic_analysis(prompt: str) -> str:
+    """프롬프트에서 오류 줄을 뽑아 만든 결정적 분석 (local_llm_server 응답 형식)"""
+    lines = [line.strip(" -*") for line in prompt.splitlines() if line.strip()]
+    symptoms = [line for line in lines if any(k in line.lower() for k in _ERROR_KEYWORDS)][:3]
+    symptom_text = "\n".join(f"- {s}" for s in symptoms) or "- (오류 줄 없음)"
+    return (
+        f"## 🔍 오류 분석\n\n"
+        f"**오류 유형**: mock-{_prompt_key(prompt)[:8]}\n"
+        f"**핵심 증상**:\n{symptom_text}\n\n"
+        f"## 🛠️ 해결책\n\n"
+        f"### 1단계: 오류 메시지 확인\n위 증상이 처음 나타난 빌드 단계와 변경된 파일을 확인합니다.\n\n"
+        f"### 2단계: 의존성/설정 점검\n툴체인 경로, 라이브러리 링크, 빌드 옵션이 이전 성공 빌드와 같은지 비교합니다.\n\n"
+        f"### 3단계: 재현 및 재시도\n클린 빌드로 재현한 뒤 수정 사항을 적용하고 파이프라인을 다시 실행합니다.\n\n"
+        f"**참고**: Mock LLM 응답입니다 (부하 테스트용)."
+    )
+
+
+def split_tokens(text: str) -> List[str]:
+    """스트리밍용 토큰 분할 (단어 + 뒤 공백, 이어 붙이면 원문)"""
+    return _TOKEN_RE.findall(text)
+
+
+@dataclass
+class MockLLMClient:
+    """
+    결정적 Mock LLM 클라이언트 (provider.py LLMClient 프로토콜 + 토큰 스트리밍)
+
+    지연/오류는 seed로 초기화한 난수로 결정하므로 같은 설정과 호출 순서면 같은 결과가 나온다.
+    """
+    latency: LatencyProfile = field(default_factory=lambda: LatencyProfile.parse(MOCK_LLM_LATENCY))
+    error_rate: float = MOCK_LLM_ERROR_RATE
+    tokens_per_second: float = MOCK_LLM_TOKENS_PER_SECOND
+    seed: int = MOCK_LLM_SEED
+    cassette: str = MOCK_LLM_CASSETTE
+    cassette_mode: str = MOCK_LLM_CASSETTE_MODE
+    # record 모드에서 실제로 호출할 클라이언트
+    inner: Any = None
+    _rng: random.Random = field(init=False, repr=False)
+    _recorded: Dict[str, Dict[str, Any]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._recorded = {}
+        if self.cassette and os.path.exists(self.cassette):
+            with open(self.cassette, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._recorded[entry["key"]] = entry
+
+    async def aclose(self) -> None:
+        """record 모드의 실제 provider 연결 정리"""
+        aclose = getattr(self.inner, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    def _recording(self) -> bool:
+        return self.cassette_mode == "record" and self.inner is not None and bool(self.cassette)
+
+    async def _record(self, prompt: str) -> str:
+        """실제 provider를 호출하고 응답/지연을 cassette에 추가"""
+        started = time.monotonic()
+        response = await self.inner.achain(prompt)
+        entry = {"key": _prompt_key(prompt), "response": response, "latency": round(time.monotonic() - started, 4)}
+        self._recorded[entry["key"]] = entry
+        with open(self.cassette, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        MOCK_CALLS.inc(result="ok", source="recorded")
+        return response
+
+    async def _prepare(self, prompt: str):
+        """첫 토큰까지 지연 적용 후 (응답, 출처) 반환 (오류율에 따라 MockLLMError)"""
+        recorded = self._recorded.get(_prompt_key(prompt))
+        delay = self.latency.sample(self._rng)
+        failed = self._rng.random() < self.error_rate
+        if recorded is not None and self.latency.kind == "replay":
+            # replay 프로필이면 해당 응답을 기록할 때의 지연 사용
+            delay = recorded["latency"]
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if failed:
+            MOCK_CALLS.inc(result="error", source="synthetic")
+            raise MockLLMError("mock LLM 오류 (MOCK_LLM_ERROR_RATE)")
+        if recorded is not None:
+            return recorded["response"], "cassette"
+        return synthetic_analysis(prompt), "synthetic"
+
+    async def achain(self, prompt: str) -> str:
+        chunks = []
+        async for token in self.astream(prompt):
+            chunks.append(token)
+        return "".join(chunks)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """토큰 단위 스트리밍 (tokens_per_second 속도)"""
+        if self._recording() and _prompt_key(prompt) not in self._recorded:
+            yield await self._record(prompt)
+            return
+
+        response, source = await self._prepare(prompt)
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for token in split_tokens(response):
+            if interval:
+                await asyncio.sleep(interval)
+            yield token
+        MOCK_CALLS.inc(result="ok", source=source)
@@ -1,30 +1,85 @@
+import asyncio
+import json
+import math
 import os
-from dataclasses import dataclass
-from typing import Protocol
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Optional, Protocol, Set, Tuple
 
-from tenacity import retry, stop_after_attempt, wait_exponential
+from app.llm.mock import MOCK_LLM_CASSETTE_MODE, MOCK_LLM_RECORD_PROVIDER, MockLLMClient
+from app.llm.retry import with_retry
+from app.services.metrics import metrics
 from app.utils.config import load_config, get_azure_config, get_private_llm_config, get_openai_config
 
 
+# 보조 provider (설정하면 get_llm()이 HedgedLLMClient 반환, 예: openai, azure, private)
+LLM_HEDGE_PROVIDER = os.getenv("LLM_HEDGE_PROVIDER", "")
+
+# 주 provider 응답 시간 p95 만큼 기다린 뒤 보조 provider에 요청 (지연 시간 범위 제한)
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1"))
+LLM_HEDGE_MAX_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MAX_DELAY_SECONDS", "10"))
+
+# p95를 믿기 위한 최소 표본 수 (그 전에는 최대 지연 사용)
+HEDGE_MIN_SAMPLES = 20
+
+# get_llm() 메모: (유효 설정 키, 클라이언트) - 설정이 바뀔 때만 새로 생성
+_llm_memo: Optional[Tuple[str, "LLMClient"]] = None
+_llm_memo_lock = threading.Lock()
+
+# 메모에서 교체된 클라이언트는 진행 중인 요청이 끝나도록 잠시 뒤에 닫음
+RETIRED_CLIENT_GRACE_SECONDS = float(os.getenv("LLM_RETIRED_CLIENT_GRACE_SECONDS", "30"))
+_retiring: Set[asyncio.Task] = set()
+
+HEDGE_RESULTS = metrics.counter("llm_hedge_total", "hedged 요청 결과 (hedged 여부, 응답한 provider)")
+HEDGE_DELAY = metrics.gauge("llm_hedge_delay_seconds", "보조 provider 요청 전 대기 시간")
+
+
 class LLMClient(Protocol):
     async def achain(self, prompt: str) -> str:  # simple async generate
         ...
 
 
 @dataclass
-class OpenAIClient:
+class _SDKClientHolder:
+    """
+    provider 인스턴스당 SDK 클라이언트(연결 풀) 하나를 처음 호출 때 만들어 계속 재사용
+    """
+    _sdk_client: Any = field(default=None, init=False, repr=False)
+
+    def _create_sdk_client(self) -> Any:
+        raise NotImplementedError
+
+    @property
+    def client(self) -> Any:
+        if self._sdk_client is None:
+            self._sdk_client = self._create_sdk_client()
+        return self._sdk_client
+
+    async def aclose(self) -> None:
+        if self._sdk_client is not None:
+            await self._sdk_client.close()
+            self._sdk_client = None
+
+
+@dataclass
+class OpenAIClient(_SDKClientHolder):
     model: str = "gpt-4o-mini"
     api_key: str = ""
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=20), stop=stop_after_attempt(3))
-    async def achain(self, prompt: str) -> str:
+    def _create_sdk_client(self) -> Any:
         from openai import AsyncOpenAI
 
+        return AsyncOpenAI(api_key=self.api_key)
+
+    @with_retry("openai")
+    async def achain(self, prompt: str) -> str:
         if not self.api_key:
             # fallback: local simple heuristic summarizer
             return _local_fallback(prompt)
-        client = AsyncOpenAI(api_key=self.api_key)
-        resp = await client.chat.completions.create(
+        resp = await self.client.chat.completions.create(
             model=self.model,
             messages=[
                 {"role": "system", "content": "당신은 DevOps 전문가입니다."},
@@ -36,25 +91,25 @@ class OpenAIClient:
 
 
 @dataclass
-class AzureOpenAIClient:
+class AzureOpenAIClient(_SDKClientHolder):
     """Azure OpenAI 클라이언트"""
     endpoint: str = ""
     deployment_name: str = ""
     api_key: str = ""
     api_version: str = "2024-02-15-preview"
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=20), stop=stop_after_attempt(3))
-    async def achain(self, prompt: str) -> str:
-        from openai import AsyncOpenAI
+    def _create_sdk_client(self) -> Any:
+        from openai import AsyncAzureOpenAI
 
-        # Azure OpenAI 클라이언트 설정
-        client = AsyncOpenAI(
+        return AsyncAzureOpenAI(
             api_key=self.api_key,
             azure_endpoint=self.endpoint,
             api_version=self.api_version
         )
-        
-        resp = await client.chat.completions.create(
+
+    @with_retry("azure")
+    async def achain(self, prompt: str) -> str:
+        resp = await self.client.chat.completions.create(
             model=self.deployment_name,
             messages=[
                 {"role": "system", "content": "당신은 자동차 SW 개발 환경의 DevOps 전문가입니다."},
@@ -66,23 +121,24 @@ class AzureOpenAIClient:
 
 
 @dataclass
-class PrivateLLMClient:
+class PrivateLLMClient(_SDKClientHolder):
     """Private LLM (사내 LLM 서버) 클라이언트"""
     base_url: str = ""
     model: str = ""
     api_key: str = ""
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=20), stop=stop_after_attempt(3))
-    async def achain(self, prompt: str) -> str:
+    def _create_sdk_client(self) -> Any:
         from openai import AsyncOpenAI
 
         # Private LLM도 OpenAI API 호환 인터페이스 사용
-        client = AsyncOpenAI(
+        return AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.base_url
         )
-        
-        resp = await client.chat.completions.create(
+
+    @with_retry("private")
+    async def achain(self, prompt: str) -> str:
+        resp = await self.client.chat.completions.create(
             model=self.model,
             messages=[
                 {"role": "system", "content": "당신은 자동차 SW 개발 환경의 DevOps 전문가입니다."},
@@ -93,6 +149,106 @@ class PrivateLLMClient:
         return resp.choices[0].message.content or ""
 
 
+@dataclass
+class HedgedLLMClient:
+    """
+    주/보조 provider hedged 요청 클라이언트
+
+    주 provider에 먼저 요청하고, 최근 응답 시간 p95 안에 답이 없으면(또는 실패하면)
+    보조 provider에도 같은 프롬프트를 보낸다. 먼저 성공한 답을 쓰고 나머지 요청은 취소한다.
+    """
+    primary: LLMClient
+    secondary: LLMClient
+    quantile: float = LLM_HEDGE_QUANTILE
+    min_delay: float = LLM_HEDGE_MIN_DELAY_SECONDS
+    max_delay: float = LLM_HEDGE_MAX_DELAY_SECONDS
+    window: int = 200
+    _latencies: Deque[float] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._latencies = deque(maxlen=self.window)
+
+    def hedge_delay(self) -> float:
+        """보조 provider 요청 전 대기 시간 (주 provider 최근 응답 시간의 p95)"""
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return self.max_delay
+        ordered = sorted(self._latencies)
+        delay = ordered[min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)]
+        return max(self.min_delay, min(self.max_delay, delay))
+
+    async def achain(self, prompt: str) -> str:
+        started = time.monotonic()
+        delay = self.hedge_delay()
+        HEDGE_DELAY.set(delay)
+
+        primary = asyncio.create_task(self.primary.achain(prompt))
+        tasks = [primary]
+        try:
+            await asyncio.wait(tasks, timeout=delay)
+            if primary.done() and primary.exception() is None:
+                self._latencies.append(time.monotonic() - started)
+                HEDGE_RESULTS.inc(hedged="false", winner="primary")
+                return primary.result()
+
+            # 지연 초과 또는 주 provider 실패 - 보조 provider에도 요청
+            secondary = asyncio.create_task(self.secondary.achain(prompt))
+            tasks.append(secondary)
+            error = primary.exception() if primary.done() else None
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is primary:
+                        self._latencies.append(time.monotonic() - started)
+                    HEDGE_RESULTS.inc(hedged="true", winner="primary" if task is primary else "secondary")
+                    return task.result()
+
+            HEDGE_RESULTS.inc(hedged="true", winner="none")
+            raise error
+        finally:
+            # 진 요청(또는 호출자 취소 시 모든 요청) 취소
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def aclose(self) -> None:
+        await _aclose(self.primary)
+        await _aclose(self.secondary)
+
+
+async def _aclose(client: Any) -> None:
+    aclose = getattr(client, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _close_later(client: Any, delay: float) -> None:
+    await asyncio.sleep(delay)
+    await _aclose(client)
+
+
+def _retire_client(client: Any) -> None:
+    """get_llm() 메모에서 교체된 클라이언트의 SDK 연결 풀 정리"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    try:
+        if loop is None:
+            # 이벤트 루프 밖에서 호출됨 - 사용 중인 요청이 없으므로 바로 닫음
+            asyncio.run(_aclose(client))
+            return
+        task = loop.create_task(_close_later(client, RETIRED_CLIENT_GRACE_SECONDS))
+        _retiring.add(task)
+        task.add_done_callback(_retiring.discard)
+    except Exception as e:
+        print(f"⚠️ 이전 LLM 클라이언트 정리 실패: {e}")
+
+
 def _local_fallback(prompt: str) -> str:
     # 간단한 추출 요약 (LLM 키가 없을 때 비상 동작)
     import re
@@ -114,7 +270,7 @@ def get_llm() -> LLMClient:
     우선순위: 환경변수 > config 파일 > 기본값
     
     환경변수:
-        LLM_PROVIDER: openai (기본값), azure, 또는 private
+        LLM_PROVIDER: openai (기본값), azure, private, 또는 mock
         
         OpenAI 사용 시:
             OPENAI_API_KEY: OpenAI API 키
@@ -129,18 +285,79 @@ def get_llm() -> LLMClient:
             PRIVATE_LLM_BASE_URL: Private LLM 서버 URL (예: http://llm-server:8000/v1)
             PRIVATE_LLM_MODEL: 모델 이름 (예: llama-3-70b, mistral-7b)
             PRIVATE_LLM_API_KEY: Private LLM API 키 (없으면 빈 문자열)
+        
+        Mock LLM 사용 시 (부하 테스트, app/llm/mock.py):
+            MOCK_LLM_LATENCY: fixed:<초> / lognormal:<중앙값>,<sigma> / replay:<파일>
+            MOCK_LLM_ERROR_RATE, MOCK_LLM_TOKENS_PER_SECOND, MOCK_LLM_SEED
+            MOCK_LLM_CASSETTE / MOCK_LLM_CASSETTE_MODE (replay, record) / MOCK_LLM_RECORD_PROVIDER
+        
+        Hedged 요청 사용 시:
+            LLM_HEDGE_PROVIDER: 보조 provider (openai, azure, private)
+            LLM_HEDGE_MIN_DELAY_SECONDS / LLM_HEDGE_MAX_DELAY_SECONDS: 보조 요청 전 대기 시간 범위
+    
+    유효 설정(provider + 환경변수/config 파일 값)이 같으면 이전에 만든 클라이언트를 그대로 반환하므로
+    SDK 연결 풀이 재사용된다. 설정이 바뀌어 교체된 클라이언트는 LLM_RETIRED_CLIENT_GRACE_SECONDS 뒤에 닫는다.
+    config 파일은 수정 시각이 바뀔 때만 다시 파싱한다.
     """
+    global _llm_memo
+    
     # config 파일 로드 시도
     try:
         config = load_config()
-        print("✅ Config 파일 로드 성공")
+        config_error = None
     except Exception as e:
-        print(f"⚠️ Config 파일 로드 실패: {e}")
         config = {}
+        config_error = e
     
     llm_provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    hedge_provider = LLM_HEDGE_PROVIDER.lower()
+    key = _effective_config_key(llm_provider, hedge_provider, config)
+    
+    with _llm_memo_lock:
+        if _llm_memo is not None and _llm_memo[0] == key:
+            return _llm_memo[1]
+        
+        if config_error is None:
+            print("✅ Config 파일 로드 성공")
+        else:
+            print(f"⚠️ Config 파일 로드 실패: {config_error}")
+        
+        client = _create_client(llm_provider, config)
+        if hedge_provider and hedge_provider != llm_provider:
+            print(f"🔧 Hedged 요청: {llm_provider} → {hedge_provider}")
+            client = HedgedLLMClient(primary=client, secondary=_create_client(hedge_provider, config))
+        
+        previous = _llm_memo[1] if _llm_memo is not None else None
+        _llm_memo = (key, client)
+    
+    if previous is not None:
+        _retire_client(previous)
+    return client
+
+
+def _effective_config_key(llm_provider: str, hedge_provider: str, config: dict) -> str:
+    """클라이언트 생성에 쓰이는 설정 값 전체 (환경변수 우선 적용 후)"""
+    return json.dumps({
+        "provider": llm_provider,
+        "hedge": hedge_provider,
+        "azure": get_azure_config(config),
+        "private": get_private_llm_config(config),
+        "openai": get_openai_config(config)
+    }, sort_keys=True)
+
+
+def _create_client(llm_provider: str, config: dict) -> LLMClient:
+    """provider 이름으로 클라이언트 생성 (설정이 불완전하면 로컬 분석 클라이언트)"""
+    if llm_provider == "mock":
+        inner = None
+        if MOCK_LLM_CASSETTE_MODE == "record":
+            # cassette 기록용 실제 provider
+            inner = _create_client(MOCK_LLM_RECORD_PROVIDER, config)
+        client = MockLLMClient(inner=inner)
+        print(f"🔧 Mock LLM 설정: latency={client.latency.kind}, error_rate={client.error_rate}, cassette={client.cassette or '없음'}")
+        return client
     
-    if llm_provider == "azure":
+    elif llm_provider == "azure":
         # Azure OpenAI 사용 - config 파일에서 값 가져오기
         azure_config = get_azure_config(config)
         endpoint = azure_config["endpoint"]
@@ -0,0 +1,169 @@
+"""
+LLM provider 재시도 (프로세스 전체 재시도 예산 + decorrelated jitter)
+
+장애 중에 모든 요청이 같은 간격으로 재시도하면 복구 중인 엔드포인트에 부하가 몇 배로 몰린다.
+- 재시도 예산: 최근 윈도우의 요청 수 대비 일정 비율(+ 최소 여유분)까지만 재시도 허용
+- decorrelated jitter: 대기 시간 = min(상한, uniform(base, 이전 대기 × 3))
+- 마감 시간: 대기 후 재시도가 마감 전에 끝날 수 없으면 재시도하지 않음 (호출자가 llm_deadline()으로 지정)
+
+provider.py 클라이언트의 achain과 local_llm_server.py의 429 재시도가 같은 예산(retry_budget)을 쓴다.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+from app.services.metrics import metrics
+
+
+T = TypeVar("T")
+
+LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "3"))
+LLM_RETRY_BASE_DELAY_SECONDS = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "1"))
+LLM_RETRY_MAX_DELAY_SECONDS = float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "20"))
+# 최근 요청 수 대비 허용 재시도 비율과 윈도우
+LLM_RETRY_BUDGET_RATIO = float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.1"))
+LLM_RETRY_BUDGET_WINDOW_SECONDS = float(os.getenv("LLM_RETRY_BUDGET_WINDOW_SECONDS", "10"))
+# 요청이 적을 때도 허용하는 윈도우당 최소 재시도 수
+LLM_RETRY_BUDGET_MIN_RETRIES = int(os.getenv("LLM_RETRY_BUDGET_MIN_RETRIES", "3"))
+
+RETRIES = metrics.counter("llm_retries_total", "LLM provider 재시도 결정 (retried/budget_exhausted/deadline/attempts)")
+RETRY_BUDGET_REMAINING = metrics.gauge("llm_retry_budget_remaining", "현재 윈도우에서 남은 재시도 수")
+
+# 현재 요청의 마감 시각 (time.monotonic 기준, 없으면 None)
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_deadline(seconds: float) -> Iterator[None]:
+    """이 블록(과 여기서 만든 태스크)의 LLM 호출 마감 시간 지정 (바깥 마감이 더 빠르면 유지)"""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class RetryBudget:
+    """
+    슬라이딩 윈도우 재시도 예산
+
+    윈도우 안의 재시도 수가 min_retries + ratio × 요청 수 를 넘지 않게 한다.
+    """
+
+    def __init__(self, ratio: float, window_seconds: float, min_retries: int):
+        self.ratio = ratio
+        self.window_seconds = window_seconds
+        self.min_retries = min_retries
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    def _remaining(self) -> float:
+        return self.min_retries + self.ratio * len(self._requests) - len(self._retries)
+
+    def record_request(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+            RETRY_BUDGET_REMAINING.set(self._remaining())
+
+    def try_spend(self) -> bool:
+        """재시도 1회 예산 사용 (없으면 False)"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if self._remaining() < 1:
+                RETRY_BUDGET_REMAINING.set(self._remaining())
+                return False
+            self._retries.append(now)
+            RETRY_BUDGET_REMAINING.set(self._remaining())
+            return True
+
+    def status(self) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            return {
+                "ratio": self.ratio,
+                "window_seconds": self.window_seconds,
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "remaining": max(self._remaining(), 0.0)
+            }
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float, rng: random.Random = random) -> float:
+    """다음 대기 시간: min(cap, uniform(base, previous × 3))"""
+    return min(cap, rng.uniform(base, max(base, previous * 3)))
+
+
+# 전역 인스턴스
+retry_budget = RetryBudget(LLM_RETRY_BUDGET_RATIO, LLM_RETRY_BUDGET_WINDOW_SECONDS, LLM_RETRY_BUDGET_MIN_RETRIES)
+
+
+async def call_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    name: str = "llm",
+    budget: Optional[RetryBudget] = None,
+    max_attempts: int = LLM_RETRY_MAX_ATTEMPTS,
+    base_delay: float = LLM_RETRY_BASE_DELAY_SECONDS,
+    max_delay: float = LLM_RETRY_MAX_DELAY_SECONDS
+) -> T:
+    """
+    fn을 실패 시 재시도하며 호출
+
+    재시도마다 전역 예산을 쓰고, 예산이 없거나 (대기 + 직전 시도 시간)이 마감을 넘으면 마지막 오류를 그대로 올린다.
+    """
+    budget = budget or retry_budget
+    budget.record_request()
+    delay = base_delay
+    attempt = 1
+    while True:
+        started = time.monotonic()
+        try:
+            return await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if attempt >= max_attempts:
+                RETRIES.inc(provider=name, decision="attempts")
+                raise
+            delay = decorrelated_jitter(delay, base_delay, max_delay)
+            deadline = _deadline.get()
+            now = time.monotonic()
+            # 직전 시도만큼 걸린다고 보고 마감 전에 끝날 수 없으면 재시도하지 않음
+            if deadline is not None and now + delay + (now - started) > deadline:
+                RETRIES.inc(provider=name, decision="deadline")
+                raise
+            if not budget.try_spend():
+                RETRIES.inc(provider=name, decision="budget_exhausted")
+                raise
+            RETRIES.inc(provider=name, decision="retried")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def with_retry(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """async 메서드 데코레이터: call_with_retry()로 감싸 호출"""
+    def decorator(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await call_with_retry(lambda: method(*args, **kwargs), name=name)
+        return wrapper
+    return decorator
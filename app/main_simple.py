@@ -1,37 +1,78 @@
 """
 간소화된 FastAPI - CI 시스템에서 REST API로만 사용
 """
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import json
 import os
 
-from app.db.connection import get_db, init_db
-from app.db.models import AnalysisHistory, PendingApproval, KnowledgeBase
-from app.auth.jwt_handler import create_approval_token, verify_approval_token
-from app.graph.workflow import CIErrorAnalyzer
-from app.services.llm_client import llm_client
-from app.utils.text import extract_symptoms
-from app.kb.db import search_kb
+from app.db.connection import AsyncSessionLocal, get_async_db, get_db
+from app.db.models import AnalysisHistory, AnalysisJob, PendingApproval, KnowledgeBase
+from app.auth.approval_token import create_signed_token, verify_signed_token
+from app.services.analysis_engine import AnalysisEngine, analysis_engine, get_analysis_engine
+from app.services.jobs import AnalysisJobManager, job_manager
+from app.services.log_ingest import (
+    IngestedLog,
+    LogDecodeError,
+    LogTooLargeError,
+    UnsupportedEncodingError,
+    decode_body,
+    ingest_multipart,
+    ingest_stream
+)
+from app.services.history_writer import history_writer
+from app.services.llm_cache import llm_analysis_cache
+from app.services.llm_scheduler import llm_scheduler
+from app.services.llm_usage import history_usage_fields
+from app.services.log_store import compress_log, hash_log, load_log, store_ingested, store_log
+from app.services.metrics import metrics
+from app.services.worker_pool import PoolSaturatedError, analysis_pool
+from app.utils.text import symptom_fingerprint
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작 시 분석 엔진 초기화 및 워밍업, 종료 시 연결 정리"""
+    await analysis_engine.startup()
+    print("✅ 분석 엔진 준비 완료 (DB/KB/그래프/LLM 연결)")
+    await history_writer.start()
+    await job_manager.start(_run_analysis_job)
+    yield
+    await job_manager.stop()
+    await history_writer.stop()
+    await analysis_engine.shutdown()
+
 
 app = FastAPI(
     title="CI Error Analysis Agent",
     version="2.0.0",
-    description="자동차 SW CI 오류 분석 에이전트"
+    description="자동차 SW CI 오류 분석 에이전트",
+    lifespan=lifespan
 )
 
 
-class AnalyzeRequest(BaseModel):
-    """분석 요청"""
-    ci_log: str
+class AnalyzeMetadata(BaseModel):
+    """분석 요청 메타데이터 (로그 본문을 따로 업로드할 때는 쿼리/폼 필드로 전달)"""
     context: Optional[str] = None
     repository: Optional[str] = None
     job_name: Optional[str] = None
     build_number: Optional[int] = None
+    branch: Optional[str] = None
+    # LLM 호출 대기 시 우선순위 가산점 (릴리스 브랜치/최신 빌드 가산점과 합산)
+    priority: Optional[int] = None
+
+
+class AnalyzeRequest(AnalyzeMetadata):
+    """분석 요청"""
+    ci_log: str
 
 
 class AnalyzeResponse(BaseModel):
@@ -54,11 +95,43 @@ class AnalyzeResponse(BaseModel):
     recommend_save: bool = False
 
 
-@app.on_event("startup")
-async def startup_event():
-    """시작 시 DB 초기화"""
-    init_db()
-    print("✅ 데이터베이스 초기화 완료")
+class AnalyzeBatchRequest(BaseModel):
+    """배치 분석 요청 (매트릭스 빌드)"""
+    requests: List[AnalyzeRequest] = Field(..., min_length=1, max_length=int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "100")))
+
+
+class AnalyzeBatchResponse(BaseModel):
+    """배치 분석 응답 (요청 순서대로)"""
+    results: List[AnalyzeResponse]
+    unique_failures: int
+
+
+class AnalyzeJobRequest(AnalyzeRequest):
+    """비동기 분석 작업 요청"""
+    deadline_seconds: Optional[int] = None
+
+
+class AnalyzeJobStatus(BaseModel):
+    """비동기 분석 작업 상태"""
+    job_id: str
+    status: str  # queued, running, succeeded, failed, timeout
+    status_url: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    analysis_id: Optional[int] = None
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[str] = None
+
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    """워커 풀 포화 시 503 + Retry-After"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "분석 요청이 많아 잠시 후 다시 시도해주세요."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 
 @app.get("/")
@@ -71,10 +144,72 @@ async def root():
     }
 
 
-@app.post("/analyze", response_model=AnalyzeResponse)
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe - 분석 엔진 워밍업 완료 후에만 200"""
+    if not analysis_engine.ready:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 텍스트 포맷 메트릭"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# /analyze 요청 본문 문서화 (본문은 Content-Type에 따라 직접 파싱)
+ANALYZE_OPENAPI_EXTRA = {
+    "requestBody": {
+        "required": True,
+        "description": (
+            "JSON(AnalyzeRequest), 원본 로그(application/octet-stream, 메타데이터는 쿼리 파라미터), "
+            "또는 multipart/form-data(ci_log 파일 + 메타데이터 필드). "
+            "Content-Encoding: gzip/zstd 로 압축해서 보낼 수 있다."
+        ),
+        "content": {
+            "application/json": {"schema": AnalyzeRequest.model_json_schema()},
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["ci_log"],
+                    "properties": {
+                        "ci_log": {"type": "string", "format": "binary"},
+                        "context": {"type": "string"},
+                        "repository": {"type": "string"},
+                        "job_name": {"type": "string"},
+                        "build_number": {"type": "integer"},
+                        "branch": {"type": "string"},
+                        "priority": {"type": "integer"}
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+@app.exception_handler(UnsupportedEncodingError)
+async def unsupported_encoding_handler(request: Request, exc: UnsupportedEncodingError):
+    return JSONResponse(status_code=415, content={"detail": str(exc)})
+
+
+@app.exception_handler(LogTooLargeError)
+async def log_too_large_handler(request: Request, exc: LogTooLargeError):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
+@app.exception_handler(LogDecodeError)
+async def log_decode_error_handler(request: Request, exc: LogDecodeError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.post("/analyze", response_model=AnalyzeResponse, openapi_extra=ANALYZE_OPENAPI_EXTRA)
 async def analyze_ci_error(
-    request: AnalyzeRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    engine: AnalysisEngine = Depends(get_analysis_engine)
 ):
     """
     CI 오류 분석 (KB 우선, 필요시 n8n LLM 호출)
@@ -83,161 +218,216 @@ async def analyze_ci_error(
     1. 증상 추출 및 KB 검색
     2. KB 신뢰도 < 0.8이면 n8n LLM 분석 호출
     3. 분석 결과 반환 (approval_token 포함)
+    
+    로그는 JSON 본문 외에 application/octet-stream 또는 multipart 파일로도 받으며,
+    이때는 본문을 버퍼링하지 않고 스트리밍으로 증상을 추출한다.
     """
-    # 1. 증상 추출
-    analyzer = CIErrorAnalyzer()
-    symptoms = extract_symptoms(request.ci_log)
-    error_type = analyzer._classify_error_type(symptoms)
+    content_type = http_request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+    encoding = http_request.headers.get("content-encoding")
     
-    # 2. KB 검색
-    query = "\n".join(symptoms)
-    kb_hits = search_kb(query=query, top_k=5)
-    kb_confidence = analyzer._calculate_kb_confidence(kb_hits)
+    if content_type == "application/octet-stream":
+        request = _parse_metadata(dict(http_request.query_params))
+        ingested = await ingest_stream(http_request.stream(), encoding)
+    elif content_type == "multipart/form-data":
+        request, ingested = await _ingest_multipart(http_request)
+    else:
+        body = await analysis_pool.run(decode_body, await http_request.body(), encoding)
+        try:
+            request = AnalyzeRequest.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+        ingested = None
     
-    # 3. KB 결과 또는 n8n LLM 분석
-    if kb_confidence >= 0.8:
-        # KB에서 충분한 답을 찾음
-        best_hit = kb_hits[0]
-        analysis = f"""KB에서 유사한 사례를 찾았습니다:
+    # 1~3. 증상 추출, KB 검색, LLM 분석 (동일 로그는 진행 중/최근 분석 결과 공유)
+    if ingested is None:
+        result = await engine.analyze_shared(
+            ci_log=request.ci_log,
+            context=request.context,
+            repository=request.repository,
+            job_name=request.job_name,
+            priority=llm_scheduler.priority_for(request)
+        )
+    else:
+        result = await engine.analyze_ingested(
+            ingested,
+            context=request.context,
+            repository=request.repository,
+            job_name=request.job_name,
+            priority=llm_scheduler.priority_for(request)
+        )
+    
+    # 4~6. DB 저장 및 승인 토큰 생성
+    return await _save_analysis(db, request, result, ingested)
 
-**문제 유형**: {best_hit['title']}
-**해결 방법**: {best_hit['fix']}
 
-추가 참고사항:
-{best_hit['summary']}
+def _parse_metadata(fields: Dict[str, Any]) -> AnalyzeMetadata:
+    """쿼리/폼 필드 → 메타데이터 (검증 실패 시 422)"""
+    try:
+        return AnalyzeMetadata.model_validate(fields)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
 
-이 해결책을 적용해보시고, 문제가 지속되면 추가 로그를 제공해주세요."""
-        
-        result = {
-            "symptoms": symptoms,
-            "kb_hits": kb_hits,
-            "web_hits": [],
-            "security_status": "kb_analyzed",
-            "kb_confidence": kb_confidence,
-            "analysis": analysis,
-            "confidence": kb_confidence,
-            "error_type": error_type
-        }
-    else:
-        # KB에서 답을 찾지 못함 - LLM 분석 호출
-        try:
-            llm_result = await llm_client.call_llm_analysis(
-                ci_log=request.ci_log,
-                symptoms=symptoms,
-                error_type=error_type,
-                context=request.context,
-                repository=request.repository
-            )
-            
-            result = {
-                "symptoms": symptoms,
-                "kb_hits": kb_hits,
-                "web_hits": [],
-                "security_status": "llm_analyzed",
-                "kb_confidence": kb_confidence,
-                "analysis": llm_result["analysis"],
-                "confidence": llm_result["confidence"],
-                "error_type": error_type
-            }
-            
-        except HTTPException as e:
-            # LLM 호출 실패 - fallback 분석
-            analysis = f"""KB에서 해당 오류에 대한 해결책을 찾지 못했고, LLM 분석도 실패했습니다.
 
-**추출된 증상**:
-{chr(10).join(f"- {symptom}" for symptom in symptoms[:5])}
+async def _ingest_multipart(http_request: Request) -> Tuple[AnalyzeMetadata, IngestedLog]:
+    """multipart 요청을 증분 파싱해 ci_log 파일 파트를 스트리밍 수집 (임시 파일 없음)"""
+    fields, ingested = await ingest_multipart(http_request.stream(), http_request.headers["content-type"])
+    if ingested is None:
+        raise RequestValidationError([{
+            "type": "missing",
+            "loc": ("body", "ci_log"),
+            "msg": "ci_log 파일 파트가 필요합니다.",
+            "input": None
+        }])
+    return _parse_metadata(fields), ingested
 
-**오류 유형**: {error_type}
 
-**오류**: {e.detail}
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 한 개"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
-개발팀에 문의하거나 추가 컨텍스트를 제공해주세요."""
-            
-            result = {
-                "symptoms": symptoms,
-                "kb_hits": kb_hits,
-                "web_hits": [],
-                "security_status": "analysis_failed",
-                "kb_confidence": kb_confidence,
-                "analysis": analysis,
-                "confidence": 0.1,
-                "error_type": error_type
-            }
+
+@app.post("/analyze/stream")
+async def analyze_ci_error_stream(
+    request: AnalyzeRequest,
+    engine: AnalysisEngine = Depends(get_analysis_engine)
+):
+    """
+    CI 오류 분석 스트리밍 (text/event-stream)
     
-    # 4. 분석 이력 DB 저장
-    analysis_history = AnalysisHistory(
+    이벤트 순서:
+    1. kb: error_type, symptoms, kb_confidence, kb_hits (LLM 호출 전 즉시)
+    2. token: 분석 텍스트 조각 (LLM 생성 순서대로)
+    3. done: 저장된 analysis_id를 포함한 /analyze와 같은 응답
+    
+    LLM이 도중에 실패하면 done의 analysis가 대체 분석으로 바뀌므로 최종 결과는 done 기준으로 표시한다.
+    """
+    events = engine.analyze_stream(
         ci_log=request.ci_log,
         context=request.context,
         repository=request.repository,
         job_name=request.job_name,
+        priority=llm_scheduler.priority_for(request)
+    )
+    # 증상 추출/KB 검색은 응답 시작 전에 실행 (워커 풀 포화 시 일반 503 응답)
+    first_event = await events.__anext__()
+    
+    async def stream():
+        event, data = first_event
+        yield _sse_event(event, data)
+        async for event, data in events:
+            if event != "result":
+                yield _sse_event(event, data)
+                continue
+            # 스트리밍 응답은 요청 의존성 세션이 먼저 닫히므로 별도 세션으로 저장
+            async with AsyncSessionLocal() as db:
+                response = await _save_analysis(db, request, data)
+            yield _sse_event("done", response.model_dump())
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/analyze/batch", response_model=AnalyzeBatchResponse)
+async def analyze_ci_errors_batch(
+    batch: AnalyzeBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    engine: AnalysisEngine = Depends(get_analysis_engine)
+):
+    """
+    여러 CI 오류 일괄 분석 (매트릭스 빌드에서 동시에 실패한 작업들)
+    
+    동일한 증상 지문은 한 번만 분석하고, 모든 이력/승인 대기 행은
+    하나의 트랜잭션으로 저장한다.
+    """
+    results = await engine.analyze_batch(batch.requests)
+    
+    responses = [
+        await _stage_analysis(db, request, result)
+        for request, result in zip(batch.requests, results)
+    ]
+    await db.commit()
+    
+    unique_failures = len({symptom_fingerprint(r["error_type"], r["symptoms"]) for r in results})
+    return AnalyzeBatchResponse(results=responses, unique_failures=unique_failures)
+
+
+async def _save_analysis(
+    db: AsyncSession,
+    request: AnalyzeMetadata,
+    result: Dict[str, Any],
+    ingested: Optional[IngestedLog] = None
+) -> AnalyzeResponse:
+    """분석 결과를 이력/승인 대기 테이블에 저장하고 응답 생성"""
+    response = await _stage_analysis(db, request, result, ingested)
+    await db.commit()
+    return response
+
+
+async def _stage_analysis(
+    db: AsyncSession,
+    request: AnalyzeMetadata,
+    result: Dict[str, Any],
+    ingested: Optional[IngestedLog] = None
+) -> AnalyzeResponse:
+    """
+    분석 이력/승인 대기 행 저장 준비 및 응답 생성
+    
+    기본 모드: 세션에 추가하고 ID 확보를 위해 flush만 한다 (커밋은 호출자가 수행하므로
+    여러 건을 한 트랜잭션으로 묶을 수 있다).
+    write-behind 모드: 미리 확보한 ID로 응답을 만들고 저장은 history_writer가 일괄 수행한다.
+    """
+    log_head = request.ci_log[:200] if ingested is None else ingested.excerpt[:200]
+    now = datetime.utcnow()
+    
+    # 4. 분석 이력
+    history_fields = dict(
+        log_fingerprint=result.get("log_fingerprint"),
+        context=request.context,
+        repository=request.repository,
+        job_name=request.job_name,
         build_number=request.build_number,
         error_type=result["error_type"],
         symptoms=json.dumps(result["symptoms"], ensure_ascii=False),
         analysis=result["analysis"],
         confidence=result["confidence"],
         kb_confidence=result["kb_confidence"],
-        security_status=result["security_status"]
+        security_status=result["security_status"],
+        created_at=now,
+        **history_usage_fields(result.get("llm_usage"))
     )
-    db.add(analysis_history)
-    db.commit()
-    db.refresh(analysis_history)
-    
-    # 5. 승인 토큰 생성 (신뢰도 0.6 이상일 때만)
-    approval_token = None
-    approval_url = None
-    modify_token = None
-    modify_url = None
-    recommend_save = False
     
+    # 5. 승인 대기 항목 (신뢰도 0.6 이상일 때만)
+    pending_fields = None
     if result["confidence"] >= 0.6:
-        # 승인 대기 항목 생성
-        pending = PendingApproval(
-            analysis_id=analysis_history.id,
+        pending_fields = dict(
             title=f"{result['error_type'].upper()}: {result['symptoms'][0] if result['symptoms'] else 'Unknown'}",
-            summary="\n".join(result['symptoms'][:3]) if result['symptoms'] else request.ci_log[:200],
+            summary="\n".join(result['symptoms'][:3]) if result['symptoms'] else log_head,
             fix=result['analysis'],
             tags=result['error_type'],
             error_type=result['error_type'],
-            token="",  # 임시
-            token_expires_at=datetime.utcnow() + timedelta(days=7)
+            token_expires_at=now + timedelta(days=7),
+            created_at=now
         )
-        db.add(pending)
-        db.flush()
-        
-        # JWT 토큰 생성
-        try:
-            approval_token = create_approval_token(
-                analysis_id=analysis_history.id,
-                pending_approval_id=pending.id,
-                admin_email="admin"
-            )
-            
-            modify_token = create_approval_token(
-                analysis_id=analysis_history.id,
-                pending_approval_id=pending.id,
-                admin_email="admin"
-            )
-            
-            pending.token = approval_token
-            db.commit()
-            
-        except Exception as e:
-            print(f"⚠️ JWT 토큰 생성 실패: {e}")
-            # 토큰 생성 실패 시 기본값 설정
-            approval_token = None
-            modify_token = None
-            pending.token = ""
-            db.commit()
-        
-        # URL 생성 (CI 시스템이 이메일에 포함)
+    
+    if history_writer.enabled:
+        analysis_id, pending_id, approval_token = await _submit_write_behind(request, history_fields, pending_fields, ingested)
+    else:
+        analysis_id, pending_id, approval_token = await _add_rows(db, request, history_fields, pending_fields, ingested)
+    
+    # 승인/수정 링크 (CI 시스템이 이메일에 포함)
+    approval_url = None
+    modify_url = None
+    if pending_id is not None:
         base_url = os.getenv("BASE_URL", "http://localhost:8000")
         approval_url = f"{base_url}/approve/{approval_token}"
-        modify_url = f"{base_url}/modify/{modify_token}"
-        recommend_save = True
+        modify_url = f"{base_url}/modify/{approval_token}"
     
     # 6. 응답 반환
     return AnalyzeResponse(
-        analysis_id=analysis_history.id,
+        analysis_id=analysis_id,
         error_type=result["error_type"],
         confidence=result["confidence"],
         kb_confidence=result["kb_confidence"],
@@ -246,16 +436,168 @@ async def analyze_ci_error(
         analysis=result["analysis"],
         approval_token=approval_token,
         approval_url=approval_url,
-        modify_token=modify_token,
+        modify_token=approval_token,
         modify_url=modify_url,
-        recommend_save=recommend_save
+        recommend_save=pending_id is not None
     )
 
 
+async def _add_rows(
+    db: AsyncSession,
+    request: AnalyzeMetadata,
+    history_fields: Dict[str, Any],
+    pending_fields: Optional[Dict[str, Any]],
+    ingested: Optional[IngestedLog]
+) -> Tuple[int, Optional[int], Optional[str]]:
+    """세션에 이력/승인 대기 행 추가 (로그는 압축 blob으로 한 번만 저장)"""
+    if ingested is None:
+        log_hash = await store_log(db, request.ci_log)
+    else:
+        log_hash = await store_ingested(db, ingested)
+    
+    history = AnalysisHistory(log_hash=log_hash, **history_fields)
+    db.add(history)
+    await db.flush()
+    
+    if pending_fields is None:
+        return history.id, None, None
+    
+    pending = PendingApproval(analysis_id=history.id, **pending_fields)
+    db.add(pending)
+    await db.flush()
+    # 토큰은 승인 대기 ID + 만료 시각에서 계산 (DB에 저장하지 않음)
+    token = create_signed_token(pending.id, pending.token_expires_at)
+    return history.id, pending.id, token
+
+
+async def _submit_write_behind(
+    request: AnalyzeMetadata,
+    history_fields: Dict[str, Any],
+    pending_fields: Optional[Dict[str, Any]],
+    ingested: Optional[IngestedLog]
+) -> Tuple[int, Optional[int], Optional[str]]:
+    """미리 확보한 ID로 행을 만들어 history_writer에 저장 예약 (DB 왕복 없음)"""
+    await history_writer.start()
+    
+    if ingested is None:
+        digest = await analysis_pool.run(hash_log, request.ci_log)
+        blob = None
+        if not history_writer.has_blob(digest):
+            codec, data = await analysis_pool.run(compress_log, request.ci_log)
+            blob = {"digest": digest, "codec": codec, "data": data, "raw_size": len(request.ci_log.encode("utf-8"))}
+    else:
+        digest = ingested.digest
+        blob = {"digest": digest, "codec": ingested.codec, "data": ingested.compressed, "raw_size": ingested.raw_size}
+    
+    analysis_id = await history_writer.history_ids.next_id()
+    history = {"id": analysis_id, "log_hash": digest, **history_fields}
+    
+    pending = None
+    pending_id = None
+    token = None
+    if pending_fields is not None:
+        pending_id = await history_writer.approval_ids.next_id()
+        token = create_signed_token(pending_id, pending_fields["token_expires_at"])
+        pending = {"id": pending_id, "analysis_id": analysis_id, **pending_fields}
+    
+    history_writer.submit(history=history, pending=pending, blob=blob)
+    return analysis_id, pending_id, token
+
+
+async def _run_analysis_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 관리자 워커에서 실행되는 분석 (자체 DB 세션 사용)"""
+    request = AnalyzeRequest(**payload)
+    engine = await get_analysis_engine()
+    result = await engine.analyze_shared(
+        ci_log=request.ci_log,
+        context=request.context,
+        repository=request.repository,
+        job_name=request.job_name,
+        priority=llm_scheduler.priority_for(request)
+    )
+    async with AsyncSessionLocal() as db:
+        response = await _save_analysis(db, request, result)
+    if history_writer.enabled:
+        # 작업 행이 analysis_id로 이력을 참조하므로 write-behind 이력이 커밋된 뒤에 반환
+        await history_writer.wait_written(response.analysis_id)
+    return response.model_dump()
+
+
+async def get_job_manager() -> AnalysisJobManager:
+    """FastAPI 의존성: 시작된 작업 관리자 반환 (lifespan 없이 실행된 경우 여기서 시작)"""
+    if not job_manager.started:
+        await job_manager.start(_run_analysis_job)
+    return job_manager
+
+
+def _job_status(job: AnalysisJob) -> AnalyzeJobStatus:
+    base_url = os.getenv("BASE_URL", "http://localhost:8000")
+    return AnalyzeJobStatus(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"{base_url}/analyze/jobs/{job.id}",
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        analysis_id=job.analysis_id,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error
+    )
+
+
+@app.post("/analyze/jobs", response_model=AnalyzeJobStatus, status_code=202)
+async def submit_analysis_job(
+    request: AnalyzeJobRequest,
+    db: AsyncSession = Depends(get_async_db),
+    manager: AnalysisJobManager = Depends(get_job_manager)
+):
+    """
+    비동기 분석 작업 접수
+    
+    즉시 job_id를 반환하고, 분석은 백그라운드 워커가 수행한다.
+    결과는 GET /analyze/jobs/{job_id} 로 조회
+    """
+    job = await manager.submit(
+        db,
+        payload=request.model_dump(exclude={"deadline_seconds"}),
+        deadline_seconds=request.deadline_seconds
+    )
+    return _job_status(job)
+
+
+@app.get("/analyze/jobs/{job_id}", response_model=AnalyzeJobStatus)
+async def get_analysis_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """비동기 분석 작업 상태/결과 조회"""
+    job = await db.get(AnalysisJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
+    return _job_status(job)
+
+
+@app.get("/history/{analysis_id}/log")
+async def get_analysis_log(
+    analysis_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """분석 이력의 원본 CI 로그 조회 (요청 시에만 압축 해제)"""
+    await history_writer.sync()
+    history = await db.get(AnalysisHistory, analysis_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="분석 이력을 찾을 수 없습니다.")
+    
+    ci_log = await load_log(db, history)
+    if ci_log is None:
+        raise HTTPException(status_code=404, detail="저장된 로그가 없습니다.")
+    return PlainTextResponse(ci_log)
+
+
 @app.get("/approve/{token}")
 async def approve_kb_save(
     token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     이메일에서 승인 링크 클릭 시 호출
@@ -263,7 +605,7 @@ async def approve_kb_save(
     """
     # 토큰 검증
     try:
-        payload = verify_approval_token(token)
+        payload = verify_signed_token(token)
         
         if payload is None:
             return HTMLResponse(
@@ -285,17 +627,15 @@ async def approve_kb_save(
             status_code=400
         )
     
+    await history_writer.sync()  # write-behind 저장 대기 중인 항목 반영
     # 승인 대기 항목 조회
-    pending = db.query(PendingApproval).filter(
-        PendingApproval.id == payload["pending_approval_id"]
-    ).first()
+    pending = await db.get(PendingApproval, payload["pending_approval_id"])
     
     if not pending:
         raise HTTPException(status_code=404, detail="승인 대기 항목을 찾을 수 없습니다.")
     
     # 이미 처리된 경우
     if pending.approval_status != "pending":
-        from fastapi.responses import HTMLResponse
         return HTMLResponse(content=f"""
         <html>
         <body style="font-family: Arial; text-align: center; padding: 50px;">
@@ -309,8 +649,7 @@ async def approve_kb_save(
     # 만료 확인
     if datetime.utcnow() > pending.token_expires_at:
         pending.approval_status = "expired"
-        db.commit()
-        from fastapi.responses import HTMLResponse
+        await db.commit()
         return HTMLResponse(content="""
         <html>
         <body style="font-family: Arial; text-align: center; padding: 50px;">
@@ -338,10 +677,13 @@ async def approve_kb_save(
     pending.approved_by = payload.get("admin_email", "admin")
     pending.approved_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(kb_entry)
+    await db.commit()
+    
+    # 승인된 KB 항목이 대체하는 LLM 분석 캐시 삭제
+    history = await db.get(AnalysisHistory, pending.analysis_id)
+    if history is not None and history.symptoms:
+        await llm_analysis_cache.clear_superseded(history.error_type, json.loads(history.symptoms))
     
-    from fastapi.responses import HTMLResponse
     return HTMLResponse(content=f"""
     <html>
     <head>
@@ -383,7 +725,7 @@ async def modify_before_approve(
     수정 페이지 표시 (이메일에서 수정 링크 클릭 시)
     """
     try:
-        payload = verify_approval_token(token)
+        payload = verify_signed_token(token)
         
         if payload is None:
             from fastapi.responses import HTMLResponse
@@ -408,6 +750,7 @@ async def modify_before_approve(
             status_code=400
         )
     
+    await history_writer.sync()  # write-behind 저장 대기 중인 항목 반영
     pending = db.query(PendingApproval).filter(
         PendingApproval.id == payload["pending_approval_id"]
     ).first()
@@ -500,7 +843,7 @@ async def save_modification(
 ):
     """수정 내용 저장 (내부 API)"""
     try:
-        payload = verify_approval_token(token)
+        payload = verify_signed_token(token)
         
         if payload is None:
             raise HTTPException(status_code=400, detail="유효하지 않은 토큰")
@@ -515,6 +858,7 @@ async def save_modification(
         print(f"⚠️ 토큰 검증 중 오류: {e}")
         raise HTTPException(status_code=400, detail="토큰 검증 중 오류가 발생했습니다.")
     
+    await history_writer.sync()  # write-behind 저장 대기 중인 항목 반영
     pending = db.query(PendingApproval).filter(
         PendingApproval.id == payload["pending_approval_id"]
     ).first()
@@ -538,16 +882,18 @@ async def list_kb(
     skip: int = 0,
     limit: int = 100,
     error_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """KB 목록 조회"""
-    query = db.query(KnowledgeBase).filter(KnowledgeBase.is_approved == True)
+    query = select(KnowledgeBase).where(KnowledgeBase.is_approved == True)
     
     if error_type:
-        query = query.filter(KnowledgeBase.error_type == error_type)
+        query = query.where(KnowledgeBase.error_type == error_type)
     
-    total = query.count()
-    entries = query.order_by(KnowledgeBase.created_at.desc()).offset(skip).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    entries = (await db.scalars(
+        query.order_by(KnowledgeBase.created_at.desc()).offset(skip).limit(limit)
+    )).all()
     
     return {
         "total": total,
@@ -567,27 +913,52 @@ async def list_kb(
     }
 
 
+@app.get("/llm-cache")
+async def list_llm_cache(skip: int = 0, limit: int = 100):
+    """LLM 분석 캐시 목록 조회"""
+    return await llm_analysis_cache.list_entries(skip=skip, limit=limit)
+
+
+@app.delete("/llm-cache/{entry_id}")
+async def delete_llm_cache_entry(entry_id: int):
+    """LLM 분석 캐시 항목 무효화"""
+    deleted = await llm_analysis_cache.invalidate(entry_id=entry_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="캐시 항목을 찾을 수 없습니다.")
+    return {"status": "success", "deleted": deleted}
+
+
+@app.delete("/llm-cache")
+async def clear_llm_cache(error_type: Optional[str] = None):
+    """LLM 분석 캐시 무효화 (error_type 지정 시 해당 타입만)"""
+    deleted = await llm_analysis_cache.invalidate(error_type=error_type)
+    return {"status": "success", "deleted": deleted}
+
+
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """상세 헬스 체크"""
     try:
-        kb_count = db.query(KnowledgeBase).count()
-        analysis_count = db.query(AnalysisHistory).count()
-        pending_count = db.query(PendingApproval).filter(
-            PendingApproval.approval_status == "pending"
-        ).count()
+        # 세 개의 count를 스칼라 서브쿼리로 묶어 한 번의 왕복으로 조회
+        counts = (await db.execute(select(
+            select(func.count()).select_from(KnowledgeBase).scalar_subquery(),
+            select(func.count()).select_from(AnalysisHistory).scalar_subquery(),
+            select(func.count()).select_from(PendingApproval).where(
+                PendingApproval.approval_status == "pending"
+            ).scalar_subquery()
+        ))).one()
+        kb_count, analysis_count, pending_count = counts
         
         return {
             "status": "healthy",
             "database": "connected",
             "kb_entries": kb_count,
             "analysis_history": analysis_count,
-            "pending_approvals": pending_count
+            "pending_approvals": pending_count,
+            "llm_endpoints": analysis_engine.llm.endpoints.status()
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "error": str(e)
         }
-
-
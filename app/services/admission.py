@@ -0,0 +1,136 @@
+"""
+LLM 호출 승인 제어 (repository / job_name 별 토큰 버킷)
+
+한 저장소의 불안정한 nightly 빌드가 공용 LLM 할당량을 소진하지 않도록
+LLM 호출 전에 repository 버킷과 job_name 버킷에서 토큰을 하나씩 꺼낸다.
+둘 중 하나라도 비어 있으면 호출하지 않고 KB 결과만으로 응답한다.
+
+기존 CI 호출자의 응답이 바뀌지 않도록 기본은 꺼져 있다 (LLM_ADMISSION_ENABLED=true로 사용).
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.services.metrics import metrics
+
+
+LLM_ADMISSION_ENABLED = os.getenv("LLM_ADMISSION_ENABLED", "false").lower() == "true"
+
+# 기본 버킷 설정 (분당 보충 토큰 수 / 최대 토큰 수)
+LLM_ADMISSION_REPO_RATE_PER_MIN = float(os.getenv("LLM_ADMISSION_REPO_RATE_PER_MIN", "30"))
+LLM_ADMISSION_REPO_BURST = float(os.getenv("LLM_ADMISSION_REPO_BURST", "10"))
+LLM_ADMISSION_JOB_RATE_PER_MIN = float(os.getenv("LLM_ADMISSION_JOB_RATE_PER_MIN", "10"))
+LLM_ADMISSION_JOB_BURST = float(os.getenv("LLM_ADMISSION_JOB_BURST", "5"))
+
+# 버킷별 설정, 예: {"repository:nightly-repo": {"rate_per_min": 5, "burst": 2}}
+LLM_ADMISSION_OVERRIDES = os.getenv("LLM_ADMISSION_OVERRIDES", "")
+
+# 유지할 최대 버킷 수 (오래 쓰이지 않은 버킷부터 제거)
+MAX_BUCKETS = 10000
+
+ADMISSION_DECISIONS = metrics.counter("llm_admission_total", "LLM 호출 승인 결과 (버킷별 admitted/rejected)")
+ADMISSION_TOKENS = metrics.gauge("llm_admission_tokens", "버킷별 남은 토큰 수")
+
+
+class TokenBucket:
+    """초당 rate 개씩 최대 burst 개까지 보충되는 토큰 버킷"""
+
+    def __init__(self, rate_per_min: float, burst: float):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def refill(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self.tokens
+
+
+class AdmissionController:
+    """
+    repository / job_name 토큰 버킷 묶음
+
+    Args:
+        repo_limits: repository 버킷 기본값 (rate_per_min, burst)
+        job_limits: job_name 버킷 기본값 (rate_per_min, burst)
+        overrides: "repository:<이름>" 또는 "job_name:<이름>" 별 (rate_per_min, burst)
+    """
+
+    def __init__(
+        self,
+        repo_limits: Tuple[float, float],
+        job_limits: Tuple[float, float],
+        overrides: Optional[Dict[str, Tuple[float, float]]] = None,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.defaults = {"repository": repo_limits, "job_name": job_limits}
+        self.overrides = overrides or {}
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            kind = key.split(":", 1)[0]
+            bucket = TokenBucket(*self.overrides.get(key, self.defaults[kind]))
+            self._buckets[key] = bucket
+            while len(self._buckets) > MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def admit(self, repository: Optional[str], job_name: Optional[str]) -> bool:
+        """
+        LLM 호출 허용 여부 (허용되면 해당 버킷들에서 토큰 1개씩 차감)
+
+        repository/job_name이 없는 요청은 그 종류의 버킷 검사를 생략한다.
+        """
+        if not self.enabled:
+            return True
+
+        keys: List[str] = []
+        if repository:
+            keys.append(f"repository:{repository}")
+        if job_name:
+            keys.append(f"job_name:{job_name}")
+
+        with self._lock:
+            buckets = [(key, self._bucket(key)) for key in keys]
+            admitted = all(bucket.refill() >= 1 for _, bucket in buckets)
+            for key, bucket in buckets:
+                if admitted:
+                    bucket.tokens -= 1
+                ADMISSION_TOKENS.set(bucket.tokens, bucket=key)
+
+        for key, _ in buckets:
+            ADMISSION_DECISIONS.inc(bucket=key, result="admitted" if admitted else "rejected")
+        return admitted
+
+
+def _parse_overrides(raw: str) -> Dict[str, Tuple[float, float]]:
+    if not raw:
+        return {}
+    try:
+        return {
+            key: (float(value["rate_per_min"]), float(value["burst"]))
+            for key, value in json.loads(raw).items()
+        }
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"⚠️ LLM_ADMISSION_OVERRIDES 형식 오류, 무시: {e}")
+        return {}
+
+
+# 전역 인스턴스
+admission_controller = AdmissionController(
+    repo_limits=(LLM_ADMISSION_REPO_RATE_PER_MIN, LLM_ADMISSION_REPO_BURST),
+    job_limits=(LLM_ADMISSION_JOB_RATE_PER_MIN, LLM_ADMISSION_JOB_BURST),
+    overrides=_parse_overrides(LLM_ADMISSION_OVERRIDES),
+    enabled=LLM_ADMISSION_ENABLED
+)
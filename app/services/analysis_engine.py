@@ -0,0 +1,579 @@
+"""
+애플리케이션 범위 분석 엔진
+
+요청마다 CIErrorAnalyzer를 만들고 그래프를 컴파일하던 작업을
+앱 lifespan 시작 시 한 번만 수행하고, 준비가 끝나면 ready 상태가 된다.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.connection import AsyncSessionLocal, init_db
+from app.db.models import AnalysisHistory
+from app.graph.workflow import CIErrorAnalyzer, get_ci_analyzer
+from app.kb.db import ensure_initialized, load_index, search_kb, search_kb_batch
+from app.services.admission import AdmissionController, admission_controller
+from app.services.llm_cache import LLMAnalysisCacheStore, llm_analysis_cache
+from app.services.llm_client import LLMClient, llm_client
+from app.services.llm_scheduler import LLMScheduler, llm_scheduler
+from app.services.llm_usage import LLMCallTimer, record_llm_usage
+from app.services.log_ingest import IngestedLog
+from app.services.metrics import metrics
+from app.services.singleflight import SingleFlight
+from app.services.worker_pool import BoundedWorkerPool, analysis_pool
+from app.utils.log_compress import compress_for_prompt
+from app.utils.text import extract_symptoms, log_fingerprint, symptom_fingerprint
+
+
+# 배치 분석 시 동시 LLM 호출 수
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+
+# 같은 로그 지문의 완료된 분석 결과를 재사용할 기간 (0이면 비활성화)
+ANALYSIS_REUSE_WINDOW_SECONDS = int(os.getenv("ANALYSIS_REUSE_WINDOW_SECONDS", "300"))
+
+# 재사용 가능한 분석 상태 (실패한 분석은 재사용하지 않음)
+REUSABLE_STATUSES = ("kb_analyzed", "llm_analyzed", "llm_cached")
+
+# LLM 프롬프트에 넣기 전 로그 압축 (중복 줄/긴 스택 트레이스/진행률 잡음 제거)
+LLM_LOG_COMPRESSION = os.getenv("LLM_LOG_COMPRESSION", "true").lower() == "true"
+
+ANALYSIS_REUSED = metrics.counter("analysis_reused_total", "분석 이력에서 재사용된 결과 수")
+PROMPT_LOG_CHARS = metrics.counter("llm_prompt_log_chars_total", "LLM 프롬프트용 로그 글자 수 (압축 전 raw / 후 compressed)")
+
+# 워밍업용 합성 로그 (DB에 저장하지 않음)
+WARMUP_CI_LOG = """
+Tasking C166 Compiler Error:
+main.c(45): error: code generation failed
+Build failed with exit code 1
+"""
+
+
+def build_kb_analysis(best_hit: Dict[str, Any]) -> str:
+    """KB 결과 기반 분석 텍스트"""
+    return f"""KB에서 유사한 사례를 찾았습니다:
+
+**문제 유형**: {best_hit['title']}
+**해결 방법**: {best_hit['fix']}
+
+추가 참고사항:
+{best_hit['summary']}
+
+이 해결책을 적용해보시고, 문제가 지속되면 추가 로그를 제공해주세요."""
+
+
+def build_failed_analysis(symptoms: List[str], error_type: str, detail: str) -> str:
+    """KB/LLM 모두 실패했을 때의 분석 텍스트"""
+    return f"""KB에서 해당 오류에 대한 해결책을 찾지 못했고, LLM 분석도 실패했습니다.
+
+**추출된 증상**:
+{chr(10).join(f"- {symptom}" for symptom in symptoms[:5])}
+
+**오류 유형**: {error_type}
+
+**오류**: {detail}
+
+개발팀에 문의하거나 추가 컨텍스트를 제공해주세요."""
+
+
+def build_degraded_analysis(kb_hits: List[Dict[str, Any]], symptoms: List[str], error_type: str) -> str:
+    """LLM 호출 한도 초과 시 KB 결과만으로 만든 분석 텍스트"""
+    if kb_hits:
+        best_hit = kb_hits[0]
+        kb_part = f"""**가장 유사한 KB 사례**: {best_hit['title']}
+**해결 방법**: {best_hit['fix']}"""
+    else:
+        kb_part = "KB에서 유사한 사례를 찾지 못했습니다."
+
+    return f"""이 저장소/작업의 LLM 분석 요청 한도를 초과하여 KB 결과만 제공합니다.
+
+{kb_part}
+
+**추출된 증상**:
+{chr(10).join(f"- {symptom}" for symptom in symptoms[:5])}
+
+**오류 유형**: {error_type}
+
+잠시 후 다시 분석을 요청하면 LLM 분석을 받을 수 있습니다."""
+
+
+class AnalysisEngine:
+    """CI 오류 분석 엔진 (앱 lifespan 동안 한 개만 유지)"""
+
+    def __init__(
+        self,
+        llm: Optional[LLMClient] = None,
+        pool: Optional[BoundedWorkerPool] = None,
+        admission: Optional[AdmissionController] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        cache: Optional[LLMAnalysisCacheStore] = None
+    ):
+        self.llm = llm or llm_client
+        self.pool = pool or analysis_pool
+        self.admission = admission or admission_controller
+        self.scheduler = scheduler or llm_scheduler
+        self.cache = cache or llm_analysis_cache
+        self.analyzer: Optional[CIErrorAnalyzer] = None
+        self.workflow = None
+        self.ready = False
+        self._startup_lock = asyncio.Lock()
+        self._inflight = SingleFlight("analysis")
+
+    async def startup(self) -> None:
+        """
+        DB/KB 초기화, 검색 인덱스 로드, 그래프 컴파일, LLM 연결 수립 후
+        합성 요청으로 워밍업한다. 완료되면 ready = True
+        """
+        async with self._startup_lock:
+            if self.ready:
+                return
+
+            init_db()
+            ensure_initialized()
+            load_index()
+
+            self.analyzer = get_ci_analyzer()
+            self.workflow = self.analyzer.get_workflow()
+
+            await self.llm.startup()
+            self._warm_up()
+
+            self.ready = True
+
+    async def shutdown(self) -> None:
+        """외부 연결 정리"""
+        self.ready = False
+        await self.llm.aclose()
+        self.pool.shutdown()
+
+    def _warm_up(self) -> None:
+        """합성 로그로 증상 추출 → 분류 → KB 검색 → 그래프 실행을 한 번 수행"""
+        symptoms = extract_symptoms(WARMUP_CI_LOG)
+        self.analyzer._classify_error_type(symptoms)
+        search_kb(query="\n".join(symptoms), top_k=5)
+        self.workflow.invoke({
+            "ci_log": WARMUP_CI_LOG,
+            "context": "",
+            "repository": "",
+            "symptoms": [],
+            "kb_hits": [],
+            "web_hits": [],
+            "security_status": "web_disabled",
+            "kb_confidence": 0.0,
+            "analysis": "",
+            "confidence": 0.0,
+            "error_type": "unknown"
+        })
+
+    def _extract(self, ci_log: str) -> Tuple[List[str], str]:
+        """증상 추출 + 오류 타입 분류 (워커 풀에서 실행)"""
+        symptoms = extract_symptoms(ci_log)
+        return symptoms, self.analyzer._classify_error_type(symptoms)
+
+    def _extract_with_fingerprint(self, ci_log: str) -> Tuple[List[str], str, str]:
+        """증상 추출 + 분류 + 로그 지문 (워커 풀에서 실행)"""
+        symptoms, error_type = self._extract(ci_log)
+        return symptoms, error_type, log_fingerprint(ci_log)
+
+    def _search(self, symptoms: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+        """KB 검색 + 신뢰도 계산 (워커 풀에서 실행)"""
+        kb_hits = search_kb(query="\n".join(symptoms), top_k=5)
+        return kb_hits, self.analyzer._calculate_kb_confidence(kb_hits)
+
+    def _search_many(self, symptom_lists: List[List[str]]) -> List[Tuple[List[Dict[str, Any]], float]]:
+        """여러 증상 목록을 한 번의 배치 KB 검색으로 처리 (워커 풀에서 실행)"""
+        all_hits = search_kb_batch(["\n".join(symptoms) for symptoms in symptom_lists], top_k=5)
+        return [(hits, self.analyzer._calculate_kb_confidence(hits)) for hits in all_hits]
+
+    async def _complete(
+        self,
+        result: Dict[str, Any],
+        ci_log: str,
+        context: Optional[str],
+        repository: Optional[str],
+        job_name: Optional[str] = None,
+        priority: float = 0.0
+    ) -> Dict[str, Any]:
+        """KB 검색 결과에 따라 KB 답변 또는 LLM 분석으로 결과 완성"""
+        symptoms = result["symptoms"]
+        error_type = result["error_type"]
+
+        if result["kb_confidence"] >= 0.8:
+            # KB에서 충분한 답을 찾음
+            result.update({
+                "security_status": "kb_analyzed",
+                "analysis": build_kb_analysis(result["kb_hits"][0]),
+                "confidence": result["kb_confidence"]
+            })
+            return result
+
+        # 같은/유사한 증상의 LLM 분석이 캐시에 있으면 재사용
+        cached = await self.cache.lookup(error_type, symptoms)
+        if cached is not None:
+            return self._from_cache(result, cached)
+
+        # 저장소/작업별 LLM 호출 한도 초과 - KB 결과만으로 응답
+        if not self.admission.admit(repository, job_name):
+            return self._degrade(result)
+
+        # KB에서 답을 찾지 못함 - 우선순위 슬롯을 받아 LLM 분석 호출
+        prompt_log = await self._prompt_log(ci_log)
+        timer = LLMCallTimer()
+        try:
+            async with self.scheduler.slot(priority):
+                timer.started()
+                llm_result = await self.llm.call_llm_analysis(
+                    ci_log=prompt_log,
+                    symptoms=symptoms,
+                    error_type=error_type,
+                    context=context,
+                    repository=repository
+                )
+                usage = timer.finish(llm_result)
+            record_llm_usage(usage, error_type, repository)
+            result.update({
+                "security_status": "llm_analyzed",
+                "analysis": llm_result["analysis"],
+                "confidence": llm_result["confidence"],
+                "llm_usage": usage
+            })
+            await self.cache.store(error_type, symptoms, llm_result["analysis"], llm_result["confidence"])
+        except HTTPException as e:
+            # LLM 호출 실패 - fallback 분석
+            result.update({
+                "security_status": "analysis_failed",
+                "analysis": build_failed_analysis(symptoms, error_type, e.detail),
+                "confidence": 0.1
+            })
+
+        return result
+
+    async def _prompt_log(self, ci_log: str) -> str:
+        """LLM에 보낼 로그 (압축은 워커 풀에서 실행)"""
+        if not LLM_LOG_COMPRESSION:
+            return ci_log
+        prompt_log = await self.pool.run(compress_for_prompt, ci_log)
+        PROMPT_LOG_CHARS.inc(len(ci_log), stage="raw")
+        PROMPT_LOG_CHARS.inc(len(prompt_log), stage="compressed")
+        return prompt_log
+
+    def _from_cache(self, result: Dict[str, Any], cached: Dict[str, Any]) -> Dict[str, Any]:
+        result.update({
+            "security_status": "llm_cached",
+            "analysis": cached["analysis"],
+            "confidence": cached["confidence"]
+        })
+        return result
+
+    def _degrade(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        result.update({
+            "security_status": "kb_degraded",
+            "analysis": build_degraded_analysis(result["kb_hits"], result["symptoms"], result["error_type"]),
+            "confidence": result["kb_confidence"]
+        })
+        return result
+
+    async def analyze(
+        self,
+        ci_log: str,
+        context: Optional[str] = None,
+        repository: Optional[str] = None,
+        job_name: Optional[str] = None,
+        priority: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        CI 오류 분석 (KB 우선, 필요시 LLM 호출)
+
+        Returns:
+            Dict: symptoms, kb_hits, web_hits, security_status,
+                  kb_confidence, analysis, confidence, error_type
+
+        Raises:
+            PoolSaturatedError: 워커 풀 대기열이 가득 찬 경우
+        """
+        # 1. 증상 추출 (CPU 바운드 - 워커 풀에서 실행)
+        symptoms, error_type = await self.pool.run(self._extract, ci_log)
+        return await self._analyze_extracted(symptoms, error_type, ci_log, context, repository, job_name, priority)
+
+    async def _analyze_extracted(
+        self,
+        symptoms: List[str],
+        error_type: str,
+        ci_log: str,
+        context: Optional[str],
+        repository: Optional[str],
+        job_name: Optional[str] = None,
+        priority: float = 0.0
+    ) -> Dict[str, Any]:
+        """추출된 증상으로 KB 검색 후 결과 완성"""
+        # 2. KB 검색 (워커 풀에서 실행)
+        kb_hits, kb_confidence = await self.pool.run(self._search, symptoms)
+
+        result = {
+            "symptoms": symptoms,
+            "kb_hits": kb_hits,
+            "web_hits": [],
+            "kb_confidence": kb_confidence,
+            "error_type": error_type
+        }
+
+        # 3. KB 결과 또는 LLM 분석
+        return await self._complete(result, ci_log, context, repository, job_name, priority)
+
+    async def analyze_shared(
+        self,
+        ci_log: str,
+        context: Optional[str] = None,
+        repository: Optional[str] = None,
+        job_name: Optional[str] = None,
+        priority: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        동일/템플릿 동일 로그의 분석을 공유하는 analyze()
+
+        1. 정규화된 로그 지문이 같은 동시 요청은 진행 중인 한 번의 분석을 함께 기다림 (singleflight)
+        2. 재사용 기간 안에 완료된 같은 지문의 분석 이력이 있으면 그 결과를 재사용
+
+        결과에는 log_fingerprint가 포함되며, 호출자마다 별도의 사본을 받는다.
+        """
+        fingerprint = await self.pool.run(log_fingerprint, ci_log)
+        return await self._shared(
+            fingerprint,
+            lambda: self.analyze(
+                ci_log=ci_log, context=context, repository=repository, job_name=job_name, priority=priority
+            )
+        )
+
+    async def analyze_ingested(
+        self,
+        ingested: IngestedLog,
+        context: Optional[str] = None,
+        repository: Optional[str] = None,
+        job_name: Optional[str] = None,
+        priority: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        스트리밍 수집된 로그 분석 (analyze_shared()와 같은 공유/재사용 적용)
+
+        증상과 지문은 수집 중에 계산되어 있으므로 KB 검색부터 시작하고,
+        LLM에는 원본 대신 head/tail 발췌를 전달한다.
+        """
+        async def analyze() -> Dict[str, Any]:
+            error_type = await self.pool.run(self.analyzer._classify_error_type, ingested.symptoms)
+            return await self._analyze_extracted(
+                ingested.symptoms, error_type, ingested.excerpt, context, repository, job_name, priority
+            )
+
+        return await self._shared(ingested.fingerprint, analyze)
+
+    async def _shared(self, fingerprint: str, analyze: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """지문 기준 singleflight + 최근 결과 재사용"""
+        async def run() -> Dict[str, Any]:
+            reused = await self._find_reusable(fingerprint)
+            if reused is not None:
+                ANALYSIS_REUSED.inc()
+                return reused
+            return await analyze()
+
+        result, joined = await self._inflight.do(fingerprint, run)
+        result = dict(result)
+        result["log_fingerprint"] = fingerprint
+        if joined:
+            # LLM 사용량은 실제로 호출한 요청의 이력에만 기록
+            result.pop("llm_usage", None)
+        return result
+
+    async def analyze_stream(
+        self,
+        ci_log: str,
+        context: Optional[str] = None,
+        repository: Optional[str] = None,
+        job_name: Optional[str] = None,
+        priority: float = 0.0
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        analyze()의 스트리밍 버전
+
+        Yields:
+            ("kb", {...})      증상/오류 타입/KB 검색 결과 (LLM 호출 전)
+            ("token", {...})   LLM이 생성한 텍스트 조각 (KB 답변/재사용 결과는 한 번에)
+            ("result", {...})  analyze_shared()와 같은 형태의 최종 결과
+        """
+        symptoms, error_type, fingerprint = await self.pool.run(self._extract_with_fingerprint, ci_log)
+        kb_hits, kb_confidence = await self.pool.run(self._search, symptoms)
+        result = {
+            "symptoms": symptoms,
+            "kb_hits": kb_hits,
+            "web_hits": [],
+            "kb_confidence": kb_confidence,
+            "error_type": error_type
+        }
+        yield "kb", dict(result)
+
+        reused = await self._find_reusable(fingerprint)
+        cached = None
+        if reused is None and kb_confidence < 0.8:
+            cached = await self.cache.lookup(error_type, symptoms)
+
+        if reused is not None:
+            ANALYSIS_REUSED.inc()
+            result.update({k: reused[k] for k in ("security_status", "analysis", "confidence")})
+        elif kb_confidence >= 0.8:
+            result.update({
+                "security_status": "kb_analyzed",
+                "analysis": build_kb_analysis(kb_hits[0]),
+                "confidence": kb_confidence
+            })
+        elif cached is not None:
+            self._from_cache(result, cached)
+        elif not self.admission.admit(repository, job_name):
+            self._degrade(result)
+        else:
+            prompt_log = await self._prompt_log(ci_log)
+            timer = LLMCallTimer()
+            try:
+                async with self.scheduler.slot(priority):
+                    timer.started()
+                    async for event in self.llm.stream_llm_analysis(
+                        ci_log=prompt_log,
+                        symptoms=symptoms,
+                        error_type=error_type,
+                        context=context,
+                        repository=repository
+                    ):
+                        if event["type"] == "token":
+                            timer.first_token()
+                            yield "token", {"text": event["text"]}
+                        else:
+                            result.update({
+                                "security_status": "llm_analyzed",
+                                "analysis": event["analysis"],
+                                "confidence": event["confidence"],
+                                "llm_usage": timer.finish(event)
+                            })
+                if result.get("security_status") == "llm_analyzed":
+                    record_llm_usage(result["llm_usage"], error_type, repository)
+                    await self.cache.store(error_type, symptoms, result["analysis"], result["confidence"])
+            except HTTPException as e:
+                result.update({
+                    "security_status": "analysis_failed",
+                    "analysis": build_failed_analysis(symptoms, error_type, e.detail),
+                    "confidence": 0.1
+                })
+
+        if result["security_status"] != "llm_analyzed":
+            yield "token", {"text": result["analysis"]}
+        result["log_fingerprint"] = fingerprint
+        yield "result", result
+
+    async def _find_reusable(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """재사용 기간 내 같은 지문의 완료된 분석 이력 조회"""
+        if ANALYSIS_REUSE_WINDOW_SECONDS <= 0:
+            return None
+
+        since = datetime.utcnow() - timedelta(seconds=ANALYSIS_REUSE_WINDOW_SECONDS)
+        async with AsyncSessionLocal() as db:
+            history = await db.scalar(
+                select(AnalysisHistory)
+                .where(
+                    AnalysisHistory.log_fingerprint == fingerprint,
+                    AnalysisHistory.created_at >= since,
+                    AnalysisHistory.security_status.in_(REUSABLE_STATUSES)
+                )
+                .order_by(AnalysisHistory.created_at.desc())
+                .limit(1)
+            )
+        if history is None:
+            return None
+
+        return {
+            "symptoms": json.loads(history.symptoms) if history.symptoms else [],
+            "kb_hits": [],
+            "web_hits": [],
+            "security_status": history.security_status,
+            "kb_confidence": history.kb_confidence,
+            "analysis": history.analysis,
+            "confidence": history.confidence,
+            "error_type": history.error_type
+        }
+
+    async def analyze_batch(self, requests: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        여러 CI 오류를 한 번에 분석 (매트릭스 빌드용)
+
+        1. 증상 추출을 워커 풀에서 병렬 실행
+        2. 모든 쿼리를 한 번의 배치 KB 검색으로 처리
+        3. 증상 지문이 같은 요청은 한 번만 분석 (LLM 호출 중복 제거)
+        4. LLM 호출은 LLM_BATCH_CONCURRENCY 개까지만 동시 실행
+
+        Args:
+            requests: ci_log, context, repository, job_name 속성을 가진 요청 목록
+                      (priority, branch, build_number가 있으면 LLM 슬롯 우선순위에 반영)
+
+        Returns:
+            List[Dict]: 요청 순서대로 analyze()와 같은 형태의 결과
+        """
+        # 대기열을 넘치지 않도록 워커 수만큼만 동시에 제출
+        extract_slots = asyncio.Semaphore(self.pool.max_workers)
+
+        async def extract(ci_log: str) -> Tuple[List[str], str, str]:
+            async with extract_slots:
+                return await self.pool.run(self._extract_with_fingerprint, ci_log)
+
+        extracted = await asyncio.gather(*(extract(r.ci_log) for r in requests))
+        searched = await self.pool.run(self._search_many, [symptoms for symptoms, _, _ in extracted])
+
+        results: List[Dict[str, Any]] = []
+        groups: Dict[str, List[int]] = {}
+        for i, ((symptoms, error_type, fingerprint), (kb_hits, kb_confidence)) in enumerate(zip(extracted, searched)):
+            results.append({
+                "symptoms": symptoms,
+                "kb_hits": kb_hits,
+                "web_hits": [],
+                "kb_confidence": kb_confidence,
+                "error_type": error_type,
+                "log_fingerprint": fingerprint
+            })
+            groups.setdefault(symptom_fingerprint(error_type, symptoms), []).append(i)
+
+        llm_slots = asyncio.Semaphore(LLM_BATCH_CONCURRENCY)
+
+        async def complete_group(indices: List[int]) -> None:
+            # 그룹의 첫 요청으로 분석하고 같은 지문의 나머지 요청에 결과 공유
+            first = requests[indices[0]]
+            async with llm_slots:
+                shared = await self._complete(
+                    dict(results[indices[0]]), first.ci_log, first.context, first.repository, first.job_name,
+                    self.scheduler.priority_for(first)
+                )
+            for i in indices:
+                results[i].update({
+                    "security_status": shared["security_status"],
+                    "analysis": shared["analysis"],
+                    "confidence": shared["confidence"]
+                })
+            # LLM 사용량은 실제로 호출한 첫 요청에만 기록
+            if "llm_usage" in shared:
+                results[indices[0]]["llm_usage"] = shared["llm_usage"]
+
+        await asyncio.gather(*(complete_group(indices) for indices in groups.values()))
+        return results
+
+
+# 전역 인스턴스 (앱 lifespan에서 startup/shutdown)
+analysis_engine = AnalysisEngine()
+
+
+async def get_analysis_engine() -> AnalysisEngine:
+    """
+    FastAPI 의존성: 준비된 분석 엔진 반환
+
+    lifespan 없이 실행된 경우(예: TestClient)에는 최초 요청에서 초기화한다.
+    """
+    if not analysis_engine.ready:
+        await analysis_engine.startup()
+    return analysis_engine
@@ -0,0 +1,145 @@
+"""
+LLM webhook 서킷 브레이커 / 지연 시간 기반 타임아웃
+
+LLM 서버가 죽어 있으면 KB 미스마다 전체 타임아웃을 기다리지 않도록
+연속 실패가 쌓이면 호출을 즉시 거부(open)하고, 일정 시간 뒤 한 번만 시험 호출(half_open)한다.
+타임아웃은 고정값 대신 최근 응답 시간의 p99에 여유 배수를 곱해 정한다.
+"""
+import math
+import os
+import time
+from collections import deque
+from typing import Deque
+
+from app.services.metrics import metrics
+
+
+# 연속 실패 몇 번에 open 할지 / open 후 시험 호출까지 대기 시간
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# 타임아웃 = clamp(최근 응답 시간 p99 × 배수, 최소값, LLM_TIMEOUT_SECONDS)
+LLM_TIMEOUT_P99_MULTIPLIER = float(os.getenv("LLM_TIMEOUT_P99_MULTIPLIER", "2.0"))
+LLM_TIMEOUT_MIN_SECONDS = float(os.getenv("LLM_TIMEOUT_MIN_SECONDS", "5"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+# p99를 믿기 위한 최소 표본 수 (그 전에는 최대 타임아웃 사용)
+MIN_LATENCY_SAMPLES = 20
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# 게이지 값: closed=0, half_open=1, open=2
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = metrics.gauge("llm_circuit_state", "서킷 브레이커 상태 (0=closed, 1=half_open, 2=open)")
+BREAKER_TRANSITIONS = metrics.counter("llm_circuit_transitions_total", "서킷 브레이커 상태 전이 수")
+BREAKER_REJECTED = metrics.counter("llm_circuit_rejected_total", "서킷 브레이커가 open이라 생략된 호출 수")
+CURRENT_TIMEOUT = metrics.gauge("llm_timeout_seconds", "현재 적용 중인 LLM 호출 타임아웃")
+LLM_LATENCY = metrics.histogram("llm_webhook_latency_seconds", "LLM webhook 응답 시간")
+
+
+class CircuitBreaker:
+    """
+    closed → (연속 실패 failure_threshold 회) → open
+    open → (reset_seconds 경과) → half_open: 시험 호출 1개만 허용
+    half_open → 성공 시 closed, 실패 시 다시 open
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        BREAKER_STATE.set(STATE_VALUES[CLOSED], breaker=name)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        print(f"🔌 서킷 브레이커 {self.name}: {self.state} → {state}")
+        self.state = state
+        BREAKER_STATE.set(STATE_VALUES[state], breaker=self.name)
+        BREAKER_TRANSITIONS.inc(breaker=self.name, state=state)
+
+    def available(self) -> bool:
+        """상태를 바꾸지 않고 지금 allow()가 허용할지 확인"""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at >= self.reset_seconds
+        if self.state == HALF_OPEN:
+            return not self._probing
+        return True
+
+    def allow(self) -> bool:
+        """호출 허용 여부 (허용되면 결과를 record_success/record_failure/release 중 하나로 알려야 함)"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._transition(HALF_OPEN)
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        BREAKER_REJECTED.inc(breaker=self.name)
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """결과 없이 끝난 호출 (취소 등) - 시험 호출 자리만 반납"""
+        self._probing = False
+
+
+class AdaptiveTimeout:
+    """최근 응답 시간 창의 p99로 다음 호출 타임아웃 계산"""
+
+    def __init__(
+        self,
+        name: str,
+        max_seconds: float,
+        min_seconds: float = LLM_TIMEOUT_MIN_SECONDS,
+        multiplier: float = LLM_TIMEOUT_P99_MULTIPLIER,
+        window: int = LLM_LATENCY_WINDOW
+    ):
+        self.name = name
+        self.max_seconds = max_seconds
+        self.min_seconds = min(min_seconds, max_seconds)
+        self.multiplier = multiplier
+        self._samples: Deque[float] = deque(maxlen=window)
+        CURRENT_TIMEOUT.set(max_seconds, endpoint=name)
+
+    def record(self, seconds: float) -> None:
+        """
+        응답 시간 기록
+
+        타임아웃된 호출은 타임아웃 값을 기록한다. 서버가 느려지면 p99가 타임아웃까지
+        올라가 다음 타임아웃이 배수만큼 늘어나므로 너무 짧은 타임아웃에 갇히지 않는다.
+        """
+        self._samples.append(seconds)
+        LLM_LATENCY.observe(seconds, endpoint=self.name)
+        CURRENT_TIMEOUT.set(self.current(), endpoint=self.name)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def current(self) -> float:
+        """다음 호출에 적용할 타임아웃 (초)"""
+        if len(self._samples) < MIN_LATENCY_SAMPLES:
+            return self.max_seconds
+        timeout = self.percentile(0.99) * self.multiplier
+        return max(self.min_seconds, min(self.max_seconds, timeout))
@@ -0,0 +1,270 @@
+"""
+분석 이력 write-behind 저장
+
+WRITE_BEHIND=true 이면 /analyze 응답 전에 DB에 쓰지 않는다.
+ID는 미리 확보해 두고(PostgreSQL 시퀀스 prefetch, SQLite는 프로세스 내 카운터)
+로그 blob/분석 이력/승인 대기 행은 백그라운드 writer가 WRITE_BEHIND_FLUSH_MS 마다
+한 트랜잭션으로 일괄 INSERT 한다.
+
+SQLite 카운터는 시작 시점의 max(id) 이후를 프로세스 안에서만 할당하므로
+SQLite에서는 단일 프로세스로 실행할 때만 사용한다.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import func, insert, select, text
+
+from app.db.connection import AsyncSessionLocal
+from app.db.models import AnalysisHistory, PendingApproval
+from app.services.log_store import store_blob
+from app.services.metrics import metrics
+
+
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "false").lower() == "true"
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS", "50"))
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+ID_PREFETCH_SIZE = int(os.getenv("ID_PREFETCH_SIZE", "50"))
+
+# 실패한 배치 재시도 횟수 (초과 시 버림)
+MAX_FLUSH_ATTEMPTS = 3
+
+# 최근 커밋된 로그 해시 (같은 로그의 중복 압축 방지)
+RECENT_BLOBS_SIZE = 1024
+
+WRITE_BEHIND_QUEUE_DEPTH = metrics.gauge("write_behind_queue_depth", "DB 저장 대기 중인 분석 결과 수")
+WRITE_BEHIND_BATCH_SIZE = metrics.histogram(
+    "write_behind_batch_size", "한 번에 저장한 분석 결과 수",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+WRITE_BEHIND_FLUSH_SECONDS = metrics.histogram("write_behind_flush_seconds", "일괄 저장 트랜잭션 시간")
+WRITE_BEHIND_FAILURES = metrics.counter("write_behind_failures_total", "일괄 저장 실패 수 (retried/dropped)")
+
+
+class IdAllocator:
+    """
+    테이블 기본키 미리 확보
+
+    PostgreSQL은 serial 시퀀스에서 block_size 개를 한 번에 nextval 하고,
+    SQLite는 최초 한 번 max(id)를 읽은 뒤 프로세스 내에서 증가시킨다.
+    """
+
+    def __init__(self, model, block_size: int = ID_PREFETCH_SIZE):
+        self.table = model.__table__
+        self.block_size = block_size
+        self._ids: Deque[int] = deque()
+        self._last: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def next_id(self) -> int:
+        async with self._lock:
+            if not self._ids:
+                self._ids.extend(await self._fetch())
+            return self._ids.popleft()
+
+    async def _fetch(self) -> List[int]:
+        if self._last is None:
+            async with AsyncSessionLocal() as db:
+                if db.bind.dialect.name == "postgresql":
+                    rows = await db.execute(
+                        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+                        {"table": self.table.name, "n": self.block_size}
+                    )
+                    return [row[0] for row in rows]
+                self._last = await db.scalar(select(func.max(self.table.c.id))) or 0
+
+        start = self._last + 1
+        self._last += self.block_size
+        return list(range(start, start + self.block_size))
+
+
+@dataclass
+class _WriteItem:
+    history: Dict[str, Any]
+    pending: Optional[Dict[str, Any]] = None
+    blob: Optional[Dict[str, Any]] = None
+    attempts: int = 0
+    # 커밋되면 True, 재시도 횟수를 넘겨 버려지면 False
+    written: Optional[asyncio.Future] = None
+
+
+class HistoryWriter:
+    """
+    분석 결과 일괄 저장기
+
+    Args:
+        enabled: write-behind 사용 여부 (False면 호출자가 직접 트랜잭션으로 저장)
+        flush_interval_ms: 일괄 저장 주기
+        max_batch: 이 개수가 쌓이면 주기를 기다리지 않고 저장
+    """
+
+    def __init__(self, enabled: bool, flush_interval_ms: int, max_batch: int):
+        self.enabled = enabled
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.history_ids = IdAllocator(AnalysisHistory)
+        self.approval_ids = IdAllocator(PendingApproval)
+        self._items: List[_WriteItem] = []
+        self._recent_blobs: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """백그라운드 writer 시작 (비활성화 상태면 아무것도 하지 않음)"""
+        if not self.enabled or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """writer 종료 후 남은 항목 저장"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def has_blob(self, digest: str) -> bool:
+        """최근 커밋된 로그인지 (예약만 된 blob은 버려질 수 있으므로 포함하지 않음)"""
+        if digest in self._recent_blobs:
+            self._recent_blobs.move_to_end(digest)
+            return True
+        return False
+
+    def submit(
+        self,
+        history: Dict[str, Any],
+        pending: Optional[Dict[str, Any]] = None,
+        blob: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        저장 예약 (history/pending에는 미리 확보한 id가 들어 있어야 함)
+
+        blob은 store_blob() 인자 (digest, codec, data, raw_size)
+        """
+        written = asyncio.get_running_loop().create_future()
+        self._items.append(_WriteItem(history=history, pending=pending, blob=blob, written=written))
+        WRITE_BEHIND_QUEUE_DEPTH.set(len(self._items))
+        if len(self._items) >= self.max_batch and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def sync(self) -> None:
+        """예약된 항목을 즉시 저장 (방금 만든 이력을 바로 읽어야 하는 경우)"""
+        if self._items:
+            await self.flush()
+
+    async def wait_written(self, history_id: int) -> None:
+        """
+        해당 이력 행이 커밋될 때까지 저장을 재촉하며 대기 (다른 테이블이 이 ID를 참조하기 전에 사용)
+
+        Raises:
+            RuntimeError: 재시도 횟수를 넘겨 행이 버려진 경우
+        """
+        async with self._flush_lock:
+            # 잠금 안에서 찾으므로 진행 중인 flush가 가져간 항목도 결과가 반영된 뒤에 확인
+            item = next((item for item in self._items if item.history["id"] == history_id), None)
+        if item is None:
+            return
+        while not item.written.done():
+            await self.flush()
+            if not item.written.done():
+                await asyncio.sleep(self.flush_interval)
+        if not item.written.result():
+            raise RuntimeError(f"분석 이력 {history_id} 저장 실패 (재시도 {MAX_FLUSH_ATTEMPTS}회 초과)")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _finish_item(self, item: _WriteItem, written: bool) -> None:
+        """커밋/버림 결과 반영 (blob 해시는 커밋된 뒤에만 중복 제거 대상으로 기억)"""
+        if item.blob is not None:
+            digest = item.blob["digest"]
+            if written:
+                self._recent_blobs[digest] = None
+                self._recent_blobs.move_to_end(digest)
+                while len(self._recent_blobs) > RECENT_BLOBS_SIZE:
+                    self._recent_blobs.popitem(last=False)
+            else:
+                self._recent_blobs.pop(digest, None)
+        if item.written is not None and not item.written.done():
+            item.written.set_result(written)
+
+    async def _write(self, items: List[_WriteItem]) -> None:
+        """항목들을 한 트랜잭션으로 INSERT"""
+        async with AsyncSessionLocal() as db:
+            for blob in {item.blob["digest"]: item.blob for item in items if item.blob}.values():
+                await store_blob(db, **blob)
+            # FK 순서: 이력 → 승인 대기
+            await db.execute(insert(AnalysisHistory), [item.history for item in items])
+            pendings = [item.pending for item in items if item.pending]
+            if pendings:
+                await db.execute(insert(PendingApproval), pendings)
+            await db.commit()
+
+    async def _write_or_split(self, items: List[_WriteItem]) -> List[_WriteItem]:
+        """
+        일괄 저장, 배치가 실패하면 한 건씩 다시 저장
+
+        행 하나(제약 조건 위반 등) 때문에 같은 배치의 정상 행까지 재시도 횟수를 쓰지 않도록
+        커밋된 항목은 바로 완료 처리하고 실패한 항목만 돌려준다.
+        """
+        try:
+            await self._write(items)
+        except Exception as e:
+            if len(items) == 1:
+                print(f"⚠️ 분석 이력 저장 실패 (id={items[0].history['id']}): {e}")
+                return items
+            print(f"⚠️ 분석 이력 일괄 저장 실패 ({len(items)}건), 한 건씩 다시 저장: {e}")
+            failed: List[_WriteItem] = []
+            for item in items:
+                failed.extend(await self._write_or_split([item]))
+            return failed
+        for item in items:
+            self._finish_item(item, written=True)
+        return []
+
+    async def flush(self) -> None:
+        """쌓인 항목을 한 트랜잭션으로 저장 (실패한 항목만 다음 주기에 재시도)"""
+        async with self._flush_lock:
+            items, self._items = self._items, []
+            if not items:
+                return
+
+            started = time.perf_counter()
+            try:
+                failed = await self._write_or_split(items)
+                retry = [item for item in failed if item.attempts + 1 < MAX_FLUSH_ATTEMPTS]
+                for item in failed:
+                    item.attempts += 1
+                    if item.attempts >= MAX_FLUSH_ATTEMPTS:
+                        self._finish_item(item, written=False)
+                dropped = len(failed) - len(retry)
+                if retry:
+                    WRITE_BEHIND_FAILURES.inc(len(retry), result="retried")
+                if dropped:
+                    print(f"⚠️ 분석 이력 {dropped}건 버림 (재시도 {MAX_FLUSH_ATTEMPTS}회 초과)")
+                    WRITE_BEHIND_FAILURES.inc(dropped, result="dropped")
+                self._items[:0] = retry
+                if len(failed) < len(items):
+                    WRITE_BEHIND_BATCH_SIZE.observe(len(items) - len(failed))
+            finally:
+                WRITE_BEHIND_FLUSH_SECONDS.observe(time.perf_counter() - started)
+                WRITE_BEHIND_QUEUE_DEPTH.set(len(self._items))
+
+
+# 전역 인스턴스
+history_writer = HistoryWriter(
+    enabled=WRITE_BEHIND,
+    flush_interval_ms=WRITE_BEHIND_FLUSH_MS,
+    max_batch=WRITE_BEHIND_MAX_BATCH
+)
@@ -0,0 +1,151 @@
+"""
+LLM 서버용 공유 HTTP 클라이언트 (연결 풀)
+
+앱 lifespan 동안 httpx.AsyncClient 하나를 유지하며 연결 풀 크기, keep-alive, HTTP/2를
+환경변수로 설정한다. 풀 사용률과 연결 대기 시간을 메트릭으로 내보내
+LLM 동시 호출 수(LLM_SCHEDULER_SLOTS)에 맞춰 풀 크기를 정할 수 있게 한다.
+"""
+import os
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from app.services.metrics import metrics
+
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+# 풀에서 연결을 얻기까지 최대 대기 시간
+LLM_HTTP_POOL_TIMEOUT = float(os.getenv("LLM_HTTP_POOL_TIMEOUT", "10"))
+# HTTP/2 (h2 패키지 필요, 없으면 HTTP/1.1)
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() == "true"
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+POOL_IN_USE = metrics.gauge("llm_http_pool_in_use", "응답을 받고 있는 LLM HTTP 요청 수")
+POOL_UTILIZATION = metrics.gauge("llm_http_pool_utilization", "LLM HTTP 연결 풀 사용률 (in_use / max_connections)")
+POOL_MAX_CONNECTIONS = metrics.gauge("llm_http_pool_max_connections", "LLM HTTP 연결 풀 최대 연결 수")
+POOL_WAIT_SECONDS = metrics.histogram(
+    "llm_http_pool_wait_seconds", "LLM HTTP 요청이 풀에서 연결을 얻기까지 걸린 시간", buckets=POOL_WAIT_BUCKETS
+)
+POOL_TIMEOUTS = metrics.counter("llm_http_pool_timeouts_total", "풀 대기 시간 초과로 실패한 LLM HTTP 요청 수")
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """응답 본문을 닫을 때 풀 사용 수를 줄이는 스트림 래퍼"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    풀 사용률/대기 시간을 기록하는 transport
+
+    대기 시간은 요청 시작부터 httpcore가 연결을 잡고 첫 trace 이벤트
+    (새 연결 수립 또는 재사용 연결로 헤더 전송)를 낼 때까지로 잰다.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_connections: int):
+        self._transport = transport
+        self.max_connections = max_connections
+        self.in_use = 0
+        POOL_MAX_CONNECTIONS.set(max_connections)
+
+    def _update(self, delta: int) -> None:
+        self.in_use += delta
+        POOL_IN_USE.set(self.in_use)
+        POOL_UTILIZATION.set(self.in_use / self.max_connections if self.max_connections else 0.0)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        acquired = False
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal acquired
+            if not acquired:
+                acquired = True
+                POOL_WAIT_SECONDS.observe(time.monotonic() - started)
+            if outer_trace is not None:
+                await outer_trace(event, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        self._update(1)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            POOL_TIMEOUTS.inc()
+            POOL_WAIT_SECONDS.observe(time.monotonic() - started)
+            self._update(-1)
+            raise
+        except BaseException:
+            self._update(-1)
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, lambda: self._update(-1)),
+            extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_llm_http_client(
+    timeout: float,
+    max_connections: int = LLM_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections: int = LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = LLM_HTTP_KEEPALIVE_EXPIRY,
+    http2: bool = LLM_HTTP2,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> httpx.AsyncClient:
+    """
+    연결 풀 설정과 풀 메트릭이 적용된 LLM 서버용 AsyncClient 생성
+
+    transport를 주면(테스트용) 연결 풀 대신 그 transport를 계측한다.
+    """
+    if http2 and not _http2_available():
+        print("⚠️ LLM_HTTP2=true 이지만 h2 패키지가 없어 HTTP/1.1 사용")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+
+    return httpx.AsyncClient(
+        transport=InstrumentedTransport(transport, max_connections),
+        timeout=httpx.Timeout(timeout, pool=LLM_HTTP_POOL_TIMEOUT),
+        limits=limits,
+        http2=http2
+    )
@@ -0,0 +1,201 @@
+"""
+비동기 분석 작업 관리자
+
+POST /analyze/jobs 로 접수된 작업을 DB에 저장하고
+프로세스 내 워커들이 동시성 제한과 작업별 마감 시간 안에서 실행한다.
+재시작 시 queued/running 상태의 작업을 다시 대기열에 넣는다.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.connection import AsyncSessionLocal
+from app.db.models import AnalysisJob
+from app.services.metrics import metrics
+from app.services.worker_pool import PoolSaturatedError
+
+
+JOB_QUEUE_DEPTH = metrics.gauge("analysis_jobs_queue_depth", "실행 대기 중인 분석 작업 수")
+JOB_RUNNING = metrics.gauge("analysis_jobs_running", "실행 중인 분석 작업 수")
+JOB_DURATION_SECONDS = metrics.histogram("analysis_job_duration_seconds", "분석 작업 실행 시간")
+JOB_FINISHED = metrics.counter("analysis_jobs_finished_total", "종료된 분석 작업 수 (상태별)")
+
+# 재시작 후 재실행 최대 횟수 (실행 중 프로세스가 죽은 경우)
+MAX_ATTEMPTS = 3
+
+JobRunner = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class AnalysisJobManager:
+    """
+    DB 기반 분석 작업 대기열 + 프로세스 내 워커 풀
+
+    Args:
+        concurrency: 동시에 실행할 작업 수
+        default_deadline: 기본 마감 시간 (초, 접수 시점 기준)
+        max_deadline: 요청에서 지정할 수 있는 최대 마감 시간 (초)
+    """
+
+    def __init__(self, concurrency: int, default_deadline: int, max_deadline: int):
+        self.concurrency = concurrency
+        self.default_deadline = default_deadline
+        self.max_deadline = max_deadline
+        self.started = False
+        self._runner: Optional[JobRunner] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        # 워커 풀 포화로 나중에 다시 넣을 작업 (job_id → 타이머)
+        self._requeue_timers: Dict[str, asyncio.TimerHandle] = {}
+
+    async def start(self, runner: JobRunner) -> None:
+        """워커 시작 및 미완료 작업 복구"""
+        if self.started:
+            return
+        self._runner = runner
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self.started = True
+
+        recovered = await self._recover()
+        if recovered:
+            print(f"🔁 미완료 분석 작업 {recovered}건 재등록")
+
+    async def stop(self) -> None:
+        """워커 종료 (실행 중이던 작업은 다음 시작 시 복구됨)"""
+        for timer in self._requeue_timers.values():
+            timer.cancel()
+        self._requeue_timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.started = False
+
+    async def _recover(self) -> int:
+        async with AsyncSessionLocal() as db:
+            jobs = (await db.scalars(
+                select(AnalysisJob)
+                .where(AnalysisJob.status.in_(["queued", "running"]))
+                .order_by(AnalysisJob.created_at)
+            )).all()
+            requeued: List[str] = []
+            for job in jobs:
+                if job.status == "running" and job.attempts >= MAX_ATTEMPTS:
+                    job.status = "failed"
+                    job.error = "재시도 횟수 초과"
+                    job.finished_at = datetime.utcnow()
+                    continue
+                job.status = "queued"
+                requeued.append(job.id)
+            await db.commit()
+
+        # 커밋 이후에 대기열에 넣어야 워커가 queued 상태를 볼 수 있다
+        for job_id in requeued:
+            self._enqueue(job_id)
+        return len(requeued)
+
+    def _enqueue(self, job_id: str) -> None:
+        self._requeue_timers.pop(job_id, None)
+        self._queue.put_nowait(job_id)
+        JOB_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _enqueue_later(self, job_id: str, delay: float) -> None:
+        """delay초 뒤 대기열에 추가 (워커는 기다리지 않고 바로 다음 작업을 처리)"""
+        self._requeue_timers[job_id] = asyncio.get_running_loop().call_later(delay, self._enqueue, job_id)
+
+    async def submit(self, db: AsyncSession, payload: Dict[str, Any], deadline_seconds: Optional[int] = None) -> AnalysisJob:
+        """작업 저장 후 대기열에 추가"""
+        deadline = min(deadline_seconds or self.default_deadline, self.max_deadline)
+        job = AnalysisJob(
+            id=str(uuid.uuid4()),
+            status="queued",
+            request_payload=json.dumps(payload, ensure_ascii=False),
+            deadline_seconds=deadline,
+            attempts=0,
+            created_at=datetime.utcnow()
+        )
+        db.add(job)
+        await db.commit()
+        self._enqueue(job.id)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            JOB_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"⚠️ 분석 작업 처리 실패 ({job_id}): {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(AnalysisJob, job_id)
+            if job is None or job.status != "queued":
+                return
+
+            # 마감 시간은 접수 시점부터 계산 (대기열에서 기다린 시간 포함)
+            remaining = (job.created_at + timedelta(seconds=job.deadline_seconds) - datetime.utcnow()).total_seconds()
+            if remaining <= 0:
+                await self._finish(db, job, "timeout", error="실행 전 마감 시간 초과")
+                return
+
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            job.attempts = (job.attempts or 0) + 1
+            await db.commit()
+
+            self._running += 1
+            JOB_RUNNING.set(self._running)
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self._runner(json.loads(job.request_payload)), timeout=remaining)
+            except asyncio.TimeoutError:
+                await self._finish(db, job, "timeout", error=f"마감 시간 초과 ({job.deadline_seconds}초)")
+            except PoolSaturatedError as e:
+                # 분석 워커 풀 포화 - retry_after 뒤 다시 대기열로
+                job.status = "queued"
+                await db.commit()
+                self._enqueue_later(job.id, e.retry_after)
+            except Exception as e:
+                await self._finish(db, job, "failed", error=str(e))
+            else:
+                job.result = json.dumps(result, ensure_ascii=False)
+                job.analysis_id = result.get("analysis_id")
+                try:
+                    await self._finish(db, job, "succeeded")
+                except Exception as e:
+                    # 결과 저장 실패 (예: 이력 FK) - running 상태로 남지 않도록 실패로 기록
+                    await db.rollback()
+                    job.result = None
+                    job.analysis_id = None
+                    await self._finish(db, job, "failed", error=f"결과 저장 실패: {e}")
+            finally:
+                self._running -= 1
+                JOB_RUNNING.set(self._running)
+                JOB_DURATION_SECONDS.observe(time.perf_counter() - started)
+
+    async def _finish(self, db: AsyncSession, job: AnalysisJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+        JOB_FINISHED.inc(status=status)
+
+
+# 전역 인스턴스
+job_manager = AnalysisJobManager(
+    concurrency=int(os.getenv("ANALYSIS_JOB_CONCURRENCY", "4")),
+    default_deadline=int(os.getenv("ANALYSIS_JOB_DEADLINE_SECONDS", "120")),
+    max_deadline=int(os.getenv("ANALYSIS_JOB_MAX_DEADLINE_SECONDS", "600"))
+)
@@ -0,0 +1,268 @@
+"""
+LLM 분석 캐시 (DB 저장)
+
+여러 저장소에서 같은 새 오류가 나면 KB 미스마다 LLM을 다시 호출하게 된다.
+(오류 타입, 정규화된 증상 지문) → LLM 분석/신뢰도를 llm_analysis_cache 테이블에 저장하고,
+지문이 다르더라도 증상이 거의 같으면 (증상 토큰 집합의 Jaccard 유사도) 캐시 항목을 재사용한다.
+유사도는 대칭이라 증상 일부만 겹치는 요청(부분집합/상위집합)이 다른 오류의 분석을 가져가지 않는다.
+
+항목은 TTL이 지나면 무시/정리되고, 수동 무효화 API와 KB 승인 시 자동 삭제를 지원한다.
+"""
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.db.connection import AsyncSessionLocal
+from app.db.models import LLMAnalysisCache
+from app.services.metrics import metrics
+from app.services.worker_pool import BoundedWorkerPool, analysis_pool
+from app.utils.text import normalize_line, symptom_fingerprint
+
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# 지문이 다를 때 재사용할 최소 유사도 (증상 토큰 Jaccard)
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.9"))
+
+# 유사도 검색 후보 수
+SIMILAR_CANDIDATES = 20
+
+CACHE_LOOKUPS = metrics.counter("llm_cache_lookups_total", "LLM 분석 캐시 조회 결과 (exact/similar/miss)")
+CACHE_INVALIDATED = metrics.counter("llm_cache_invalidated_total", "삭제된 LLM 분석 캐시 항목 수 (사유별)")
+
+
+_TOKEN_RE = re.compile(r"<\w+>|\w+")
+
+# 오류 타입 → [(캐시 ID, 증상 토큰 집합)]
+CacheIndex = Dict[str, List[Tuple[int, FrozenSet[str]]]]
+
+
+def symptom_tokens(symptoms: List[str]) -> FrozenSet[str]:
+    """유사도 비교용 증상 토큰 집합 (normalize_line 정규화 후 단어 단위, 순서 무관)"""
+    return frozenset(token for s in symptoms for token in _TOKEN_RE.findall(normalize_line(s)))
+
+
+def symptom_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """두 증상 토큰 집합의 Jaccard 유사도 (교집합 / 합집합, 대칭)"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _build_index(rows: List[Tuple[int, str, str]]) -> CacheIndex:
+    index: CacheIndex = {}
+    for entry_id, error_type, symptoms in rows:
+        index.setdefault(error_type, []).append((entry_id, symptom_tokens(json.loads(symptoms))))
+    return index
+
+
+def _rank_similar(candidates: List[Tuple[int, FrozenSet[str]]], tokens: FrozenSet[str], threshold: float) -> List[int]:
+    scored = [(symptom_similarity(tokens, entry_tokens), entry_id) for entry_id, entry_tokens in candidates]
+    scored = sorted((item for item in scored if item[0] >= threshold), reverse=True)
+    return [entry_id for _, entry_id in scored[:SIMILAR_CANDIDATES]]
+
+
+class LLMAnalysisCacheStore:
+    """llm_analysis_cache 테이블 + 증상 토큰 유사도 인덱스"""
+
+    def __init__(
+        self,
+        enabled: bool = LLM_CACHE_ENABLED,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        similarity: float = LLM_CACHE_SIMILARITY,
+        pool: Optional[BoundedWorkerPool] = None
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.pool = pool or analysis_pool
+        # 캐시가 바뀌면 None으로 비우고 다음 유사도 검색 때 다시 구축
+        self._index: Optional[CacheIndex] = None
+        self._generation = 0
+
+    def _invalidate_index(self) -> None:
+        self._index = None
+        self._generation += 1
+
+    async def _get_index(self, db, now: datetime) -> CacheIndex:
+        index = self._index
+        if index is not None:
+            return index
+
+        generation = self._generation
+        rows = (await db.execute(
+            select(LLMAnalysisCache.id, LLMAnalysisCache.error_type, LLMAnalysisCache.symptoms)
+            .where(LLMAnalysisCache.expires_at > now)
+        )).all()
+        index = await self.pool.run(_build_index, [tuple(row) for row in rows])
+        # 구축하는 동안 캐시가 바뀌었으면 저장하지 않음 (이번 검색에만 사용)
+        if generation == self._generation:
+            self._index = index
+        return index
+
+    async def _similar_ids(self, db, error_type: str, symptoms: List[str], now: datetime) -> List[int]:
+        """같은 오류 타입에서 증상 유사도가 기준 이상인 캐시 항목 ID (유사도 순)"""
+        index = await self._get_index(db, now)
+        candidates = index.get(error_type)
+        if not candidates:
+            return []
+        return await self.pool.run(_rank_similar, candidates, symptom_tokens(symptoms), self.similarity)
+
+    async def lookup(self, error_type: str, symptoms: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 LLM 분석 조회 (지문 일치 → 유사 증상 순)
+
+        Returns:
+            {"analysis", "confidence", "cache_id", "match"} 또는 None
+        """
+        if not self.enabled or not symptoms:
+            return None
+
+        now = datetime.utcnow()
+        fingerprint = symptom_fingerprint(error_type, symptoms)
+        async with AsyncSessionLocal() as db:
+            match = "exact"
+            entry = await db.scalar(
+                select(LLMAnalysisCache).where(
+                    LLMAnalysisCache.error_type == error_type,
+                    LLMAnalysisCache.symptom_fingerprint == fingerprint,
+                    LLMAnalysisCache.expires_at > now
+                )
+            )
+            if entry is None:
+                match = "similar"
+                for entry_id in await self._similar_ids(db, error_type, symptoms, now):
+                    entry = await db.get(LLMAnalysisCache, entry_id)
+                    if entry is not None and entry.expires_at > now:
+                        break
+                    entry = None
+
+            if entry is None:
+                CACHE_LOOKUPS.inc(result="miss")
+                return None
+
+            await db.execute(
+                update(LLMAnalysisCache)
+                .where(LLMAnalysisCache.id == entry.id)
+                .values(hit_count=LLMAnalysisCache.hit_count + 1)
+            )
+            await db.commit()
+
+        CACHE_LOOKUPS.inc(result=match)
+        return {
+            "analysis": entry.analysis,
+            "confidence": entry.confidence,
+            "cache_id": entry.id,
+            "match": match
+        }
+
+    async def store(self, error_type: str, symptoms: List[str], analysis: str, confidence: float) -> None:
+        """LLM 분석 결과 저장 (같은 키가 있으면 갱신, 만료 항목 정리)"""
+        if not self.enabled or not symptoms:
+            return
+
+        now = datetime.utcnow()
+        fingerprint = symptom_fingerprint(error_type, symptoms)
+        values = {
+            "symptoms": json.dumps(symptoms, ensure_ascii=False),
+            "analysis": analysis,
+            "confidence": confidence,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds)
+        }
+        async with AsyncSessionLocal() as db:
+            expired = await db.execute(delete(LLMAnalysisCache).where(LLMAnalysisCache.expires_at <= now))
+            if expired.rowcount:
+                CACHE_INVALIDATED.inc(expired.rowcount, reason="expired")
+
+            entry = await db.scalar(
+                select(LLMAnalysisCache).where(
+                    LLMAnalysisCache.error_type == error_type,
+                    LLMAnalysisCache.symptom_fingerprint == fingerprint
+                )
+            )
+            if entry is None:
+                db.add(LLMAnalysisCache(error_type=error_type, symptom_fingerprint=fingerprint, **values))
+            else:
+                for key, value in values.items():
+                    setattr(entry, key, value)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # 같은 키를 동시에 저장한 다른 요청이 먼저 커밋함
+                await db.rollback()
+        self._invalidate_index()
+
+    async def invalidate(self, entry_id: Optional[int] = None, error_type: Optional[str] = None) -> int:
+        """수동 무효화 (ID 또는 오류 타입 지정, 둘 다 없으면 전체 삭제). 삭제한 항목 수 반환"""
+        statement = delete(LLMAnalysisCache)
+        if entry_id is not None:
+            statement = statement.where(LLMAnalysisCache.id == entry_id)
+        if error_type is not None:
+            statement = statement.where(LLMAnalysisCache.error_type == error_type)
+
+        async with AsyncSessionLocal() as db:
+            deleted = (await db.execute(statement)).rowcount
+            await db.commit()
+        self._invalidate_index()
+        CACHE_INVALIDATED.inc(deleted, reason="manual")
+        return deleted
+
+    async def clear_superseded(self, error_type: Optional[str], symptoms: List[str]) -> int:
+        """
+        승인된 KB 항목이 대체하는 캐시 항목 삭제 (같은 지문 + 유사 증상)
+
+        이후 같은 오류는 KB 검색으로 답하므로 오래된 LLM 분석을 재사용하지 않게 한다.
+        """
+        if not symptoms:
+            return 0
+
+        error_type = error_type or "unknown"
+        now = datetime.utcnow()
+        fingerprint = symptom_fingerprint(error_type, symptoms)
+        async with AsyncSessionLocal() as db:
+            ids = set(await self._similar_ids(db, error_type, symptoms, now))
+            deleted = (await db.execute(
+                delete(LLMAnalysisCache).where(
+                    LLMAnalysisCache.error_type == error_type,
+                    (LLMAnalysisCache.symptom_fingerprint == fingerprint) | LLMAnalysisCache.id.in_(ids)
+                )
+            )).rowcount
+            await db.commit()
+
+        if deleted:
+            self._invalidate_index()
+            CACHE_INVALIDATED.inc(deleted, reason="approved")
+        return deleted
+
+    async def list_entries(self, skip: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """유효한 캐시 항목 목록 (최근 순)"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            query = select(LLMAnalysisCache).where(LLMAnalysisCache.expires_at > now)
+            entries = (await db.scalars(
+                query.order_by(LLMAnalysisCache.created_at.desc()).offset(skip).limit(limit)
+            )).all()
+        return {
+            "entries": [
+                {
+                    "id": e.id,
+                    "error_type": e.error_type,
+                    "symptoms": json.loads(e.symptoms),
+                    "confidence": e.confidence,
+                    "hit_count": e.hit_count,
+                    "created_at": e.created_at.isoformat(),
+                    "expires_at": e.expires_at.isoformat()
+                }
+                for e in entries
+            ]
+        }
+
+
+# 전역 인스턴스
+llm_analysis_cache = LLMAnalysisCacheStore()
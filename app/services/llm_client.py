@@ -3,22 +3,69 @@ LLM Integration Client
 
 K8s App에서 로컬 LLM 서버를 호출하여 LLM 분석을 수행하는 클라이언트
 """
+import asyncio
+import json
 import os
+import time
 import httpx
-from typing import Dict, Any, Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from fastapi import HTTPException
 
+from app.services.http_pool import create_llm_http_client
+from app.services.llm_endpoints import EndpointPool, LLMEndpoint
+from app.services.llm_usage import parse_token_usage
+
 
 class LLMClient:
     """LLM webhook 클라이언트"""
     
     def __init__(self):
-        self.webhook_url = os.getenv("LLM_WEBHOOK_URL") or os.getenv("N8N_WEBHOOK_URL")
+        # 여러 복제본: LLM_WEBHOOK_URLS=http://llm-0:8001/webhook/llm-analyze,http://llm-1:8001/...
+        urls = [url.strip() for url in os.getenv("LLM_WEBHOOK_URLS", "").split(",") if url.strip()]
+        if not urls:
+            single = os.getenv("LLM_WEBHOOK_URL") or os.getenv("N8N_WEBHOOK_URL")
+            urls = [single] if single else []
+        self.webhook_url = urls[0] if urls else None
+        # 최대 타임아웃 (실제 타임아웃은 엔드포인트별 최근 응답 시간 p99 기반으로 이보다 짧아질 수 있음)
         self.timeout = int(os.getenv("LLM_TIMEOUT_SECONDS", os.getenv("N8N_TIMEOUT_SECONDS", "30")))
+        # 스트리밍 엔드포인트 (기본: webhook URL + /stream, 단일 엔드포인트는 LLM_STREAM_WEBHOOK_URL로 지정 가능)
+        stream_override = os.getenv("LLM_STREAM_WEBHOOK_URL") if len(urls) == 1 else None
+        self.endpoints = EndpointPool([
+            LLMEndpoint(url, stream_override or f"{url.rstrip('/')}/stream", max_timeout=self.timeout)
+            for url in urls
+        ])
+        
+        # 앱 lifespan 동안 유지되는 HTTP 클라이언트 (startup()에서 생성)
+        self._client: Optional[httpx.AsyncClient] = None
         
         if not self.webhook_url:
             print("⚠️ LLM_WEBHOOK_URL이 설정되지 않음. LLM 분석 비활성화")
     
+    async def startup(self) -> None:
+        """공유 HTTP 클라이언트(연결 풀) 생성 및 LLM 서버 연결 미리 수립"""
+        if not self.webhook_url or self._client is not None:
+            return
+        
+        self._client = create_llm_http_client(self.timeout)
+        
+        # 헬스 체크 요청으로 TCP/TLS 연결을 미리 열어둔다 (실패해도 무시)
+        for endpoint in self.endpoints.endpoints:
+            try:
+                await self._client.get(endpoint.health_url)
+                print(f"✅ LLM 서버 연결 준비 완료: {endpoint.url}")
+            except httpx.HTTPError as e:
+                print(f"⚠️ LLM 서버 사전 연결 실패: {endpoint.url} ({e})")
+        
+        # 제외된 엔드포인트 주기적 헬스 체크
+        self.endpoints.start(self._client)
+    
+    async def aclose(self) -> None:
+        """헬스 체크 중지 및 공유 HTTP 클라이언트 종료"""
+        await self.endpoints.stop()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
     async def call_llm_analysis(
         self,
         ci_log: str,
@@ -38,10 +85,11 @@ class LLMClient:
             repository: 저장소 이름
             
         Returns:
-            Dict with 'analysis' and 'confidence' keys
+            Dict with 'analysis', 'confidence' keys
+            (LLM 서버가 usage를 보내면 'tokens_in', 'tokens_out'도 포함)
             
         Raises:
-            HTTPException: LLM 호출 실패시 503 에러
+            HTTPException: LLM 호출 실패시 503 에러 (LLM 서버 429는 Retry-After와 함께 429)
         """
         if not self.webhook_url:
             raise HTTPException(
@@ -49,6 +97,10 @@ class LLMClient:
                 detail="LLM webhook URL이 설정되지 않음"
             )
         
+        # 진행 중인 요청이 가장 적은 엔드포인트 선택
+        # (모두 연속 실패로 제외되었으면 타임아웃을 기다리지 않고 바로 실패)
+        endpoint = self._acquire_endpoint()
+        
         # 요청 데이터 구성
         request_data = {
             "ci_log": ci_log,
@@ -59,35 +111,148 @@ class LLMClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                print(f"🔄 LLM webhook 호출: {self.webhook_url}")
-                
-                response = await client.post(
-                    self.webhook_url,
-                    json=request_data,
-                    headers={"Content-Type": "application/json"}
+            result = await self._request(endpoint, request_data, endpoint.latency.current())
+        except HTTPException as e:
+            _record_error(endpoint, e)
+            raise
+        except asyncio.CancelledError:
+            endpoint.breaker.release()
+            raise
+        finally:
+            self.endpoints.release(endpoint)
+        
+        endpoint.breaker.record_success()
+        return result
+    
+    def _acquire_endpoint(self) -> LLMEndpoint:
+        endpoint = self.endpoints.acquire()
+        if endpoint is None:
+            raise HTTPException(
+                status_code=503,
+                detail="LLM 서버 연속 실패로 호출 생략 (모든 엔드포인트 서킷 브레이커 open)"
+            )
+        return endpoint
+    
+    async def _request(self, endpoint: LLMEndpoint, request_data: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """webhook 호출 1회 (실패는 503 HTTPException으로 변환, 429는 그대로 전달)"""
+        started = time.monotonic()
+        try:
+            print(f"🔄 LLM webhook 호출: {endpoint.url}")
+            
+            if self._client is not None:
+                response = await self._post(self._client, endpoint.url, request_data, timeout)
+            else:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    response = await self._post(client, endpoint.url, request_data, timeout)
+            
+            # HTTP 에러 체크
+            _raise_if_rate_limited(response)
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"LLM webhook 에러: HTTP {response.status_code}"
                 )
+            
+            # 응답 데이터 파싱
+            result = response.json()
+            
+            # 필수 필드 검증
+            if "analysis" not in result or "confidence" not in result:
+                raise HTTPException(
+                    status_code=503,
+                    detail="LLM 응답 형식이 올바르지 않음: analysis, confidence 필드 필요"
+                )
+            
+            endpoint.latency.record(time.monotonic() - started)
+            result.update(parse_token_usage(result))
+            print(f"✅ LLM 분석 완료: 신뢰도 {result['confidence']}")
+            return result
                 
-                # HTTP 에러 체크
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=503,
-                        detail=f"LLM webhook 에러: HTTP {response.status_code}"
-                    )
-                
-                # 응답 데이터 파싱
-                result = response.json()
-                
-                # 필수 필드 검증
-                if "analysis" not in result or "confidence" not in result:
-                    raise HTTPException(
-                        status_code=503,
-                        detail="LLM 응답 형식이 올바르지 않음: analysis, confidence 필드 필요"
-                    )
-                
-                print(f"✅ LLM 분석 완료: 신뢰도 {result['confidence']}")
-                return result
+        except HTTPException:
+            raise
+        except httpx.TimeoutException:
+            endpoint.latency.record(timeout)
+            raise HTTPException(
+                status_code=503,
+                detail=f"LLM webhook 타임아웃 ({timeout:.1f}초)"
+            )
+        except httpx.ConnectError:
+            raise HTTPException(
+                status_code=503,
+                detail="LLM 서버 연결 실패"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"LLM webhook 호출 실패: {str(e)}"
+            )
+
+
+    async def stream_llm_analysis(
+        self,
+        ci_log: str,
+        symptoms: list,
+        error_type: str,
+        context: Optional[str] = None,
+        repository: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        LLM 스트리밍 엔드포인트(SSE)를 호출하여 생성되는 대로 텍스트 전달
+        
+        Yields:
+            {"type": "token", "text": ...} 를 여러 번, 마지막에
+            {"type": "done", "analysis": ..., "confidence": ..., "tokens_in": ..., "tokens_out": ...}
+            
+            스트리밍을 지원하지 않는 webhook(n8n 등)이 JSON을 반환하면
+            전체 분석을 token 한 개로 보낸 뒤 done으로 끝낸다.
+            
+        Raises:
+            HTTPException: LLM 호출 실패시 503 에러 (LLM 서버 429는 Retry-After와 함께 429)
+        """
+        if not self.webhook_url:
+            raise HTTPException(
+                status_code=503,
+                detail="LLM webhook URL이 설정되지 않음"
+            )
+        
+        request_data = {
+            "ci_log": ci_log,
+            "symptoms": symptoms,
+            "error_type": error_type,
+            "context": context,
+            "repository": repository
+        }
+        
+        endpoint = self._acquire_endpoint()
+        try:
+            async for event in self._stream_events(endpoint, request_data):
+                yield event
+        except HTTPException as e:
+            _record_error(endpoint, e)
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            endpoint.breaker.release()
+            raise
+        finally:
+            self.endpoints.release(endpoint)
+        
+        endpoint.breaker.record_success()
+    
+    async def _stream_events(self, endpoint: LLMEndpoint, request_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """스트리밍 호출 1회 (실패는 503 HTTPException으로 변환)"""
+        try:
+            print(f"🔄 LLM 스트리밍 호출: {endpoint.stream_url}")
+            
+            if self._client is not None:
+                async for event in self._stream(self._client, endpoint.stream_url, request_data):
+                    yield event
+            else:
+                async with httpx.AsyncClient(timeout=self.timeout) as client:
+                    async for event in self._stream(client, endpoint.stream_url, request_data):
+                        yield event
                 
+        except HTTPException:
+            raise
         except httpx.TimeoutException:
             raise HTTPException(
                 status_code=503,
@@ -101,8 +266,121 @@ class LLMClient:
         except Exception as e:
             raise HTTPException(
                 status_code=503,
-                detail=f"LLM webhook 호출 실패: {str(e)}"
+                detail=f"LLM 스트리밍 호출 실패: {str(e)}"
             )
+    
+    async def _stream(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        request_data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async with client.stream(
+            "POST",
+            url,
+            json=request_data,
+            headers={"Content-Type": "application/json", "Accept": "text/event-stream"}
+        ) as response:
+            _raise_if_rate_limited(response)
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"LLM webhook 에러: HTTP {response.status_code}"
+                )
+            
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                # 스트리밍 미지원 webhook - 전체 응답을 한 번에 전달
+                result = json.loads(await response.aread())
+                if "analysis" not in result or "confidence" not in result:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="LLM 응답 형식이 올바르지 않음: analysis, confidence 필드 필요"
+                    )
+                yield {"type": "token", "text": result["analysis"]}
+                yield {
+                    "type": "done", "analysis": result["analysis"], "confidence": result["confidence"],
+                    **parse_token_usage(result)
+                }
+                return
+            
+            async for event, data in _iter_sse(response):
+                if event == "token":
+                    yield {"type": "token", "text": data.get("text", "")}
+                elif event == "done":
+                    print(f"✅ LLM 스트리밍 완료: 신뢰도 {data.get('confidence')}")
+                    yield {
+                        "type": "done", "analysis": data["analysis"], "confidence": data["confidence"],
+                        **parse_token_usage(data)
+                    }
+                    return
+                elif event == "error":
+                    raise HTTPException(
+                        status_code=503,
+                        detail=data.get("detail", "LLM 스트리밍 오류")
+                    )
+            
+            raise HTTPException(
+                status_code=503,
+                detail="LLM 스트림이 완료 이벤트 없이 종료됨"
+            )
+    
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        request_data: Dict[str, Any],
+        timeout: float
+    ) -> httpx.Response:
+        return await client.post(
+            url,
+            json=request_data,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout
+        )
+
+
+def _raise_if_rate_limited(response: httpx.Response) -> None:
+    """LLM 서버의 429는 503으로 바꾸지 않고 Retry-After와 함께 그대로 전달"""
+    if response.status_code == 429:
+        raise HTTPException(
+            status_code=429,
+            detail="LLM 서버 요청 한도 초과",
+            headers={"Retry-After": response.headers.get("Retry-After", "1")}
+        )
+
+
+def _record_error(endpoint: LLMEndpoint, error: HTTPException) -> None:
+    """
+    실패한 호출 결과를 엔드포인트 서킷 브레이커에 기록
+
+    429는 복제본이 살아서 한도를 알려준 것이므로 실패로 세지 않는다
+    (연속 429로 정상 복제본이 제외되면 나머지 복제본에 부하가 더 몰림).
+    """
+    if error.status_code == 429:
+        endpoint.breaker.release()
+    else:
+        endpoint.breaker.record_failure()
+
+
+async def _iter_sse(response: httpx.Response) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """SSE 응답 파싱 → (event, data dict)"""
+    event = "message"
+    data_lines = []
+    async for line in response.aiter_lines():
+        if not line:
+            # 빈 줄에서 이벤트 하나가 끝남
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event = "message"
+            data_lines = []
+        elif line.startswith(":"):
+            continue  # 주석/keep-alive
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].lstrip())
+    if data_lines:
+        yield event, json.loads("\n".join(data_lines))
 
 
 # 전역 인스턴스
@@ -0,0 +1,128 @@
+"""
+LLM webhook 엔드포인트 풀 (least-outstanding-requests)
+
+여러 local_llm_server.py 복제본(LLM_WEBHOOK_URLS) 중 진행 중인 요청이 가장 적은 곳으로 보낸다.
+엔드포인트마다 서킷 브레이커와 응답 시간 창을 따로 두어, 연속 실패한 엔드포인트는
+제외(eject)하고 주기적인 /health 확인이 성공하면 다시 포함한다.
+"""
+import asyncio
+import itertools
+import os
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services.circuit_breaker import (
+    BREAKER_REJECTED,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RESET_SECONDS,
+    OPEN,
+    AdaptiveTimeout,
+    CircuitBreaker
+)
+from app.services.metrics import metrics
+
+
+# 제외된 엔드포인트 헬스 체크 주기
+LLM_ENDPOINT_PROBE_SECONDS = float(os.getenv("LLM_ENDPOINT_PROBE_SECONDS", "10"))
+
+ENDPOINT_IN_FLIGHT = metrics.gauge("llm_endpoint_in_flight", "엔드포인트별 진행 중인 LLM 요청 수")
+ENDPOINT_PROBES = metrics.counter("llm_endpoint_probe_total", "제외된 엔드포인트 헬스 체크 결과")
+
+
+class LLMEndpoint:
+    """LLM webhook 엔드포인트 한 개의 상태"""
+
+    def __init__(self, url: str, stream_url: str, max_timeout: float):
+        self.url = url
+        self.stream_url = stream_url
+        parts = urlsplit(url)
+        self.health_url = f"{parts.scheme}://{parts.netloc}/health"
+        self.in_flight = 0
+        self.breaker = CircuitBreaker(
+            url,
+            failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=LLM_BREAKER_RESET_SECONDS
+        )
+        self.latency = AdaptiveTimeout(url, max_seconds=max_timeout)
+
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "circuit": self.breaker.state,
+            "in_flight": self.in_flight,
+            "timeout_seconds": self.latency.current()
+        }
+
+
+class EndpointPool:
+    """진행 중인 요청 수가 가장 적은 엔드포인트 선택 + 제외된 엔드포인트 헬스 체크"""
+
+    def __init__(self, endpoints: List[LLMEndpoint], probe_interval: float = LLM_ENDPOINT_PROBE_SECONDS):
+        self.endpoints = endpoints
+        self.probe_interval = probe_interval
+        # 진행 중인 요청 수가 같으면 돌아가며 선택
+        self._rotation = itertools.count()
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def acquire(self) -> Optional[LLMEndpoint]:
+        """
+        요청을 보낼 엔드포인트 (없으면 None - 모두 제외됨)
+
+        반환된 엔드포인트는 요청이 끝나면 release()로 반납하고,
+        결과는 endpoint.breaker에 기록해야 한다.
+        """
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.breaker.available()]
+        if not candidates:
+            for endpoint in self.endpoints:
+                BREAKER_REJECTED.inc(breaker=endpoint.url)
+            return None
+
+        offset = next(self._rotation) % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        endpoint = min(rotated, key=lambda e: e.in_flight)
+        endpoint.breaker.allow()
+        endpoint.in_flight += 1
+        ENDPOINT_IN_FLIGHT.set(endpoint.in_flight, endpoint=endpoint.url)
+        return endpoint
+
+    def release(self, endpoint: LLMEndpoint) -> None:
+        endpoint.in_flight -= 1
+        ENDPOINT_IN_FLIGHT.set(endpoint.in_flight, endpoint=endpoint.url)
+
+    def start(self, client: httpx.AsyncClient) -> None:
+        """제외된 엔드포인트 헬스 체크 루프 시작"""
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop(client))
+
+    async def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    async def _probe_loop(self, client: httpx.AsyncClient) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe(client)
+
+    async def probe(self, client: httpx.AsyncClient) -> None:
+        """open 상태 엔드포인트의 /health가 200이면 다시 포함"""
+        for endpoint in self.endpoints:
+            if endpoint.breaker.state != OPEN:
+                continue
+            try:
+                healthy = (await client.get(endpoint.health_url, timeout=5)).status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+            ENDPOINT_PROBES.inc(endpoint=endpoint.url, result="healthy" if healthy else "unhealthy")
+            if healthy:
+                print(f"✅ LLM 엔드포인트 복구: {endpoint.url}")
+                endpoint.breaker.record_success()
+
+    def status(self) -> List[dict]:
+        return [endpoint.status() for endpoint in self.endpoints]
@@ -0,0 +1,137 @@
+"""
+LLM 호출 우선순위 스케줄러
+
+동시에 실행할 수 있는 LLM 호출 수(LLM_SCHEDULER_SLOTS)를 고정하고,
+슬롯이 모두 사용 중이면 우선순위가 높은 요청부터 슬롯을 배정한다.
+기다린 시간만큼 우선순위가 올라가므로(aging) 낮은 우선순위 요청도 굶지 않는다.
+
+우선순위 = 명시적 priority + 릴리스 브랜치 가산점 + 최신 빌드 가산점 + 대기 시간 × aging
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List
+
+from app.services.metrics import metrics
+
+
+LLM_SCHEDULER_SLOTS = int(os.getenv("LLM_SCHEDULER_SLOTS", "4"))
+
+# 대기 1초당 올라가는 우선순위
+LLM_PRIORITY_AGING_PER_SEC = float(os.getenv("LLM_PRIORITY_AGING_PER_SEC", "0.5"))
+
+# 릴리스 브랜치 판정 정규식 / 가산점
+LLM_PRIORITY_RELEASE_BRANCHES = re.compile(
+    os.getenv("LLM_PRIORITY_RELEASE_BRANCHES", r"^(release|hotfix)[/-]|^(main|master)$")
+)
+LLM_PRIORITY_RELEASE_BONUS = float(os.getenv("LLM_PRIORITY_RELEASE_BONUS", "10"))
+
+# 작업의 최신 빌드 가산점 (최신 빌드보다 한 번 뒤처질 때마다 1점 감소)
+LLM_PRIORITY_RECENCY_BONUS = float(os.getenv("LLM_PRIORITY_RECENCY_BONUS", "5"))
+
+# 최신 빌드 번호를 기억할 최대 작업 수
+MAX_TRACKED_JOBS = 10000
+
+SCHEDULER_QUEUE_DEPTH = metrics.gauge("llm_scheduler_queue_depth", "LLM 슬롯을 기다리는 요청 수")
+SCHEDULER_IN_FLIGHT = metrics.gauge("llm_scheduler_in_flight", "LLM 슬롯을 사용 중인 요청 수")
+SCHEDULER_WAIT_SECONDS = metrics.histogram("llm_scheduler_wait_seconds", "LLM 슬롯 대기 시간")
+
+
+class LLMScheduler:
+    """
+    고정 슬롯 + 우선순위 대기열
+
+    유효 우선순위 base + aging × (now - enqueued) 의 대소는 시간이 지나도
+    (base - aging × enqueued) 의 대소와 같으므로 힙 하나로 aging을 처리한다.
+    """
+
+    def __init__(self, slots: int, aging_per_sec: float):
+        self.slots = slots
+        self.aging_per_sec = aging_per_sec
+        self._in_flight = 0
+        self._waiters: List[list] = []
+        self._seq = itertools.count()
+        self._latest_builds: "OrderedDict[str, int]" = OrderedDict()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for entry in self._waiters if not entry[-1].done())
+
+    def priority_for(self, request: Any) -> float:
+        """
+        요청 속성(priority, branch, job_name, build_number)으로 기본 우선순위 계산
+
+        build_number는 같은 job_name에서 지금까지 본 최신 번호와 비교한다.
+        """
+        score = float(getattr(request, "priority", None) or 0)
+
+        branch = getattr(request, "branch", None)
+        if branch and LLM_PRIORITY_RELEASE_BRANCHES.search(branch):
+            score += LLM_PRIORITY_RELEASE_BONUS
+
+        job_name = getattr(request, "job_name", None)
+        build_number = getattr(request, "build_number", None)
+        if job_name and build_number is not None:
+            latest = max(self._latest_builds.get(job_name, build_number), build_number)
+            self._latest_builds[job_name] = latest
+            self._latest_builds.move_to_end(job_name)
+            while len(self._latest_builds) > MAX_TRACKED_JOBS:
+                self._latest_builds.popitem(last=False)
+            score += max(0.0, LLM_PRIORITY_RECENCY_BONUS - (latest - build_number))
+
+        return score
+
+    @asynccontextmanager
+    async def slot(self, priority: float = 0.0) -> AsyncIterator[None]:
+        """LLM 호출 슬롯 확보 (블록을 벗어나면 반납)"""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: float) -> None:
+        started = time.monotonic()
+        if self._in_flight < self.slots and not self.queue_depth:
+            self._grant()
+            SCHEDULER_WAIT_SECONDS.observe(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        # 힙은 최소값 우선이므로 부호 반전, 같은 우선순위는 먼저 온 순서
+        entry = [-(priority - self.aging_per_sec * started), next(self._seq), future]
+        heapq.heappush(self._waiters, entry)
+        SCHEDULER_QUEUE_DEPTH.set(self.queue_depth)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 받은 직후 취소됨 - 다음 대기자에게 넘긴다
+                self._release()
+            raise
+        finally:
+            SCHEDULER_QUEUE_DEPTH.set(self.queue_depth)
+        SCHEDULER_WAIT_SECONDS.observe(time.monotonic() - started)
+
+    def _grant(self) -> None:
+        self._in_flight += 1
+        SCHEDULER_IN_FLIGHT.set(self._in_flight)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        SCHEDULER_IN_FLIGHT.set(self._in_flight)
+        while self._waiters and self._in_flight < self.slots:
+            future = heapq.heappop(self._waiters)[-1]
+            if future.done():
+                continue  # 대기 중 취소된 요청
+            self._grant()
+            future.set_result(None)
+
+
+# 전역 인스턴스
+llm_scheduler = LLMScheduler(slots=LLM_SCHEDULER_SLOTS, aging_per_sec=LLM_PRIORITY_AGING_PER_SEC)
@@ -0,0 +1,90 @@
+"""
+LLM 호출별 토큰 사용량 / 지연 시간 집계
+
+LLM을 실제로 호출한 분석마다 입력/출력 토큰, 슬롯 대기 시간, 첫 토큰까지 시간(TTFT), 전체 호출 시간을 기록한다.
+값은 AnalysisHistory의 llm_* 컬럼에 저장하고 error_type / repository 별 히스토그램으로 집계해
+어떤 저장소와 오류 유형이 LLM 시간을 가장 많이 쓰는지 확인할 수 있게 한다.
+"""
+import time
+from typing import Any, Dict, Optional
+
+from app.services.metrics import metrics
+
+
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+LLM_TOKENS = metrics.histogram("llm_tokens", "LLM 호출당 토큰 수 (direction=in/out, error_type, repository)", TOKEN_BUCKETS)
+LLM_QUEUE_SECONDS = metrics.histogram("llm_queue_seconds", "LLM 슬롯 대기 시간 (error_type, repository)")
+LLM_TTFT_SECONDS = metrics.histogram("llm_ttft_seconds", "LLM 첫 토큰까지 시간 (error_type, repository)")
+LLM_TOTAL_SECONDS = metrics.histogram("llm_total_seconds", "LLM 호출 시간, 대기 제외 (error_type, repository)")
+
+# AnalysisHistory 컬럼 ↔ 사용량 키
+HISTORY_COLUMNS = {
+    "llm_tokens_in": "tokens_in",
+    "llm_tokens_out": "tokens_out",
+    "llm_queue_seconds": "queue_seconds",
+    "llm_ttft_seconds": "ttft_seconds",
+    "llm_total_seconds": "total_seconds"
+}
+
+
+def parse_token_usage(data: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """LLM 서버 응답의 usage(prompt_tokens/completion_tokens) → tokens_in/tokens_out (usage가 없으면 빈 dict)"""
+    usage = data.get("usage")
+    if not usage:
+        return {}
+    return {"tokens_in": usage.get("prompt_tokens"), "tokens_out": usage.get("completion_tokens")}
+
+
+class LLMCallTimer:
+    """
+    LLM 호출 하나의 시간 측정
+
+        timer = LLMCallTimer()        # 슬롯 대기 시작
+        async with scheduler.slot():
+            timer.started()           # 요청 전송
+            ... timer.first_token()   # 스트리밍 첫 토큰 (없으면 완료 시각)
+        usage = timer.finish(tokens)
+    """
+
+    def __init__(self):
+        self._queued = time.monotonic()
+        self._started: Optional[float] = None
+        self._first_token: Optional[float] = None
+
+    def started(self) -> None:
+        self._started = time.monotonic()
+
+    def first_token(self) -> None:
+        if self._first_token is None:
+            self._first_token = time.monotonic()
+
+    def finish(self, tokens: Dict[str, Optional[int]]) -> Dict[str, Any]:
+        finished = time.monotonic()
+        started = self._started if self._started is not None else self._queued
+        first_token = self._first_token if self._first_token is not None else finished
+        return {
+            "tokens_in": tokens.get("tokens_in"),
+            "tokens_out": tokens.get("tokens_out"),
+            "queue_seconds": round(started - self._queued, 4),
+            "ttft_seconds": round(first_token - started, 4),
+            "total_seconds": round(finished - started, 4)
+        }
+
+
+def record_llm_usage(usage: Dict[str, Any], error_type: Optional[str], repository: Optional[str]) -> None:
+    """사용량을 error_type / repository 별 히스토그램에 반영"""
+    labels = {"error_type": error_type or "unknown", "repository": repository or "unknown"}
+    for direction in ("in", "out"):
+        tokens = usage.get(f"tokens_{direction}")
+        if tokens is not None:
+            LLM_TOKENS.observe(tokens, direction=direction, **labels)
+    LLM_QUEUE_SECONDS.observe(usage["queue_seconds"], **labels)
+    LLM_TTFT_SECONDS.observe(usage["ttft_seconds"], **labels)
+    LLM_TOTAL_SECONDS.observe(usage["total_seconds"], **labels)
+
+
+def history_usage_fields(usage: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """AnalysisHistory llm_* 컬럼 값 (LLM을 호출하지 않은 분석은 모두 None)"""
+    usage = usage or {}
+    return {column: usage.get(key) for column, key in HISTORY_COLUMNS.items()}
@@ -0,0 +1,432 @@
+"""
+CI 로그 스트리밍 수집
+
+요청 본문(gzip/zstd 압축 가능)을 청크 단위로 받아 압축 해제하면서
+증상 추출, 로그 지문, 원본 해시, blob 압축, LLM용 발췌(head/tail)를 한 번에 계산한다.
+원본 로그 전체를 메모리에 올리지 않고 압축된 blob만 보관하므로 100MB 이상의 로그도 처리할 수 있다.
+multipart/form-data 본문도 임시 파일에 저장하지 않고 증분 파싱해 로그 파트를 바로 수집한다.
+"""
+import codecs
+import hashlib
+import os
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterable, Callable, Deque, Dict, List, Optional, Tuple
+
+import multipart
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import parse_options_header
+
+from app.services.log_store import DEFAULT_CODEC, GZIP_LEVEL, ZSTD_LEVEL, zstandard
+from app.services.worker_pool import BoundedWorkerPool, analysis_pool
+from app.utils.text import LogFingerprinter, SymptomCollector
+
+
+# 압축 해제 후 허용하는 최대 로그 크기 (압축 폭탄 방지)
+LOG_UPLOAD_MAX_BYTES = int(os.getenv("LOG_UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# LLM 프롬프트용으로 보관하는 로그 앞/뒤 글자 수
+LOG_EXCERPT_CHARS = int(os.getenv("LOG_EXCERPT_CHARS", "200000"))
+
+# 스트림 입력을 워커 풀에 넘기는 단위 / 압축 해제 출력 단위
+INGEST_BATCH_BYTES = 1024 * 1024
+DECODE_CHUNK_BYTES = 256 * 1024
+
+# multipart 메타데이터 필드(로그 파트 외) 최대 크기
+MULTIPART_FIELD_MAX_BYTES = 64 * 1024
+
+SUPPORTED_ENCODINGS = ("identity", "gzip", "x-gzip", "deflate", "zstd")
+
+_ZSTD_ERROR = zstandard.ZstdError if zstandard is not None else zlib.error
+
+
+class UnsupportedEncodingError(Exception):
+    """지원하지 않는 Content-Encoding"""
+
+
+class LogTooLargeError(Exception):
+    """압축 해제된 로그가 LOG_UPLOAD_MAX_BYTES 초과"""
+
+
+class LogDecodeError(Exception):
+    """손상된 압축 데이터"""
+
+
+class MultipartFormError(LogDecodeError):
+    """잘못된 multipart/form-data 본문"""
+
+
+class StreamDecoder:
+    """
+    Content-Encoding 증분 압축 해제기
+
+    해제된 데이터는 DECODE_CHUNK_BYTES 단위로 sink에 전달하므로
+    압축률이 매우 높은 입력도 한 번에 메모리에 풀리지 않는다.
+    """
+
+    def __init__(self, encoding: Optional[str], sink: Callable[[bytes], None]):
+        encoding = (encoding or "identity").strip().lower()
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise UnsupportedEncodingError(f"지원하지 않는 Content-Encoding: {encoding}")
+        if encoding == "zstd" and zstandard is None:
+            raise UnsupportedEncodingError("zstd 해제에 필요한 zstandard 패키지가 없습니다.")
+
+        self.encoding = encoding
+        self._sink = sink
+        self._zlib = None
+        self._zstd = None
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            # wbits=47: gzip/zlib 헤더 자동 감지
+            self._zlib = zlib.decompressobj(wbits=47)
+        elif encoding == "zstd":
+            self._zstd = zstandard.ZstdDecompressor().stream_writer(
+                _SinkWriter(sink), write_size=DECODE_CHUNK_BYTES, closefd=False
+            )
+
+    def write(self, chunk: bytes) -> None:
+        """압축된 청크 입력"""
+        try:
+            if self._zlib is not None:
+                data = chunk
+                while data:
+                    self._sink(self._zlib.decompress(data, DECODE_CHUNK_BYTES))
+                    data = self._zlib.unconsumed_tail
+            elif self._zstd is not None:
+                self._zstd.write(chunk)
+            else:
+                self._sink(chunk)
+        except (zlib.error, _ZSTD_ERROR) as e:
+            raise LogDecodeError(f"압축 데이터를 해제할 수 없습니다: {e}") from e
+
+    def close(self) -> None:
+        """입력 종료 (남은 데이터 방출)"""
+        try:
+            if self._zlib is not None:
+                self._sink(self._zlib.flush())
+            elif self._zstd is not None:
+                self._zstd.close()
+        except (zlib.error, _ZSTD_ERROR) as e:
+            raise LogDecodeError(f"압축 데이터를 해제할 수 없습니다: {e}") from e
+
+
+class _SinkWriter:
+    """zstd stream_writer 출력 대상"""
+
+    def __init__(self, sink: Callable[[bytes], None]):
+        self._sink = sink
+
+    def write(self, data: bytes) -> int:
+        self._sink(bytes(data))
+        return len(data)
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """압축된 요청 본문 전체 해제 (JSON 요청용, 워커 풀에서 실행)"""
+    chunks: List[bytes] = []
+    size = 0
+
+    def sink(data: bytes) -> None:
+        nonlocal size
+        size += len(data)
+        if size > LOG_UPLOAD_MAX_BYTES:
+            raise LogTooLargeError(f"로그가 너무 큽니다 (최대 {LOG_UPLOAD_MAX_BYTES} bytes)")
+        chunks.append(data)
+
+    decoder = StreamDecoder(encoding, sink)
+    decoder.write(body)
+    decoder.close()
+    return b"".join(chunks)
+
+
+@dataclass
+class IngestedLog:
+    """스트리밍 수집 결과"""
+    digest: str  # 원본 로그 SHA-256 (log_blobs 키)
+    codec: str
+    compressed: bytes
+    raw_size: int
+    fingerprint: str  # 정규화된 로그 지문 (singleflight/재사용 키)
+    symptoms: List[str]
+    excerpt: str  # LLM 프롬프트용 head/tail 발췌
+
+
+class LogIngest:
+    """
+    압축 해제된 로그 바이트를 받아 분석/저장에 필요한 값을 증분 계산
+
+    feed()는 CPU 작업이므로 워커 풀에서 호출한다.
+    """
+
+    def __init__(self, max_bytes: int = LOG_UPLOAD_MAX_BYTES, excerpt_chars: int = LOG_EXCERPT_CHARS):
+        self.max_bytes = max_bytes
+        self.excerpt_chars = excerpt_chars
+        self.raw_size = 0
+
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._hasher = hashlib.sha256()
+        if DEFAULT_CODEC == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        self._compressed: List[bytes] = []
+
+        self._symptoms = SymptomCollector()
+        self._fingerprinter = LogFingerprinter()
+        self._partial_line = ""
+
+        self._head: List[str] = []
+        self._head_chars = 0
+        self._tail: Deque[str] = deque()
+        self._tail_chars = 0
+        self._total_chars = 0
+
+    def feed(self, data: bytes) -> None:
+        """압축 해제된 로그 바이트 추가"""
+        self.raw_size += len(data)
+        if self.raw_size > self.max_bytes:
+            raise LogTooLargeError(f"로그가 너무 큽니다 (최대 {self.max_bytes} bytes)")
+        self._consume(self._text_decoder.decode(data))
+
+    def finish(self) -> IngestedLog:
+        """남은 버퍼를 처리하고 결과 반환"""
+        self._consume(self._text_decoder.decode(b"", final=True))
+        if self._partial_line:
+            self._feed_lines(self._partial_line)
+            self._partial_line = ""
+        self._compressed.append(self._compressor.flush())
+
+        return IngestedLog(
+            digest=self._hasher.hexdigest(),
+            codec=DEFAULT_CODEC,
+            compressed=b"".join(self._compressed),
+            raw_size=self.raw_size,
+            fingerprint=self._fingerprinter.hexdigest(),
+            symptoms=self._symptoms.symptoms(),
+            excerpt=self._excerpt()
+        )
+
+    def _consume(self, text: str) -> None:
+        if not text:
+            return
+        encoded = text.encode("utf-8")
+        self._hasher.update(encoded)
+        self._compressed.append(self._compressor.compress(encoded))
+        self._keep_excerpt(text)
+
+        # extract_symptoms()와 같은 줄 구분을 위해 splitlines 사용, 끝나지 않은 마지막 줄은 보류
+        lines = (self._partial_line + text).splitlines(keepends=True)
+        self._partial_line = ""
+        if lines and lines[-1].splitlines()[0] == lines[-1]:
+            self._partial_line = lines.pop()
+        self._feed_lines("".join(lines))
+
+    def _feed_lines(self, text: str) -> None:
+        self._symptoms.feed_text(text)
+        self._fingerprinter.update_text(text)
+
+    def _keep_excerpt(self, text: str) -> None:
+        self._total_chars += len(text)
+        if self._head_chars < self.excerpt_chars:
+            piece = text[:self.excerpt_chars - self._head_chars]
+            self._head.append(piece)
+            self._head_chars += len(piece)
+            text = text[len(piece):]
+        if not text:
+            return
+        self._tail.append(text)
+        self._tail_chars += len(text)
+        while self._tail and self._tail_chars - len(self._tail[0]) >= self.excerpt_chars:
+            self._tail_chars -= len(self._tail.popleft())
+
+    def _excerpt(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if self._total_chars <= len(head) + len(tail):
+            return head + tail
+        return head + "\n... [truncated] ...\n" + tail[-self.excerpt_chars:]
+
+
+def _finish_ingest(decoder: StreamDecoder, ingest: LogIngest, data: bytes) -> IngestedLog:
+    """마지막 청크 묶음 처리 후 결과 반환 (워커 풀에서 실행)"""
+    decoder.write(data)
+    decoder.close()
+    return ingest.finish()
+
+
+class _BatchedIngest:
+    """청크를 INGEST_BATCH_BYTES 단위로 모아 워커 풀에서 압축 해제/추출"""
+
+    def __init__(self, encoding: Optional[str], pool: BoundedWorkerPool):
+        self.ingest = LogIngest()
+        self.decoder = StreamDecoder(encoding, self.ingest.feed)
+        self.pool = pool
+        self._batch: List[bytes] = []
+        self._size = 0
+
+    async def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self._batch.append(chunk)
+        self._size += len(chunk)
+        if self._size >= INGEST_BATCH_BYTES:
+            data = b"".join(self._batch)
+            self._batch = []
+            self._size = 0
+            await self.pool.run(self.decoder.write, data)
+
+    async def finish(self) -> IngestedLog:
+        return await self.pool.run(_finish_ingest, self.decoder, self.ingest, b"".join(self._batch))
+
+
+async def ingest_stream(
+    chunks: AsyncIterable[bytes],
+    encoding: Optional[str] = None,
+    pool: BoundedWorkerPool = analysis_pool
+) -> IngestedLog:
+    """
+    요청 본문 스트림을 수집
+
+    네트워크 청크를 INGEST_BATCH_BYTES 단위로 모아 워커 풀에서 압축 해제/추출한다.
+
+    Raises:
+        UnsupportedEncodingError, LogTooLargeError, LogDecodeError
+    """
+    batched = _BatchedIngest(encoding, pool)
+    async for chunk in chunks:
+        await batched.write(chunk)
+    return await batched.finish()
+
+
+def part_encoding(headers: Dict[bytes, bytes], filename: str) -> Optional[str]:
+    """multipart 파트의 압축 형식: Content-Encoding 헤더, Content-Type 또는 파일 확장자로 판단"""
+    encoding = headers.get(b"content-encoding")
+    if encoding is not None:
+        return encoding.decode("latin-1")
+    part_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    filename = filename.lower()
+    if filename.endswith(".gz") or "gzip" in part_type:
+        return "gzip"
+    if filename.endswith(".zst") or "zstd" in part_type:
+        return "zstd"
+    return None
+
+
+class _MultipartEvents:
+    """MultipartParser 콜백 → 이벤트 목록 (콜백은 동기이므로 write() 후 비동기로 처리)"""
+
+    def __init__(self):
+        self.events: List[Tuple[str, object]] = []
+        self._field = b""
+        self._value = b""
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            "on_part_begin": lambda: self.events.append(("begin", None)),
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": lambda: self.events.append(("headers", None)),
+            "on_part_data": lambda data, start, end: self.events.append(("data", data[start:end])),
+            "on_part_end": lambda: self.events.append(("end", None))
+        }
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self.events.append(("header", (self._field.lower(), self._value)))
+        self._field = b""
+        self._value = b""
+
+
+async def ingest_multipart(
+    chunks: AsyncIterable[bytes],
+    content_type: str,
+    log_field: str = "ci_log",
+    pool: BoundedWorkerPool = analysis_pool
+) -> Tuple[Dict[str, str], Optional[IngestedLog]]:
+    """
+    multipart/form-data 본문을 증분 파싱하며 log_field 파일 파트를 수집
+
+    파일 파트는 임시 파일에 저장하지 않고 도착하는 대로 ingest_stream()과 같은 방식으로 처리한다.
+    파싱도 CPU 작업이므로 네트워크 청크를 INGEST_BATCH_BYTES 단위로 모아 워커 풀에서 실행한다.
+
+    Returns:
+        (로그 외 필드, 로그 수집 결과 - log_field 파일 파트가 없으면 None)
+
+    Raises:
+        MultipartFormError, UnsupportedEncodingError, LogTooLargeError, LogDecodeError
+    """
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise MultipartFormError("multipart boundary가 없습니다.")
+
+    events = _MultipartEvents()
+    parser = multipart.MultipartParser(boundary, events.callbacks())
+
+    fields: Dict[str, str] = {}
+    ingested: Optional[IngestedLog] = None
+    headers: Dict[bytes, bytes] = {}
+    name: Optional[str] = None
+    log: Optional[_BatchedIngest] = None
+    value = bytearray()
+
+    async def handle(kind: str, payload) -> None:
+        nonlocal headers, name, log, value, ingested
+        if kind == "begin":
+            headers, name, log, value = {}, None, None, bytearray()
+        elif kind == "header":
+            headers[payload[0]] = payload[1]
+        elif kind == "headers":
+            _, options = parse_options_header(headers.get(b"content-disposition", b""))
+            name = options.get(b"name", b"").decode("utf-8", errors="replace")
+            filename = options.get(b"filename")
+            if name == log_field and filename is not None:
+                if ingested is not None:
+                    raise MultipartFormError(f"{log_field} 파일 파트가 여러 개입니다.")
+                log = _BatchedIngest(part_encoding(headers, filename.decode("utf-8", errors="replace")), pool)
+            elif filename is not None:
+                name = None  # 다른 파일 파트는 무시
+        elif kind == "data":
+            if log is not None:
+                await log.write(payload)
+            elif name is not None:
+                value.extend(payload)
+                if len(value) > MULTIPART_FIELD_MAX_BYTES:
+                    raise MultipartFormError(f"multipart 필드 {name}가 너무 큽니다.")
+        elif kind == "end":
+            if log is not None:
+                ingested = await log.finish()
+            elif name is not None:
+                fields[name] = value.decode("utf-8", errors="replace")
+
+    async def parse(data: bytes) -> None:
+        await pool.run(parser.write, data)
+        for kind, payload in events.events:
+            await handle(kind, payload)
+        events.events.clear()
+
+    try:
+        batch: List[bytes] = []
+        size = 0
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            batch.append(chunk)
+            size += len(chunk)
+            if size >= INGEST_BATCH_BYTES:
+                data = b"".join(batch)
+                batch = []
+                size = 0
+                await parse(data)
+        if batch:
+            await parse(b"".join(batch))
+        parser.finalize()
+    except MultipartParseError as e:
+        raise MultipartFormError(f"잘못된 multipart 본문: {e}")
+    return fields, ingested
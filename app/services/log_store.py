@@ -0,0 +1,127 @@
+"""
+CI 로그 저장소 (내용 주소 기반, 압축)
+
+로그는 원본 SHA-256 해시를 키로 log_blobs 테이블에 한 번만 저장하고,
+AnalysisHistory는 해시만 참조한다. 압축/해시/해제는 워커 풀에서 실행한다.
+zstandard가 설치되어 있으면 zstd, 없으면 gzip을 사용한다.
+"""
+import gzip
+import hashlib
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AnalysisHistory, LogBlob
+from app.services.metrics import metrics
+from app.services.worker_pool import analysis_pool
+
+if TYPE_CHECKING:
+    from app.services.log_ingest import IngestedLog
+
+try:
+    import zstandard
+    DEFAULT_CODEC = "zstd"
+except ImportError:
+    zstandard = None
+    DEFAULT_CODEC = "gzip"
+
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+LOG_BLOBS_WRITTEN = metrics.counter("log_blobs_written_total", "새로 저장된 로그 blob 수")
+LOG_BLOBS_DEDUPED = metrics.counter("log_blobs_deduplicated_total", "이미 저장되어 있던 로그 blob 수")
+LOG_BLOB_BYTES = metrics.counter("log_blob_bytes_total", "로그 blob 바이트 수 (raw/compressed)")
+
+
+def hash_log(ci_log: str) -> str:
+    """원본 로그의 SHA-256"""
+    return hashlib.sha256(ci_log.encode("utf-8")).hexdigest()
+
+
+def compress_log(ci_log: str, codec: str = DEFAULT_CODEC) -> Tuple[str, bytes]:
+    """로그 압축 → (codec, 압축 바이트)"""
+    raw = ci_log.encode("utf-8")
+    if codec == "zstd":
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "gzip", gzip.compress(raw, compresslevel=GZIP_LEVEL)
+
+
+def decompress_log(codec: str, data: bytes) -> str:
+    """압축 해제"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd로 저장된 로그를 읽으려면 zstandard 패키지가 필요합니다.")
+        # 스트리밍 압축된 프레임은 헤더에 원본 크기가 없으므로 decompressobj 사용
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data).decode("utf-8")
+    return gzip.decompress(data).decode("utf-8")
+
+
+async def _exists(db: AsyncSession, digest: str) -> bool:
+    return await db.scalar(select(LogBlob.hash).where(LogBlob.hash == digest)) is not None
+
+
+async def store_blob(db: AsyncSession, digest: str, codec: str, data: bytes, raw_size: int) -> None:
+    """
+    압축된 로그 blob 저장 (같은 해시가 있으면 무시)
+
+    동시 요청이 같은 로그를 저장해도 충돌하지 않도록 INSERT ... ON CONFLICT DO NOTHING 사용
+    (실제로 INSERT된 경우에만 저장 메트릭 집계)
+    """
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    result = await db.execute(
+        insert(LogBlob)
+        .values(hash=digest, codec=codec, data=data, raw_size=raw_size, compressed_size=len(data))
+        .on_conflict_do_nothing(index_elements=["hash"])
+    )
+    if result.rowcount != 1:
+        LOG_BLOBS_DEDUPED.inc()
+        return
+    LOG_BLOBS_WRITTEN.inc()
+    LOG_BLOB_BYTES.inc(raw_size, kind="raw")
+    LOG_BLOB_BYTES.inc(len(data), kind="compressed")
+
+
+async def store_log(db: AsyncSession, ci_log: str) -> str:
+    """
+    로그를 저장하고 해시 반환 (이미 있으면 압축 없이 해시만 반환)
+
+    커밋은 호출자가 수행한다.
+    """
+    digest = await analysis_pool.run(hash_log, ci_log)
+    if await _exists(db, digest):
+        LOG_BLOBS_DEDUPED.inc()
+        return digest
+
+    codec, data = await analysis_pool.run(compress_log, ci_log)
+    await store_blob(db, digest, codec, data, raw_size=len(ci_log.encode("utf-8")))
+    return digest
+
+
+async def store_ingested(db: AsyncSession, ingested: "IngestedLog") -> str:
+    """스트리밍 수집에서 이미 해시/압축된 로그 저장 (커밋은 호출자가 수행)"""
+    if await _exists(db, ingested.digest):
+        LOG_BLOBS_DEDUPED.inc()
+        return ingested.digest
+
+    await store_blob(db, ingested.digest, ingested.codec, ingested.compressed, raw_size=ingested.raw_size)
+    return ingested.digest
+
+
+async def load_log(db: AsyncSession, history: AnalysisHistory) -> Optional[str]:
+    """분석 이력의 원본 로그 읽기 (이때만 blob을 읽고 압축 해제)"""
+    if history.log_hash:
+        row = (await db.execute(
+            select(LogBlob.codec, LogBlob.data).where(LogBlob.hash == history.log_hash)
+        )).first()
+        if row is None:
+            return None
+        return await analysis_pool.run(decompress_log, row.codec, row.data)
+
+    # 이전 버전 행: Text 컬럼에 원본 저장
+    return (await db.execute(
+        select(AnalysisHistory.ci_log).where(AnalysisHistory.id == history.id)
+    )).scalar()
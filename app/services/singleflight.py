@@ -0,0 +1,47 @@
+"""
+Singleflight 요청 병합
+
+같은 키로 동시에 들어온 호출은 진행 중인 한 번의 실행 결과를 함께 기다린다.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+from app.services.metrics import metrics
+
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_SHARED = metrics.counter("singleflight_shared_total", "진행 중인 실행에 합류한 호출 수")
+SINGLEFLIGHT_IN_FLIGHT = metrics.gauge("singleflight_in_flight", "진행 중인 실행 수")
+
+
+class SingleFlight:
+    """키별 진행 중 실행 공유"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        키에 대해 fn을 한 번만 실행하고 결과를 공유
+
+        Returns:
+            (결과, 다른 호출의 실행에 합류했는지 여부)
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            SINGLEFLIGHT_SHARED.inc(group=self.name)
+            # 먼저 온 호출자가 취소되어도 공유 실행은 계속되도록 shield
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        SINGLEFLIGHT_IN_FLIGHT.set(len(self._calls), group=self.name)
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task), False
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        SINGLEFLIGHT_IN_FLIGHT.set(len(self._calls), group=self.name)
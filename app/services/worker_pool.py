@@ -0,0 +1,113 @@
+"""
+CPU 바운드 분석 단계용 제한 워커 풀
+
+증상 추출, KB 검색 같은 동기 작업을 이벤트 루프 밖의 스레드 풀에서 실행한다.
+대기열이 가득 차면 PoolSaturatedError를 발생시켜 API가 503 + Retry-After로 응답한다.
+"""
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.services.metrics import metrics
+
+
+POOL_QUEUE_DEPTH = metrics.gauge("analysis_pool_queue_depth", "워커 풀 대기열 길이")
+POOL_IN_FLIGHT = metrics.gauge("analysis_pool_in_flight", "워커 풀에 제출된 작업 수 (실행 + 대기)")
+POOL_WAIT_SECONDS = metrics.histogram("analysis_pool_wait_seconds", "제출부터 실행 시작까지 대기 시간")
+POOL_REJECTED = metrics.counter("analysis_pool_rejected_total", "대기열 초과로 거부된 작업 수")
+
+
+class PoolSaturatedError(Exception):
+    """워커 풀 대기열이 가득 참"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"분석 워커 풀 포화 (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class BoundedWorkerPool:
+    """
+    제출 대기열 길이가 제한된 스레드 풀
+
+    Args:
+        max_workers: 동시 실행 스레드 수
+        max_queue: 실행 대기 가능한 작업 수 (초과 시 거부)
+        name: 메트릭 라벨 및 스레드 이름 접두사
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = "analysis"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._submitted = 0
+        # 작업 실행 시간 이동 평균 (Retry-After 추정용)
+        self._avg_task_seconds = 0.05
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._submitted - self.max_workers, 0)
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"{self.name}-worker"
+            )
+        return self._executor
+
+    def _retry_after(self) -> int:
+        """대기열이 비워질 때까지의 예상 시간 (초, 최소 1)"""
+        backlog = self._submitted / max(self.max_workers, 1)
+        return max(1, math.ceil(backlog * self._avg_task_seconds))
+
+    def _update_gauges(self) -> None:
+        POOL_IN_FLIGHT.set(self._submitted, pool=self.name)
+        POOL_QUEUE_DEPTH.set(self.queue_depth, pool=self.name)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        동기 함수를 풀에서 실행하고 결과를 기다린다
+
+        Raises:
+            PoolSaturatedError: 대기열이 가득 찬 경우
+        """
+        if self._submitted >= self.max_workers + self.max_queue:
+            POOL_REJECTED.inc(pool=self.name)
+            raise PoolSaturatedError(self._retry_after())
+
+        executor = self._ensure_executor()
+        submitted_at = time.perf_counter()
+
+        def _task() -> Any:
+            started_at = time.perf_counter()
+            POOL_WAIT_SECONDS.observe(started_at - submitted_at, pool=self.name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started_at
+                self._avg_task_seconds = 0.9 * self._avg_task_seconds + 0.1 * elapsed
+
+        self._submitted += 1
+        self._update_gauges()
+        try:
+            return await asyncio.wrap_future(executor.submit(_task))
+        finally:
+            self._submitted -= 1
+            self._update_gauges()
+
+    def shutdown(self) -> None:
+        """대기 중인 작업을 취소하고 스레드 종료"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# 전역 인스턴스
+analysis_pool = BoundedWorkerPool(
+    max_workers=int(os.getenv("ANALYSIS_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("ANALYSIS_POOL_MAX_QUEUE", "32"))
+)
@@ -1,16 +1,46 @@
 """
 Config 파일 로딩 유틸리티
 """
+import copy
 import os
+import threading
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 
+# 기본 설정 파일 경로들 (앞에서부터 시도)
+DEFAULT_CONFIG_PATHS = [
+    "local_llm_server_config.yaml",
+    "/workspace/local_llm_server_config.yaml",
+    "config.yaml",
+    "/workspace/config.yaml"
+]
+
+# 찾은 기본 설정 파일 경로 (파일이 사라지면 다시 탐색)
+_default_path: Optional[str] = None
+# 경로 → (mtime_ns, 크기, 파싱 결과): 파일이 바뀌었을 때만 다시 파싱
+_parsed: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def _resolve_default_path() -> str:
+    global _default_path
+    if _default_path is not None and os.path.exists(_default_path):
+        return _default_path
+    for path in DEFAULT_CONFIG_PATHS:
+        if os.path.exists(path):
+            _default_path = path
+            return path
+    raise FileNotFoundError("설정 파일을 찾을 수 없습니다. 다음 경로들을 확인하세요: " + ", ".join(DEFAULT_CONFIG_PATHS))
+
+
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """
     설정 파일을 로드합니다.
     
+    파일 수정 시각(mtime)과 크기가 그대로면 이전 파싱 결과의 사본을 반환합니다.
+    
     Args:
         config_path: 설정 파일 경로. None이면 기본 경로들을 시도합니다.
         
@@ -22,28 +52,23 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         yaml.YAMLError: YAML 파싱 오류
     """
     if config_path is None:
-        # 기본 설정 파일 경로들 시도
-        possible_paths = [
-            "local_llm_server_config.yaml",
-            "/workspace/local_llm_server_config.yaml",
-            "config.yaml",
-            "/workspace/config.yaml"
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                config_path = path
-                break
-        else:
-            raise FileNotFoundError("설정 파일을 찾을 수 없습니다. 다음 경로들을 확인하세요: " + ", ".join(possible_paths))
+        config_path = _resolve_default_path()
     
-    if not os.path.exists(config_path):
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"설정 파일을 찾을 수 없습니다: {config_path}")
     
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    with _lock:
+        cached = _parsed.get(config_path)
+        if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f)
+            cached = (stat.st_mtime_ns, stat.st_size, config)
+            _parsed[config_path] = cached
     
-    return config
+    # 호출자가 수정해도 캐시가 바뀌지 않도록 사본 반환
+    return copy.deepcopy(cached[2])
 
 
 def get_azure_config(config: Dict[str, Any]) -> Dict[str, str]:
@@ -0,0 +1,163 @@
+"""
+LLM 프롬프트용 로그 압축 (결정적 전처리)
+
+LLM에 보내기 전에 로그를 줄여 프롬프트 토큰을 줄인다. 같은 입력은 항상 같은 출력을 낸다.
+
+1. ANSI 색상 코드 제거, \\r로 덮어쓴 진행 표시는 마지막 상태만 남김
+2. 진행률/다운로드 로그 등 알려진 잡음 줄 제거 (증상 패턴에 걸리는 줄은 유지)
+3. 긴 스택 트레이스는 처음/마지막 프레임과 우리 소스 프레임(앞뒤 1개 포함)만 남기고 접음
+4. 동일/템플릿 동일 줄(숫자·주소만 다른 줄)은 첫 줄만 남기고 반복 횟수 표시
+"""
+import os
+import re
+from typing import Dict, List
+
+from app.utils.text import SYMPTOM_REGEX, normalize_line
+
+
+# 우리 소스 경로 판정 정규식 (이 프레임은 접지 않음)
+LOG_COMPRESS_OWN_SOURCES = re.compile(
+    os.getenv("LOG_COMPRESS_OWN_SOURCES", r"(^|[\s\"'(/\\])(src|app|source|sources)[/\\]"),
+    re.IGNORECASE
+)
+# 이보다 긴 연속 프레임만 접음
+LOG_COMPRESS_MAX_FRAMES = int(os.getenv("LOG_COMPRESS_MAX_FRAMES", "8"))
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+_NOISE_RE = re.compile(
+    "|".join([
+        r"^\s*\d{1,3}(\.\d+)?\s?%",  # 진행률
+        r"\[[#=>\-. ]{10,}\]",  # [=====>    ] 진행 막대
+        r"[━─█▏▎▍▌▋▊▉░▒▓]{5,}",
+        r"^\s*(downloading|downloaded|fetching|progress:)\s",
+        r"^\s*(receiving|resolving|unpacking|updating) (objects|deltas|files)",
+        r"^\s*remote: (counting|compressing|enumerating|total)",
+        r"^\s*(collecting|using cached|requirement already satisfied|obtaining)\s",  # pip
+        r"^\s*(get|hit|ign):\d+\s+https?://",  # apt
+        r"^\s*(\[info\]\s+)?download(ing|ed) from\s",  # maven
+    ]),
+    re.IGNORECASE
+)
+
+# 스택 프레임: Java/Kotlin "at ...(...)", Python 'File "...", line N', gdb/sanitizer "#N ..."
+_FRAME_RE = re.compile(r"^\s*(at\s+\S+\(.*\)\s*$|File \".*\", line \d+|#\d+\s+\S)")
+_PYTHON_FRAME_RE = re.compile(r"^\s*File \".*\", line \d+")
+
+_FOLD_MARKER = "    ... ({} frames omitted)"
+
+
+def _strip_control(line: str) -> str:
+    # \r로 덮어쓴 진행 표시는 마지막 내용만 화면에 남는다
+    if "\r" in line:
+        line = line.rstrip("\r").rsplit("\r", 1)[-1]
+    return _ANSI_RE.sub("", line)
+
+
+def _is_noise(line: str) -> bool:
+    return bool(_NOISE_RE.search(line)) and not SYMPTOM_REGEX.search(line)
+
+
+def _group_frames(lines: List[str]) -> List[List[str]]:
+    """줄 목록을 항목 단위로 묶음 (Python 프레임은 다음 줄의 소스 코드와 함께)"""
+    items: List[List[str]] = []
+    i = 0
+    while i < len(lines):
+        item = [lines[i]]
+        if (
+            _PYTHON_FRAME_RE.match(lines[i])
+            and i + 1 < len(lines)
+            and lines[i + 1][:1].isspace()
+            and not _FRAME_RE.match(lines[i + 1])
+        ):
+            item.append(lines[i + 1])
+            i += 1
+        items.append(item)
+        i += 1
+    return items
+
+
+def _fold_run(run: List[List[str]], max_frames: int) -> List[str]:
+    """연속 프레임 한 덩어리 접기"""
+    if len(run) <= max_frames:
+        return [line for frame in run for line in frame]
+
+    keep = {0, len(run) - 1}
+    for i, frame in enumerate(run):
+        if any(LOG_COMPRESS_OWN_SOURCES.search(line) for line in frame):
+            keep.update((i - 1, i, i + 1))
+
+    out: List[str] = []
+    omitted = 0
+    for i, frame in enumerate(run):
+        if i in keep:
+            if omitted:
+                out.append(_FOLD_MARKER.format(omitted))
+                omitted = 0
+            out.extend(frame)
+        else:
+            omitted += 1
+    return out
+
+
+def fold_stack_traces(lines: List[str], max_frames: int = LOG_COMPRESS_MAX_FRAMES) -> List[str]:
+    """max_frames 보다 긴 연속 스택 프레임을 접음"""
+    out: List[str] = []
+    run: List[List[str]] = []
+    for item in _group_frames(lines):
+        if _FRAME_RE.match(item[0]):
+            run.append(item)
+            continue
+        if run:
+            out.extend(_fold_run(run, max_frames))
+            run = []
+        out.extend(item)
+    if run:
+        out.extend(_fold_run(run, max_frames))
+    return out
+
+
+def collapse_repeats(lines: List[str]) -> List[str]:
+    """동일/템플릿 동일 줄은 첫 줄만 남기고 [×N] 표시, 연속 빈 줄은 하나로"""
+    counts: Dict[str, int] = {}
+    keys: List[str] = []
+    for line in lines:
+        key = normalize_line(line)
+        keys.append(key)
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+
+    out: List[str] = []
+    emitted = set()
+    for line, key in zip(lines, keys):
+        if not key:
+            if out and out[-1]:
+                out.append("")
+            continue
+        if key in emitted:
+            continue
+        emitted.add(key)
+        # 접힌 프레임 표시는 횟수를 붙이지 않음 (서로 다른 트레이스에서 나옴)
+        if counts[key] > 1 and not line.startswith("    ... ("):
+            line = f"{line}  [×{counts[key]}]"
+        out.append(line)
+    return out
+
+
+def compress_for_prompt(ci_log: str) -> str:
+    """
+    LLM 프롬프트에 넣을 로그 압축
+
+    원본보다 줄었으면 첫 줄에 압축 전후 줄 수를 적는다.
+    """
+    raw_lines = ci_log.splitlines()
+    lines = [_strip_control(line).rstrip() for line in raw_lines]
+    lines = [line for line in lines if not _is_noise(line)]
+    lines = fold_stack_traces(lines)
+    lines = collapse_repeats(lines)
+
+    while lines and not lines[-1]:
+        lines.pop()
+    if len(lines) >= len(raw_lines):
+        return ci_log
+    return "\n".join([f"[로그 압축: {len(raw_lines)}줄 → {len(lines)}줄]"] + lines)
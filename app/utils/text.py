@@ -1,66 +1,206 @@
+import hashlib
 import re
-from typing import List
+from collections import deque
+from typing import Deque, List
+
+
+SYMPTOM_PATTERNS = [
+    # 일반적인 오류 패턴
+    r"error[:\s]",
+    r"exception",
+    r"fail(ed)?",
+    r"not found",
+    r"missing",
+    r"undefined",
+    r"cannot (resolve|find)",
+    r"exit code [1-9]",
+    
+    # 자동차 SW 특화 패턴
+    r"compilation error",
+    r"linker error",
+    r"assembler error",
+    r"code generation error",
+    r"misra.*violation",
+    r"polyspace.*error",
+    r"tasking.*error",
+    r"nxp.*error",
+    r"s32.*error",
+    r"autosar.*error",
+    r"ecu extract.*failed",
+    r"rte.*generation.*error",
+    r"can.*timeout",
+    r"canoe.*error",
+    r"simulink.*error",
+    r"targetlink.*error",
+    r"vector.*error",
+    r"davinci.*error",
+    r"proof.*timeout",
+    r"static analysis.*error",
+    r"toolchain.*path.*not found",
+    r"capl.*error",
+    r"dbc.*error",
+    r"arxml.*error",
+    r"bsw.*error",
+    r"build.*failed",
+    r"test.*failed",
+    r"verification.*failed",
+]
+# 모듈 로드 시 한 번만 컴파일
+SYMPTOM_REGEX = re.compile("|".join(SYMPTOM_PATTERNS), re.IGNORECASE)
+
+# 모든 SYMPTOM_PATTERNS가 포함하는 키워드 (소문자)
+# 대부분의 줄은 키워드가 없으므로 정규식 전에 문자열 검색으로 후보 줄만 고른다
+SYMPTOM_KEYWORDS = (
+    "error", "exception", "fail", "not found", "missing",
+    "undefined", "cannot", "exit code", "violation", "timeout",
+)
+
+
+MAX_SYMPTOMS = 20
+
+
+class SymptomCollector:
+    """
+    줄 단위 증상 수집기 (스트리밍 입력용)
+
+    extract_symptoms()와 같은 결과를 내며, 로그 전체를 메모리에 두지 않는다.
+    """
+
+    def __init__(self, limit: int = MAX_SYMPTOMS):
+        self.limit = limit
+        self._matched: List[str] = []
+        self._seen = set()
+        # 매칭이 하나도 없을 때 fallback으로 쓰는 마지막 5줄
+        self._tail: Deque[str] = deque(maxlen=5)
+
+    def feed_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        self._tail.append(line)
+        # 상한에 도달하면 정규식 검사 생략
+        if len(self._matched) < self.limit and SYMPTOM_REGEX.search(line):
+            self._add(line)
+
+    def feed_text(self, text: str) -> None:
+        """
+        여러 줄을 한 번에 입력 (마지막 줄까지 완결된 텍스트)
+
+        청크 전체에서 키워드를 찾아 후보 줄에만 정규식을 적용한다. feed_line()을 줄마다 호출한 것과 결과가 같다.
+        """
+        lines = text.splitlines()
+
+        # fallback용 마지막 5줄
+        tail: List[str] = []
+        for line in reversed(lines):
+            line = line.strip()
+            if line:
+                tail.append(line)
+                if len(tail) == self._tail.maxlen:
+                    break
+        self._tail.extend(reversed(tail))
+
+        if len(self._matched) >= self.limit:
+            return
+        lowered = text.lower()
+        keywords = [k for k in SYMPTOM_KEYWORDS if k in lowered]
+        if not keywords:
+            return
+        lowered_lines = lowered.splitlines()
+        candidates = set()
+        for keyword in keywords:
+            candidates.update([i for i, line in enumerate(lowered_lines) if keyword in line])
+
+        for i in sorted(candidates):
+            line = lines[i].strip()
+            if SYMPTOM_REGEX.search(line):
+                self._add(line)
+                if len(self._matched) >= self.limit:
+                    break
+
+    def _add(self, line: str) -> None:
+        key = line[:300]
+        if key not in self._seen:
+            self._seen.add(key)
+            self._matched.append(key)
+
+    def symptoms(self) -> List[str]:
+        if self._matched:
+            return list(self._matched)
+        # fallback, dedup preserving order
+        uniq: List[str] = []
+        for l in self._tail:
+            if l not in uniq:
+                uniq.append(l)
+        return uniq[:self.limit]
 
 
 def extract_symptoms(ci_log: str) -> List[str]:
-    lines = [l.strip() for l in ci_log.splitlines() if l.strip()]
-    key_lines: List[str] = []
-    patterns = [
-        # 일반적인 오류 패턴
-        r"error[:\s]",
-        r"exception",
-        r"fail(ed)?",
-        r"not found",
-        r"missing",
-        r"undefined",
-        r"cannot (resolve|find)",
-        r"exit code [1-9]",
-        
-        # 자동차 SW 특화 패턴
-        r"compilation error",
-        r"linker error",
-        r"assembler error",
-        r"code generation error",
-        r"misra.*violation",
-        r"polyspace.*error",
-        r"tasking.*error",
-        r"nxp.*error",
-        r"s32.*error",
-        r"autosar.*error",
-        r"ecu extract.*failed",
-        r"rte.*generation.*error",
-        r"can.*timeout",
-        r"canoe.*error",
-        r"simulink.*error",
-        r"targetlink.*error",
-        r"vector.*error",
-        r"davinci.*error",
-        r"proof.*timeout",
-        r"static analysis.*error",
-        r"toolchain.*path.*not found",
-        r"capl.*error",
-        r"dbc.*error",
-        r"arxml.*error",
-        r"bsw.*error",
-        r"build.*failed",
-        r"test.*failed",
-        r"verification.*failed",
-    ]
-    regex = re.compile("|".join(patterns), re.IGNORECASE)
-    for line in lines:
-        if regex.search(line):
-            key_lines.append(line[:300])
-    # fallback
-    if not key_lines:
-        key_lines = lines[-5:]
-    # dedup preserving order
-    seen = set()
-    uniq: List[str] = []
-    for l in key_lines:
-        if l not in seen:
-            seen.add(l)
-            uniq.append(l)
-    return uniq[:20]
+    collector = SymptomCollector()
+    collector.feed_text(ci_log)
+    return collector.symptoms()
+
+
+# 템플릿 정규화: 빌드마다 달라지는 값(16진수 주소, 숫자)을 자리표시자로 치환
+_HEX_RE = re.compile(r"0x[0-9a-f]+", re.IGNORECASE)
+_NUM_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_line(line: str) -> str:
+    """로그 한 줄을 템플릿 형태로 정규화 (대소문자/숫자/주소/공백 차이 제거)"""
+    line = _HEX_RE.sub("<hex>", line.strip().lower())
+    line = _NUM_RE.sub("<n>", line)
+    return _SPACE_RE.sub(" ", line)
+
+
+def symptom_fingerprint(error_type: str, symptoms: List[str]) -> str:
+    """오류 타입 + 정규화된 증상 집합의 지문 (순서 무관)"""
+    normalized = sorted({normalize_line(s) for s in symptoms})
+    digest = hashlib.sha256()
+    digest.update(error_type.encode("utf-8"))
+    for line in normalized:
+        digest.update(b"\n")
+        digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LogFingerprinter:
+    """
+    로그 지문 계산기 (줄 단위로 누적 가능)
+
+    빈 줄을 무시하고 각 줄을 normalize_line()으로 정규화하므로
+    바이트가 같은 로그뿐 아니라 숫자/주소만 다른 템플릿 동일 로그도 같은 지문을 갖는다.
+    """
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+
+    def update(self, line: str) -> None:
+        normalized = normalize_line(line)
+        if normalized:
+            self._digest.update(normalized.encode("utf-8"))
+            self._digest.update(b"\n")
+
+    def update_text(self, text: str) -> None:
+        """여러 줄을 한 번에 입력 (치환을 줄 단위가 아닌 텍스트 전체에 한 번 적용)"""
+        text = _NUM_RE.sub("<n>", _HEX_RE.sub("<hex>", text.lower()))
+        for line in text.splitlines():
+            # normalize_line()의 strip + 공백 정리와 동일
+            normalized = " ".join(line.split())
+            if normalized:
+                self._digest.update(normalized.encode("utf-8"))
+                self._digest.update(b"\n")
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def log_fingerprint(ci_log: str) -> str:
+    """정규화된 로그 전체의 지문"""
+    fingerprinter = LogFingerprinter()
+    fingerprinter.update_text(ci_log)
+    return fingerprinter.hexdigest()
 
 
 def truncate_tokens(text: str, max_chars: int = 6000) -> str:
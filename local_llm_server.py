@@ -8,18 +8,35 @@ OpenAI API를 사용하여 CI 로그 분석을 수행합니다.
 
 import os
 import asyncio
+import json
+import math
+import time
 import yaml
-from typing import Dict, Any, Optional
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, AsyncIterator, Deque, List, Mapping, Optional, Tuple
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, RateLimitError
 import logging
 
+from app.llm.retry import RETRIES, decorrelated_jitter, retry_budget
+from app.services.metrics import metrics
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def parse_deployments_env(value: str) -> List[Dict[str, Any]]:
+    """AZURE_OPENAI_DEPLOYMENTS="gpt-4o-mini:150000:900,gpt-4o-mini-2:150000:900" 파싱"""
+    deployments = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, tpm, rpm = (item.split(":") + ["0", "0"])[:3]
+        deployments.append({"name": name, "tokens_per_minute": int(tpm or 0), "requests_per_minute": int(rpm or 0)})
+    return deployments
+
 # 설정 로드
 def load_config():
     """설정 파일에서 설정을 로드합니다."""
@@ -31,12 +48,22 @@ def load_config():
             "deployment_name": os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4.1-mini"),
             "api_version": os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
             "temperature": 0.2,
-            "max_tokens": 4096
+            "max_tokens": 4096,
+            # deployment_name 의 분당 토큰/요청 한도 (0이면 무제한)
+            "tokens_per_minute": int(os.getenv("AZURE_OPENAI_TPM", "0")),
+            "requests_per_minute": int(os.getenv("AZURE_OPENAI_RPM", "0")),
+            # 여러 배포 사용 시 "이름:TPM:RPM,이름:TPM:RPM" (설정 파일의 deployments 목록과 같음)
+            "deployments": parse_deployments_env(os.getenv("AZURE_OPENAI_DEPLOYMENTS", "")),
+            # 429 응답 시 다른 배포로 재시도하는 최대 횟수
+            "rate_limit_attempts": int(os.getenv("AZURE_OPENAI_RATE_LIMIT_ATTEMPTS", "3")),
+            # 스트리밍 응답에 실제 토큰 사용량 요청 (api_version 2024-09-01 이상 필요, 끄면 추정치)
+            "stream_include_usage": os.getenv("AZURE_OPENAI_STREAM_USAGE", "false").lower() == "true"
         },
         "server": {
             "port": 5678,
             "host": "0.0.0.0",
-            "timeout": 30
+            "timeout": 30,
+            "max_concurrency": int(os.getenv("LLM_SERVER_MAX_CONCURRENCY", "64"))
         }
     }
     
@@ -57,22 +84,271 @@ def load_config():
 
 config = load_config()
 
-# Azure OpenAI 클라이언트 초기화
+def create_azure_client(base_url: str, api_key: str, api_version: str) -> AsyncAzureOpenAI:
+    # 429 재시도는 DeploymentScheduler가 다른 배포로 처리하므로 SDK 자체 재시도는 끈다
+    return AsyncAzureOpenAI(azure_endpoint=base_url, api_key=api_key, api_version=api_version, max_retries=0)
+
+# Azure OpenAI 비동기 클라이언트 초기화 (서버 전체에서 하나를 공유 - 연결 풀 재사용)
 openai_client = None
 if config["azure_openai"]["api_key"] and config["azure_openai"]["base_url"]:
-    openai_client = AzureOpenAI(
-        azure_endpoint=config["azure_openai"]["base_url"],
-        api_key=config["azure_openai"]["api_key"],
-        api_version=config["azure_openai"]["api_version"]
+    openai_client = create_azure_client(
+        config["azure_openai"]["base_url"],
+        config["azure_openai"]["api_key"],
+        config["azure_openai"]["api_version"]
     )
 else:
     logger.warning("AZURE_OPENAI_API_KEY 또는 AZURE_OPENAI_BASE_URL이 설정되지 않았습니다. 환경변수를 설정하거나 config 파일을 확인하세요.")
 
+
+# Azure 분당 한도는 60초 슬라이딩 윈도우
+RATE_WINDOW_SECONDS = 60.0
+# Retry-After 헤더가 없을 때 배포를 쉬게 하는 시간 (초)
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """
+    요청 토큰 추정 (프롬프트 약 4글자/토큰 + max_tokens)
+
+    Azure도 요청 시점에 프롬프트 추정치와 max_tokens를 합쳐 TPM 한도에 반영한다.
+    """
+    prompt_chars = sum(len(m["content"]) for m in messages)
+    return math.ceil(prompt_chars / 4) + max_tokens
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float:
+    """429 응답의 retry-after-ms / retry-after(초 또는 HTTP 날짜) → 초"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    return DEFAULT_RETRY_AFTER_SECONDS
+
+
+class Deployment:
+    """Azure 배포 하나의 분당 토큰/요청 사용량 (60초 슬라이딩 윈도우)"""
+
+    def __init__(self, name: str, tokens_per_minute: int = 0, requests_per_minute: int = 0,
+                 client: Optional[AsyncAzureOpenAI] = None):
+        self.name = name
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        # None이면 기본 리소스의 공유 클라이언트(openai_client) 사용
+        self.client = client
+        self.blocked_until = 0.0
+        self.rate_limited = 0
+        self._usage: Deque[Tuple[float, int]] = deque()  # (시각, 토큰)
+
+    def _trim(self, now: float) -> None:
+        while self._usage and self._usage[0][0] <= now - RATE_WINDOW_SECONDS:
+            self._usage.popleft()
+
+    def used_tokens(self, now: float) -> int:
+        self._trim(now)
+        return sum(tokens for _, tokens in self._usage)
+
+    def headroom(self, now: float) -> float:
+        """남은 토큰 비율 (무제한이면 1)"""
+        if not self.tokens_per_minute:
+            return 1.0
+        return max(1 - self.used_tokens(now) / self.tokens_per_minute, 0.0)
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """tokens 만큼 요청을 보낼 수 있을 때까지 남은 시간 (0이면 지금 가능)"""
+        self._trim(now)
+        wait = max(self.blocked_until - now, 0.0)
+
+        if self.requests_per_minute and len(self._usage) >= self.requests_per_minute:
+            oldest = self._usage[len(self._usage) - self.requests_per_minute][0]
+            wait = max(wait, oldest + RATE_WINDOW_SECONDS - now)
+
+        if self.tokens_per_minute:
+            # 한도보다 큰 요청은 윈도우가 빌 때까지 기다렸다가 보냄
+            needed = min(tokens, self.tokens_per_minute)
+            excess = sum(t for _, t in self._usage) + needed - self.tokens_per_minute
+            for at, used in self._usage:
+                if excess <= 0:
+                    break
+                excess -= used
+                wait = max(wait, at + RATE_WINDOW_SECONDS - now)
+        return wait
+
+    def record(self, tokens: int, now: float) -> None:
+        self._usage.append((now, tokens))
+
+    def release(self, tokens: int) -> None:
+        """보내지 못한 요청의 예약 취소 (가장 최근의 같은 크기 예약 하나)"""
+        for index in range(len(self._usage) - 1, -1, -1):
+            if self._usage[index][1] == tokens:
+                del self._usage[index]
+                return
+
+    def status(self, now: float) -> Dict[str, Any]:
+        self._trim(now)
+        return {
+            "name": self.name,
+            "tokens_per_minute": self.tokens_per_minute,
+            "requests_per_minute": self.requests_per_minute,
+            "used_tokens": self.used_tokens(now),
+            "used_requests": len(self._usage),
+            "blocked_seconds": round(max(self.blocked_until - now, 0.0), 3),
+            "rate_limited": self.rate_limited
+        }
+
+
+class DeploymentScheduler:
+    """
+    여러 Azure 배포의 TPM/RPM 예산 기반 스케줄러
+
+    요청마다 토큰을 미리 추정해 예산이 남은 배포 중 여유가 가장 큰 곳으로 보낸다.
+    모든 예산이 소진되면 가장 먼저 비는 배포의 대기 시간만큼 (락 없이) 기다렸다가 다시 고르고,
+    429의 Retry-After 동안 해당 배포를 쉬게 한다 (Retry-After 대기는 decorrelated jitter로 흩뜨림). max_wait_seconds 안에 보낼 수 없으면 429로 거절한다.
+    """
+
+    def __init__(self, deployments: List[Deployment], max_wait_seconds: float):
+        self.deployments = deployments
+        self.max_wait_seconds = max_wait_seconds
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int, deadline: Optional[float] = None) -> Deployment:
+        """deadline(time.monotonic 기준)이 없으면 지금부터 max_wait_seconds 까지 대기"""
+        if deadline is None:
+            deadline = time.monotonic() + self.max_wait_seconds
+        self.waiting += 1
+        delay = 0.0
+        try:
+            while True:
+                # 배포 선택과 예약만 락 안에서 (대기 중에는 다른 요청이 여유 있는 배포를 쓸 수 있게 락을 놓음)
+                async with self._lock:
+                    now = time.monotonic()
+                    wait, _, index = min(
+                        (d.wait_time(tokens, now), -d.headroom(now), i)
+                        for i, d in enumerate(self.deployments)
+                    )
+                    if wait <= 0:
+                        deployment = self.deployments[index]
+                        deployment.record(tokens, now)
+                        return deployment
+                    if now + wait > deadline:
+                        raise HTTPException(
+                            status_code=429,
+                            detail="Azure OpenAI 배포 한도 소진",
+                            headers={"Retry-After": str(math.ceil(wait))}
+                        )
+                    if self.deployments[index].blocked_until - now >= wait:
+                        # 429 대기: 같은 Retry-After를 받은 요청들이 한꺼번에 깨어나 다시 몰리지 않게 흩뜨림
+                        delay = decorrelated_jitter(max(delay, wait), wait, deadline - now)
+                    else:
+                        delay = wait
+                await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+    def penalize(self, deployment: Deployment, retry_after: float, tokens: int = 0) -> None:
+        """429 응답을 받은 배포를 Retry-After 동안 제외하고, 거절된 요청의 예약(tokens)은 반환"""
+        if tokens:
+            deployment.release(tokens)
+        deployment.rate_limited += 1
+        deployment.blocked_until = max(deployment.blocked_until, time.monotonic() + retry_after)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {"waiting": self.waiting, "deployments": [d.status(now) for d in self.deployments]}
+
+
+def build_deployments(azure_config: Dict[str, Any]) -> List[Deployment]:
+    """설정의 deployments 목록 (없으면 deployment_name 하나) → Deployment"""
+    entries = azure_config.get("deployments") or [{
+        "name": azure_config["deployment_name"],
+        "tokens_per_minute": azure_config.get("tokens_per_minute", 0),
+        "requests_per_minute": azure_config.get("requests_per_minute", 0)
+    }]
+    deployments = []
+    for entry in entries:
+        client = None
+        # 다른 Azure 리소스의 배포는 별도 클라이언트 사용
+        if entry.get("base_url") and entry["base_url"] != azure_config["base_url"]:
+            client = create_azure_client(
+                entry["base_url"],
+                entry.get("api_key", azure_config["api_key"]),
+                entry.get("api_version", azure_config["api_version"])
+            )
+        deployments.append(Deployment(
+            name=entry["name"],
+            tokens_per_minute=int(entry.get("tokens_per_minute", 0)),
+            requests_per_minute=int(entry.get("requests_per_minute", 0)),
+            client=client
+        ))
+    return deployments
+
+
+deployment_scheduler = DeploymentScheduler(build_deployments(config["azure_openai"]), float(config["server"]["timeout"]))
+
+
+class ConcurrencyLimiter:
+    """
+    Azure OpenAI 동시 호출 제한 (asyncio.Semaphore)
+
+    요청은 이벤트 루프에서 대기하므로 스레드를 점유하지 않는다.
+    한도를 넘는 요청은 슬롯이 빌 때까지 기다린다.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def status(self) -> Dict[str, int]:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting}
+
+
+llm_limiter = ConcurrencyLimiter(int(config["server"]["max_concurrency"]))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료 시 공유 클라이언트의 연결 풀 정리
+    if openai_client:
+        await openai_client.close()
+    for deployment in deployment_scheduler.deployments:
+        if deployment.client:
+            await deployment.client.close()
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="Local LLM Server",
     description="n8n을 대체하는 로컬 LLM 분석 서버",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 요청 모델
@@ -87,6 +363,8 @@ class AnalyzeRequest(BaseModel):
 class AnalyzeResponse(BaseModel):
     analysis: str
     confidence: float
+    # {"prompt_tokens", "completion_tokens"}
+    usage: Optional[Dict[str, int]] = None
 
 def calculate_confidence(analysis: str) -> float:
     """분석 결과 길이에 따른 신뢰도 계산"""
@@ -102,16 +380,7 @@ def calculate_confidence(analysis: str) -> float:
     else:
         return 0.5
 
-def analyze_with_openai(request: AnalyzeRequest) -> Dict[str, Any]:
-    """Azure OpenAI API를 사용하여 CI 로그 분석"""
-    if not openai_client:
-        raise HTTPException(
-            status_code=503,
-            detail="Azure OpenAI API 키 또는 Base URL이 설정되지 않음"
-        )
-    
-    # 프롬프트 구성
-    system_prompt = """당신은 자동차 소프트웨어 CI/CD 오류 분석 전문가입니다.
+SYSTEM_PROMPT = """당신은 자동차 소프트웨어 CI/CD 오류 분석 전문가입니다.
 
 다음 형식으로 분석 결과를 제공해주세요:
 
@@ -135,6 +404,8 @@ def analyze_with_openai(request: AnalyzeRequest) -> Dict[str, Any]:
 
 간단하고 명확하게, 실제로 실행 가능한 해결책을 제시해주세요."""
 
+def build_messages(request: AnalyzeRequest) -> List[Dict[str, str]]:
+    """분석 요청 → Chat Completions 메시지"""
     user_prompt = f"""다음 CI 로그 오류를 분석해주세요:
 
 **오류 타입**: {request.error_type}
@@ -148,25 +419,101 @@ def analyze_with_openai(request: AnalyzeRequest) -> Dict[str, Any]:
 {f"**컨텍스트**: {request.context}" if request.context else ""}
 {f"**저장소**: {request.repository}" if request.repository else ""}"""
 
-    try:
-        response = openai_client.chat.completions.create(
-            model=config["azure_openai"]["deployment_name"],
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=config["azure_openai"]["temperature"],
-            max_tokens=config["azure_openai"]["max_tokens"]
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def ensure_openai_client():
+    if not openai_client:
+        raise HTTPException(
+            status_code=503,
+            detail="Azure OpenAI API 키 또는 Base URL이 설정되지 않음"
         )
+
+async def create_completion(request: AnalyzeRequest, stream: bool = False, slot_holder: Optional[AsyncExitStack] = None):
+    """
+    예산이 남은 배포로 Chat Completions 호출
+
+    429를 받으면 Retry-After 동안 그 배포를 제외하고 다른 배포(또는 대기 후 같은 배포)로 재시도한다.
+    재시도는 프로세스 전체 재시도 예산(app/llm/retry.py)을 쓰고, 요청 마감(server.timeout) 안에
+    보낼 수 없으면 하지 않는다.
+    동시 호출 슬롯은 배포 예산을 확보한 뒤 실제 호출 동안만 잡으므로 예산을 기다리는 요청이 슬롯을 막지 않는다.
+    slot_holder를 주면 성공한 호출의 슬롯을 거기로 넘겨 호출자가 (스트림이 끝날 때) 반환한다.
+    """
+    messages = build_messages(request)
+    max_tokens = config["azure_openai"]["max_tokens"]
+    tokens = estimate_tokens(messages, max_tokens)
+    retry_after = DEFAULT_RETRY_AFTER_SECONDS
+
+    options: Dict[str, Any] = {}
+    if stream and config["azure_openai"]["stream_include_usage"]:
+        options["stream_options"] = {"include_usage": True}
+
+    # 첫 시도와 재시도 모두 같은 요청 마감 안에서 배포를 기다림
+    deadline = time.monotonic() + deployment_scheduler.max_wait_seconds
+    retry_budget.record_request()
+    for attempt in range(config["azure_openai"]["rate_limit_attempts"]):
+        if attempt and not retry_budget.try_spend():
+            RETRIES.inc(provider="azure", decision="budget_exhausted")
+            break
+        try:
+            deployment = await deployment_scheduler.acquire(tokens, deadline)
+        except HTTPException:
+            if attempt:
+                RETRIES.inc(provider="azure", decision="deadline")
+            raise
+        if attempt:
+            RETRIES.inc(provider="azure", decision="retried")
+        client = deployment.client or openai_client
+        async with AsyncExitStack() as slot:
+            await slot.enter_async_context(llm_limiter.slot())
+            try:
+                response = await client.chat.completions.create(
+                    model=deployment.name,
+                    messages=messages,
+                    temperature=config["azure_openai"]["temperature"],
+                    max_tokens=max_tokens,
+                    stream=stream,
+                    **options
+                )
+            except RateLimitError as e:
+                retry_after = parse_retry_after(e.response.headers)
+                # 재시도는 다른 배포에 다시 예약하므로 요청당 예약은 항상 하나
+                deployment_scheduler.penalize(deployment, retry_after, tokens)
+                logger.warning(f"Azure 배포 {deployment.name} 429 - {retry_after:.1f}초 제외")
+                continue
+            if slot_holder is not None:
+                slot_holder.push_async_exit(slot.pop_all())
+            return response
+    else:
+        RETRIES.inc(provider="azure", decision="attempts")
+
+    raise HTTPException(
+        status_code=429,
+        detail="Azure OpenAI 요청 한도 초과",
+        headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
+async def analyze_with_openai(request: AnalyzeRequest) -> Dict[str, Any]:
+    """Azure OpenAI API를 사용하여 CI 로그 분석"""
+    ensure_openai_client()
+
+    try:
+        response = await create_completion(request)
         
         analysis = response.choices[0].message.content
         confidence = calculate_confidence(analysis)
+        usage = getattr(response, "usage", None)
         
         return {
             "analysis": analysis,
-            "confidence": confidence
+            "confidence": confidence,
+            "usage": {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens} if usage else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Azure OpenAI API 호출 실패: {e}")
         raise HTTPException(
@@ -174,6 +521,48 @@ def analyze_with_openai(request: AnalyzeRequest) -> Dict[str, Any]:
             detail=f"LLM 분석 실패: {str(e)}"
         )
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 한 개"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_with_openai(request: AnalyzeRequest) -> AsyncIterator[str]:
+    """
+    Azure OpenAI 스트리밍 응답을 SSE로 변환
+
+    token 이벤트로 생성되는 텍스트를 바로 보내고, 마지막에 done 이벤트로
+    전체 분석, 신뢰도, 토큰 사용량을 보낸다. 생성 중 실패하면 error 이벤트로 끝난다.
+    Azure가 사용량을 보내지 않으면(stream_include_usage 꺼짐) 프롬프트 글자 수와 청크 수로 추정한다.
+    동시 호출 슬롯은 스트림이 끝날 때까지 유지하며, 클라이언트가 끊으면 상위 스트림도 닫는다.
+    """
+    try:
+        parts: List[str] = []
+        usage = None
+        async with AsyncExitStack() as slot:
+            stream = await create_completion(request, stream=True, slot_holder=slot)
+            async with stream:
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage = {"prompt_tokens": chunk.usage.prompt_tokens, "completion_tokens": chunk.usage.completion_tokens}
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        parts.append(text)
+                        yield sse_event("token", {"text": text})
+
+        analysis = "".join(parts)
+        if usage is None:
+            # 스트리밍 청크는 대략 토큰 하나씩
+            usage = {"prompt_tokens": estimate_tokens(build_messages(request), 0), "completion_tokens": len(parts)}
+        yield sse_event("done", {"analysis": analysis, "confidence": calculate_confidence(analysis), "usage": usage})
+
+    except HTTPException as e:
+        logger.error(f"Azure OpenAI 스트리밍 실패: {e.detail}")
+        yield sse_event("error", {"detail": e.detail})
+    except Exception as e:
+        logger.error(f"Azure OpenAI 스트리밍 실패: {e}")
+        yield sse_event("error", {"detail": f"LLM 분석 실패: {str(e)}"})
+
 @app.get("/")
 async def root():
     """서버 상태 확인"""
@@ -187,10 +576,21 @@ async def root():
 @app.get("/health")
 async def health_check():
     """헬스 체크"""
-    return {"status": "healthy", "openai_available": bool(openai_client)}
+    return {
+        "status": "healthy",
+        "openai_available": bool(openai_client),
+        "concurrency": llm_limiter.status(),
+        "rate_limits": deployment_scheduler.status(),
+        "retry_budget": retry_budget.status()
+    }
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 텍스트 포맷 메트릭 (재시도 예산 소진 등)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.post("/webhook/llm-analyze", response_model=AnalyzeResponse)
-def analyze_ci_error(request: AnalyzeRequest):
+async def analyze_ci_error(request: AnalyzeRequest):
     """
     CI 오류 분석 엔드포인트
     
@@ -199,7 +599,7 @@ def analyze_ci_error(request: AnalyzeRequest):
     logger.info(f"CI 오류 분석 요청: {request.error_type}")
     
     try:
-        result = analyze_with_openai(request)
+        result = await analyze_with_openai(request)
         logger.info(f"분석 완료: 신뢰도 {result['confidence']}")
         return result
         
@@ -212,6 +612,22 @@ def analyze_ci_error(request: AnalyzeRequest):
             detail=f"분석 처리 중 오류: {str(e)}"
         )
 
+@app.post("/webhook/llm-analyze/stream")
+async def analyze_ci_error_stream(request: AnalyzeRequest):
+    """
+    CI 오류 분석 스트리밍 엔드포인트 (text/event-stream)
+
+    이벤트: token {"text"} ... → done {"analysis", "confidence"} 또는 error {"detail"}
+    """
+    logger.info(f"CI 오류 스트리밍 분석 요청: {request.error_type}")
+    ensure_openai_client()
+
+    return StreamingResponse(
+        stream_with_openai(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """전역 예외 처리"""
@@ -228,7 +644,7 @@ if __name__ == "__main__":
     host = config["server"]["host"]
     
     logger.info(f"로컬 LLM 서버 시작: http://{host}:{port}")
-    logger.info(f"Azure OpenAI 모델: {config['azure_openai']['deployment_name']}")
+    logger.info(f"Azure OpenAI 배포: {', '.join(d.name for d in deployment_scheduler.deployments)}")
     
     if not openai_client:
         logger.warning("⚠️ Azure OpenAI API 키 또는 Base URL이 설정되지 않았습니다!")
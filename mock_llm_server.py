@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server
+
+local_llm_server.py와 같은 webhook API를 네트워크 없이 흉내 내는 부하 테스트용 서버.
+응답/지연/오류율은 app/llm/mock.py의 MockLLMClient 설정(MOCK_LLM_* 환경변수)을 따른다.
+
+    MOCK_LLM_LATENCY=lognormal:1.5,0.6 python mock_llm_server.py
+    LLM_WEBHOOK_URL=http://localhost:5679/webhook/llm-analyze  # K8s 앱 쪽 설정
+"""
+
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.llm.mock import MOCK_LLM_CASSETTE_MODE, MOCK_LLM_RECORD_PROVIDER, MockLLMClient, MockLLMError, split_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def create_mock_client() -> MockLLMClient:
+    inner = None
+    if MOCK_LLM_CASSETTE_MODE == "record":
+        # cassette 기록용 실제 provider (설정은 provider.py와 같음)
+        from app.llm.provider import _create_client
+        from app.utils.config import load_config
+        try:
+            config = load_config()
+        except Exception:
+            config = {}
+        inner = _create_client(MOCK_LLM_RECORD_PROVIDER, config)
+    return MockLLMClient(inner=inner)
+
+
+mock_client = create_mock_client()
+
+app = FastAPI(
+    title="Mock LLM Server",
+    description="부하 테스트/오프라인 벤치마크용 LLM webhook",
+    version="1.0.0"
+)
+
+
+class AnalyzeRequest(BaseModel):
+    ci_log: str
+    symptoms: list
+    error_type: str
+    context: Optional[str] = None
+    repository: Optional[str] = None
+
+
+class AnalyzeResponse(BaseModel):
+    analysis: str
+    confidence: float
+    usage: Optional[Dict[str, int]] = None
+
+
+def calculate_confidence(analysis: str) -> float:
+    """분석 결과 길이에 따른 신뢰도 (local_llm_server와 같은 기준)"""
+    for length, confidence in ((500, 0.9), (300, 0.8), (200, 0.7), (100, 0.6)):
+        if len(analysis) > length:
+            return confidence
+    return 0.5
+
+
+def build_prompt(request: AnalyzeRequest) -> str:
+    """요청 → 프롬프트 (같은 요청이면 같은 cassette 키)"""
+    symptoms: List[str] = [f"- {symptom}" for symptom in request.symptoms]
+    return "\n".join([
+        f"**오류 타입**: {request.error_type}",
+        "**증상**:",
+        *symptoms,
+        "**CI 로그**:",
+        request.ci_log,
+        f"**컨텍스트**: {request.context or ''}",
+        f"**저장소**: {request.repository or ''}"
+    ])
+
+
+def estimate_usage(prompt: str, analysis: str) -> Dict[str, int]:
+    """토큰 사용량 추정 (프롬프트 약 4글자/토큰, 응답은 스트리밍 토큰 수)"""
+    return {"prompt_tokens": (len(prompt) + 3) // 4, "completion_tokens": len(split_tokens(analysis))}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "mock": True,
+        "latency": mock_client.latency.kind,
+        "error_rate": mock_client.error_rate,
+        "tokens_per_second": mock_client.tokens_per_second
+    }
+
+
+@app.post("/webhook/llm-analyze", response_model=AnalyzeResponse)
+async def analyze_ci_error(request: AnalyzeRequest):
+    prompt = build_prompt(request)
+    try:
+        analysis = await mock_client.achain(prompt)
+    except MockLLMError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"analysis": analysis, "confidence": calculate_confidence(analysis), "usage": estimate_usage(prompt, analysis)}
+
+
+async def stream_mock(request: AnalyzeRequest) -> AsyncIterator[str]:
+    prompt = build_prompt(request)
+    parts: List[str] = []
+    try:
+        async for token in mock_client.astream(prompt):
+            parts.append(token)
+            yield sse_event("token", {"text": token})
+    except MockLLMError as e:
+        yield sse_event("error", {"detail": str(e)})
+        return
+    analysis = "".join(parts)
+    yield sse_event("done", {
+        "analysis": analysis, "confidence": calculate_confidence(analysis), "usage": estimate_usage(prompt, analysis)
+    })
+
+
+@app.post("/webhook/llm-analyze/stream")
+async def analyze_ci_error_stream(request: AnalyzeRequest):
+    return StreamingResponse(
+        stream_mock(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.getenv("MOCK_LLM_PORT", "5679"))
+    logger.info(f"Mock LLM 서버 시작: http://0.0.0.0:{port} (latency={mock_client.latency.kind})")
+    uvicorn.run("mock_llm_server:app", host="0.0.0.0", port=port, log_level="info")
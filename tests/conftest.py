@@ -14,6 +14,8 @@ os.environ["PRIVATE_LLM_BASE_URL"] = ""
 os.environ["SEARCH_ENGINE"] = "none"
 os.environ["JWT_SECRET_KEY"] = "test-secret-key"
 os.environ["BASE_URL"] = "http://localhost:8000"
+# 테스트마다 LLM 호출 여부를 확인하므로 분석 캐시는 기본 비활성화 (test_llm_cache.py에서 별도 생성)
+os.environ["LLM_CACHE_ENABLED"] = "false"
 
 
 @pytest.fixture(scope="session")
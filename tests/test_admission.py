@@ -0,0 +1,68 @@
+"""
+LLM 호출 승인 제어 테스트
+"""
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main_simple import app
+from app.services import admission
+from app.services.admission import AdmissionController
+from app.services.analysis_engine import analysis_engine
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """토큰 보충 시간 제어"""
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_burst_and_refill(clock):
+    """burst 만큼 허용 후 거부, 시간이 지나면 보충"""
+    controller = AdmissionController(repo_limits=(60, 2), job_limits=(60, 100))
+
+    assert [controller.admit("noisy-repo", None) for _ in range(3)] == [True, True, False]
+    assert controller.admit("other-repo", None)
+
+    clock[0] += 1.0  # 분당 60개 → 1초에 1개
+    assert controller.admit("noisy-repo", None)
+    assert not controller.admit("noisy-repo", None)
+
+
+def test_empty_job_bucket_does_not_consume_repo_token(clock):
+    """job_name 버킷이 비면 repository 토큰도 차감하지 않음, 버킷별 설정 적용"""
+    controller = AdmissionController(
+        repo_limits=(60, 1),
+        job_limits=(60, 1),
+        overrides={"job_name:nightly": (60, 0)}
+    )
+
+    assert not controller.admit("repo", "nightly")
+    assert controller.admit("repo", "ci")
+
+
+def test_rejected_request_gets_kb_only_answer(monkeypatch):
+    """버킷이 비면 LLM을 호출하지 않고 KB 결과만으로 응답"""
+    calls = []
+
+    async def fake_llm(**kwargs):
+        calls.append(kwargs)
+        return {"analysis": "LLM 분석", "confidence": 0.7}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_llm)
+    monkeypatch.setattr(analysis_engine, "admission", AdmissionController(repo_limits=(0, 1), job_limits=(0, 10)))
+
+    with TestClient(app) as client:
+        responses = [
+            client.post("/analyze", json={
+                "ci_log": f"Unknown tool {uuid.uuid4().hex}:\nstage {i} error: widget stalled\n",
+                "repository": "noisy-repo"
+            }).json()
+            for i in range(2)
+        ]
+
+    assert len(calls) == 1
+    assert responses[0]["security_status"] == "llm_analyzed"
+    assert responses[1]["security_status"] == "kb_degraded"
+    assert "한도를 초과" in responses[1]["analysis"]
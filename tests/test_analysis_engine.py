@@ -0,0 +1,39 @@
+"""
+앱 범위 분석 엔진 테스트
+"""
+import asyncio
+import pytest
+from app.services.analysis_engine import AnalysisEngine
+from app.services.llm_client import LLMClient
+
+
+@pytest.fixture
+def engine():
+    """LLM webhook 없는 엔진"""
+    llm = LLMClient()
+    llm.webhook_url = None
+    engine = AnalysisEngine(llm=llm)
+    asyncio.run(engine.startup())
+    yield engine
+    asyncio.run(engine.shutdown())
+
+
+def test_startup_sets_ready(engine):
+    """워밍업 후 ready 상태"""
+    assert engine.ready
+    assert engine.workflow is not None
+
+
+def test_workflow_compiled_once(engine):
+    """그래프는 한 번만 컴파일"""
+    assert engine.analyzer.get_workflow() is engine.workflow
+
+
+def test_analyze_without_llm(engine, sample_ci_log):
+    """LLM 미설정 시 KB 결과 또는 fallback 분석"""
+    result = asyncio.run(engine.analyze(ci_log=sample_ci_log, repository="test-repo"))
+
+    assert result["error_type"] == "tasking"
+    assert len(result["symptoms"]) > 0
+    assert result["security_status"] in ["kb_analyzed", "analysis_failed"]
+    assert 0 <= result["confidence"] <= 1.0
@@ -65,3 +65,25 @@ def test_kb_list_endpoint():
     assert "total" in data
     assert "entries" in data
     assert isinstance(data["entries"], list)
+
+
+def test_analyze_batch_endpoint(sample_ci_log, sample_nxp_log):
+    """배치 분석 엔드포인트 테스트 (동일 증상은 한 번만 분석)"""
+    response = client.post(
+        "/analyze/batch",
+        json={
+            "requests": [
+                {"ci_log": sample_ci_log, "job_name": "MATRIX-A", "build_number": 1},
+                {"ci_log": sample_ci_log.replace("45", "46"), "job_name": "MATRIX-B", "build_number": 1},
+                {"ci_log": sample_nxp_log, "job_name": "MATRIX-C", "build_number": 1}
+            ]
+        }
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert len(data["results"]) == 3
+    assert data["unique_failures"] == 2
+    assert len({r["analysis_id"] for r in data["results"]}) == 3
+    assert data["results"][0]["analysis"] == data["results"][1]["analysis"]
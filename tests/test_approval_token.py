@@ -0,0 +1,53 @@
+"""
+HMAC 승인 토큰 테스트
+"""
+import pytest
+from datetime import datetime, timedelta
+from app.auth.approval_token import ApprovalTokenVerifier, create_signed_token
+from app.auth.jwt_handler import create_approval_token
+
+
+def test_signed_token_roundtrip():
+    """승인 대기 ID/만료 시각 복원, JWT보다 짧음"""
+    expires_at = datetime.utcnow().replace(microsecond=0) + timedelta(days=7)
+    token = create_signed_token(42, expires_at)
+    payload = ApprovalTokenVerifier().verify(token)
+
+    assert len(token) < 64
+    assert payload["pending_approval_id"] == 42
+    assert datetime.utcfromtimestamp(payload["exp"]) == expires_at
+
+
+def test_tampered_and_expired_tokens_rejected():
+    """서명 불일치/형식 오류/만료 토큰 거부"""
+    verifier = ApprovalTokenVerifier()
+    token = create_signed_token(42, datetime.utcnow() + timedelta(days=7))
+    other = create_signed_token(43, datetime.utcnow() + timedelta(days=7))
+    forged = other.split(".")[0] + "." + token.split(".")[1]
+
+    assert "error" in verifier.verify(forged)
+    assert "error" in verifier.verify("invalid.token.here")
+    assert "error" in verifier.verify("")
+    assert "error" in verifier.verify(create_signed_token(42, datetime.utcnow() - timedelta(seconds=1)))
+
+
+def test_verified_tokens_cached_with_bound():
+    """검증된 토큰은 LRU에 보관되고 크기 제한을 넘지 않음"""
+    verifier = ApprovalTokenVerifier(cache_size=2)
+    tokens = [create_signed_token(i, datetime.utcnow() + timedelta(days=1)) for i in range(3)]
+
+    for token in tokens:
+        assert verifier.verify(token)["pending_approval_id"] == tokens.index(token)
+
+    assert list(verifier._cache) == tokens[1:]
+    assert verifier.verify(tokens[0])["pending_approval_id"] == 0
+    assert list(verifier._cache) == [tokens[2], tokens[0]]
+
+
+def test_legacy_jwt_links_accepted_during_transition():
+    """이미 발송된 JWT 링크는 전환 기간 동안 검증, 끄면 거부"""
+    token = create_approval_token(analysis_id=1, pending_approval_id=42, admin_email="admin")
+
+    assert ApprovalTokenVerifier().verify(token)["pending_approval_id"] == 42
+    assert "error" in ApprovalTokenVerifier().verify(token[:-2] + "xx")
+    assert "error" in ApprovalTokenVerifier(legacy_jwt=False).verify(token)
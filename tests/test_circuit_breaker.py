@@ -0,0 +1,78 @@
+"""
+LLM webhook 서킷 브레이커 / 적응형 타임아웃 테스트
+"""
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.services import circuit_breaker
+from app.services.circuit_breaker import AdaptiveTimeout, CircuitBreaker
+from app.services.llm_client import LLMClient
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_then_half_open_probe(clock):
+    """연속 실패로 open, 대기 후 시험 호출 1개만 허용, 성공하면 closed"""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=10)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock[0] += 10
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # 시험 호출 진행 중
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_timeout_follows_p99_and_backs_off():
+    """충분한 표본 후 p99 × 배수, 타임아웃이 이어지면 최대값까지 늘어남"""
+    timeout = AdaptiveTimeout("test", max_seconds=30, min_seconds=1, multiplier=2.0, window=100)
+    assert timeout.current() == 30
+
+    for _ in range(100):
+        timeout.record(2.0)
+    assert timeout.current() == 4.0
+
+    for _ in range(10):
+        timeout.record(timeout.current())
+    assert timeout.current() == 30
+
+
+async def test_open_breaker_fails_fast_without_calling(monkeypatch):
+    """서버 연속 실패 후에는 요청을 보내지 않고 바로 503"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    monkeypatch.setenv("LLM_WEBHOOK_URL", "http://llm.test/webhook/llm-analyze")
+    client = LLMClient()
+    endpoint = client.endpoints.endpoints[0]
+    endpoint.breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc:
+            await client.call_llm_analysis(ci_log="log", symptoms=["error"], error_type="unknown")
+
+    assert len(calls) == 2
+    assert "서킷 브레이커" in exc.value.detail
+    assert endpoint.breaker.state == "open"
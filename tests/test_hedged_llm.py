@@ -0,0 +1,61 @@
+"""
+provider 간 hedged LLM 요청 테스트
+"""
+import asyncio
+import pytest
+from app.llm.provider import HedgedLLMClient
+
+
+class FakeProvider:
+    """지정한 시간 뒤 응답(또는 실패)하는 provider"""
+
+    def __init__(self, name, delay, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = 0
+
+    async def achain(self, prompt: str) -> str:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} 실패")
+        return f"{self.name}: {prompt}"
+
+
+async def test_fast_primary_does_not_hedge():
+    """지연 시간 안에 주 provider가 응답하면 보조 provider는 호출하지 않음"""
+    secondary = FakeProvider("secondary", 0)
+    client = HedgedLLMClient(FakeProvider("primary", 0.01), secondary, max_delay=0.5)
+
+    assert await client.achain("p") == "primary: p"
+    assert len(client._latencies) == 1
+
+
+async def test_slow_primary_hedged_and_cancelled():
+    """지연 초과 시 보조 provider 응답을 쓰고 늦은 주 요청은 취소"""
+    primary = FakeProvider("primary", 5)
+    client = HedgedLLMClient(primary, FakeProvider("secondary", 0.01), max_delay=0.05)
+
+    assert await client.achain("p") == "secondary: p"
+    await asyncio.sleep(0)
+    assert primary.cancelled == 1
+
+
+async def test_primary_failure_falls_over_and_p95_delay():
+    """주 provider가 실패하면 바로 보조 요청, 지연 시간은 p95를 범위 안으로 제한"""
+    client = HedgedLLMClient(FakeProvider("primary", 0, fail=True), FakeProvider("secondary", 0), max_delay=60)
+    assert await asyncio.wait_for(client.achain("p"), timeout=1) == "secondary: p"
+
+    both_fail = HedgedLLMClient(FakeProvider("a", 0, fail=True), FakeProvider("b", 0, fail=True))
+    with pytest.raises(RuntimeError):
+        await both_fail.achain("p")
+
+    client = HedgedLLMClient(FakeProvider("primary", 0), FakeProvider("secondary", 0), min_delay=0.5, max_delay=3)
+    client._latencies.extend([1.0] * 95 + [2.0] * 4 + [9.0])
+    assert client.hedge_delay() == 1.0
+    client._latencies.extend([9.0] * 10)
+    assert client.hedge_delay() == 3
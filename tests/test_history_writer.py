@@ -0,0 +1,138 @@
+"""
+분석 이력 write-behind 저장 테스트
+"""
+import asyncio
+import time
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+import app.main_simple as main_simple
+from app.services import history_writer as history_writer_module
+from app.db.connection import SessionLocal, init_db
+from app.db.models import AnalysisHistory, PendingApproval
+from app.main_simple import app
+from app.services.analysis_engine import analysis_engine
+from app.services.history_writer import HistoryWriter, IdAllocator
+
+
+def test_id_allocator_reserves_unique_ids_after_max():
+    """SQLite: 현재 최대 ID 이후의 겹치지 않는 ID를 블록 단위로 할당"""
+    init_db()
+    with SessionLocal() as db:
+        current_max = db.scalar(select(func.max(AnalysisHistory.id))) or 0
+
+    allocator = IdAllocator(AnalysisHistory, block_size=3)
+
+    async def allocate():
+        return await asyncio.gather(*(allocator.next_id() for _ in range(7)))
+
+    ids = asyncio.run(allocate())
+
+    assert sorted(ids) == list(range(current_max + 1, current_max + 8))
+
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    """write-behind 모드 writer (긴 주기로 만들어 sync 전에는 저장되지 않게 함)"""
+    writer = HistoryWriter(enabled=True, flush_interval_ms=60000, max_batch=1000)
+    monkeypatch.setattr(main_simple, "history_writer", writer)
+    return writer
+
+
+def test_write_behind_analyze_persists_on_flush(write_behind, monkeypatch):
+    """응답은 즉시, 저장은 writer flush 시 일괄 수행 (승인 토큰도 유효)"""
+    async def fake_llm(**kwargs):
+        return {"analysis": "LLM 분석 결과 " * 20, "confidence": 0.75}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_llm)
+    logs = [f"Unknown tool {uuid.uuid4().hex}:\nstage {i} error: widget stalled\n" for i in range(3)]
+
+    with TestClient(app) as client:
+        responses = [client.post("/analyze", json={"ci_log": log}).json() for log in logs]
+        ids = [r["analysis_id"] for r in responses]
+
+        with SessionLocal() as db:
+            assert db.scalar(select(func.count()).select_from(AnalysisHistory).where(AnalysisHistory.id.in_(ids))) == 0
+
+        # 읽기 경로는 대기 중인 항목을 먼저 저장
+        assert client.get(f"/history/{ids[0]}/log").text == logs[0]
+        assert client.get(responses[1]["approval_url"].replace("http://localhost:8000", "")).status_code == 200
+
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(AnalysisHistory).where(AnalysisHistory.id.in_(ids))) == 3
+        pending = db.scalar(select(PendingApproval).where(PendingApproval.analysis_id == ids[1]))
+        assert pending.approval_status == "approved"
+
+
+def test_dropped_batch_forgets_blob_and_fails_waiters(monkeypatch):
+    """재시도 후 버려진 배치의 로그 해시는 중복 제거에 쓰지 않고, 대기자에게 실패를 알림"""
+    async def broken_store_blob(db, **blob):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(history_writer_module, "store_blob", broken_store_blob)
+    writer = HistoryWriter(enabled=True, flush_interval_ms=1, max_batch=1000)
+    digest = uuid.uuid4().hex
+
+    async def scenario():
+        writer.submit(history={"id": -1}, blob={"digest": digest, "codec": "raw", "data": b"log", "raw_size": 3})
+        assert not writer.has_blob(digest)
+        with pytest.raises(RuntimeError):
+            await writer.wait_written(-1)
+
+    asyncio.run(scenario())
+
+    assert not writer.has_blob(digest)
+
+
+def test_failed_row_does_not_hold_back_batch(monkeypatch):
+    """배치 중 한 행만 실패하면 나머지는 바로 커밋되고 실패한 행만 재시도 횟수를 씀"""
+    real_store_blob = history_writer_module.store_blob
+    bad_digest = uuid.uuid4().hex
+
+    async def flaky_store_blob(db, **blob):
+        if blob["digest"] == bad_digest:
+            raise RuntimeError("bad row")
+        await real_store_blob(db, **blob)
+
+    monkeypatch.setattr(history_writer_module, "store_blob", flaky_store_blob)
+    init_db()
+    writer = HistoryWriter(enabled=True, flush_interval_ms=60000, max_batch=1000)
+
+    async def scenario():
+        ids = [await writer.history_ids.next_id() for _ in range(3)]
+        writer.submit(history={"id": ids[0], "context": "ok"})
+        writer.submit(history={"id": ids[1]}, blob={"digest": bad_digest, "codec": "raw", "data": b"log", "raw_size": 3})
+        writer.submit(history={"id": ids[2], "context": "ok"})
+        await writer.flush()
+        return ids
+
+    ids = asyncio.run(scenario())
+
+    with SessionLocal() as db:
+        assert db.get(AnalysisHistory, ids[0]) is not None
+        assert db.get(AnalysisHistory, ids[1]) is None
+        assert db.get(AnalysisHistory, ids[2]) is not None
+    assert [(item.history["id"], item.attempts) for item in writer._items] == [(ids[1], 1)]
+
+
+def test_job_waits_for_write_behind_history(write_behind, monkeypatch):
+    """비동기 작업은 이력이 커밋된 뒤에 analysis_id를 기록"""
+    async def fake_llm(**kwargs):
+        return {"analysis": "LLM 분석 결과 " * 20, "confidence": 0.75}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_llm)
+    log = f"Unknown tool {uuid.uuid4().hex}:\nstage 9 error: widget stalled\n"
+
+    with TestClient(app) as client:
+        job_id = client.post("/analyze/jobs", json={"ci_log": log}).json()["job_id"]
+        deadline = time.time() + 10
+        while (job := client.get(f"/analyze/jobs/{job_id}").json())["status"] in ("queued", "running"):
+            assert time.time() < deadline
+            time.sleep(0.05)
+
+        # writer 주기(60초)를 기다리지 않고 이미 커밋되어 있어야 함
+        with SessionLocal() as db:
+            assert db.get(AnalysisHistory, job["analysis_id"]) is not None
+
+    assert job["status"] == "succeeded"
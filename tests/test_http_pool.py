@@ -0,0 +1,73 @@
+"""
+LLM 서버용 공유 HTTP 클라이언트(연결 풀) 테스트
+"""
+import asyncio
+import httpx
+import pytest
+from app.services import http_pool
+from app.services.http_pool import create_llm_http_client
+
+
+@pytest.fixture
+async def server():
+    """keep-alive를 지원하는 최소 HTTP/1.1 서버 (응답 0.05초 지연)"""
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        while True:
+            await reader.readuntil(b"\r\n\r\n")
+            await asyncio.sleep(0.05)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+
+    async def guarded(reader, writer):
+        try:
+            await handle(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    srv = await asyncio.start_server(guarded, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", connections
+    srv.close()
+
+
+async def test_pool_reuses_connections_and_records_wait(server):
+    """max_connections=1이면 동시 요청은 풀에서 기다리고 같은 연결을 재사용"""
+    url, connections = server
+    client = create_llm_http_client(timeout=5, max_connections=1, max_keepalive_connections=1)
+    waits_before = http_pool.POOL_WAIT_SECONDS.count()
+
+    responses = await asyncio.gather(*(client.get(url) for _ in range(3)))
+    await client.aclose()
+
+    assert [r.text for r in responses] == ["ok"] * 3
+    assert len(connections) == 1
+    assert http_pool.POOL_WAIT_SECONDS.count() - waits_before == 3
+    assert http_pool.POOL_IN_USE.get() == 0
+
+
+async def test_streamed_response_holds_slot_until_closed():
+    """스트리밍 응답은 본문을 닫을 때까지 사용 중으로 집계"""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="data"))
+    client = create_llm_http_client(timeout=5, max_connections=4, transport=transport)
+
+    async with client.stream("GET", "http://llm.test/") as response:
+        assert http_pool.POOL_IN_USE.get() == 1
+        assert http_pool.POOL_UTILIZATION.get() == 0.25
+        assert await response.aread() == b"data"
+
+    assert http_pool.POOL_IN_USE.get() == 0
+    await client.aclose()
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    """h2 패키지가 없으면 HTTP/1.1로 생성"""
+    monkeypatch.setattr(http_pool, "_http2_available", lambda: False)
+    client = create_llm_http_client(timeout=5, http2=True)
+
+    assert isinstance(client, httpx.AsyncClient)
+    assert client._transport._transport._pool._http2 is False
@@ -0,0 +1,93 @@
+"""
+비동기 분석 작업 API 테스트
+"""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.db.connection import AsyncSessionLocal, init_db
+from app.db.models import AnalysisJob
+from app.main_simple import app
+from app.services.jobs import AnalysisJobManager
+from app.services.worker_pool import PoolSaturatedError
+
+
+@pytest.fixture
+def client():
+    """lifespan(작업 워커 포함)을 실행하는 클라이언트"""
+    with TestClient(app) as c:
+        yield c
+
+
+def _wait_for_job(client, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f"/analyze/jobs/{job_id}").json()
+        if data["status"] not in ("queued", "running"):
+            return data
+        time.sleep(0.05)
+    raise AssertionError("작업이 시간 내에 끝나지 않음")
+
+
+def test_submit_job_returns_immediately(client, sample_ci_log):
+    """작업 접수 시 202 + job_id"""
+    response = client.post("/analyze/jobs", json={"ci_log": sample_ci_log, "repository": "test-repo"})
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["job_id"]
+    assert data["status"] in ("queued", "running", "succeeded")
+    assert data["status_url"].endswith(f"/analyze/jobs/{data['job_id']}")
+
+
+def test_job_completes_with_result(client, sample_ci_log):
+    """작업 완료 후 분석 결과 조회"""
+    job_id = client.post("/analyze/jobs", json={"ci_log": sample_ci_log}).json()["job_id"]
+    data = _wait_for_job(client, job_id)
+
+    assert data["status"] == "succeeded"
+    assert data["analysis_id"] == data["result"]["analysis_id"]
+    assert data["result"]["error_type"] == "tasking"
+
+
+def test_unknown_job_404(client):
+    """없는 작업 조회"""
+    response = client.get("/analyze/jobs/does-not-exist")
+    assert response.status_code == 404
+
+
+def test_saturated_job_requeued_without_blocking_worker():
+    """워커 풀 포화로 밀린 작업은 retry_after 뒤 다시 실행되고, 그동안 워커는 다른 작업을 처리"""
+    init_db()
+    order = []
+    ran_at = {}
+
+    async def runner(payload):
+        order.append(payload["name"])
+        ran_at.setdefault(payload["name"], time.monotonic())
+        if payload["name"] == "first" and order.count("first") == 1:
+            raise PoolSaturatedError(retry_after=0.2)
+        return {}
+
+    async def scenario():
+        manager = AnalysisJobManager(concurrency=1, default_deadline=30, max_deadline=30)
+        await manager.start(runner)
+        try:
+            async with AsyncSessionLocal() as db:
+                first = await manager.submit(db, {"name": "first"})
+                second = await manager.submit(db, {"name": "second"})
+            started = time.monotonic()
+            while time.monotonic() - started < 5:
+                async with AsyncSessionLocal() as db:
+                    statuses = [(await db.get(AnalysisJob, job.id)).status for job in (first, second)]
+                if statuses == ["succeeded", "succeeded"]:
+                    return statuses
+                await asyncio.sleep(0.02)
+            return statuses
+        finally:
+            await manager.stop()
+
+    assert asyncio.run(scenario()) == ["succeeded", "succeeded"]
+    assert order == ["first", "second", "first"]
+    # 워커가 retry_after 동안 잠들지 않음
+    assert ran_at["second"] - ran_at["first"] < 0.15
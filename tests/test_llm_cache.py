@@ -0,0 +1,113 @@
+"""
+LLM 분석 캐시 테스트
+"""
+import asyncio
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+import app.main_simple as main_simple
+from app.db.connection import init_db
+from app.main_simple import app
+from app.services.analysis_engine import analysis_engine
+from app.services.llm_cache import LLMAnalysisCacheStore
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """활성화된 캐시 (오류 타입은 테스트마다 고유하게 사용)"""
+    init_db()
+    store = LLMAnalysisCacheStore(enabled=True, ttl_seconds=3600, similarity=0.75)
+    monkeypatch.setattr(analysis_engine, "cache", store)
+    monkeypatch.setattr(main_simple, "llm_analysis_cache", store)
+    return store
+
+
+def test_exact_and_similar_lookup_with_ttl(cache):
+    """지문 일치(순서/숫자 무관), 유사 증상 재사용, 다른 타입/만료 항목은 미스"""
+    error_type = f"type-{uuid.uuid4().hex[:8]}"
+    symptoms = ["linker error: undefined symbol can_init in module 12", "build failed with exit code 2"]
+
+    async def scenario():
+        assert await cache.lookup(error_type, symptoms) is None
+        await cache.store(error_type, symptoms, "캐시된 분석", 0.7)
+
+        exact = await cache.lookup(error_type, [symptoms[1].replace("2", "3"), symptoms[0]])
+        similar = await cache.lookup(error_type, symptoms + ["linker error: see map file"])
+        other_type = await cache.lookup("other", symptoms)
+
+        expired = LLMAnalysisCacheStore(enabled=True, ttl_seconds=-1)
+        await expired.store(error_type + "-old", symptoms, "오래된 분석", 0.7)
+        return exact, similar, other_type, await expired.lookup(error_type + "-old", symptoms)
+
+    exact, similar, other_type, expired = asyncio.run(scenario())
+
+    assert (exact["match"], exact["analysis"]) == ("exact", "캐시된 분석")
+    assert (similar["match"], similar["cache_id"]) == ("similar", exact["cache_id"])
+    assert other_type is None
+    assert expired is None
+
+
+def test_subset_symptoms_do_not_reuse_unrelated_analysis(cache):
+    """유사도는 대칭: 캐시 항목 증상의 일부만 가진 요청(또는 그 반대)은 재사용하지 않음"""
+    error_type = f"type-{uuid.uuid4().hex[:8]}"
+    cached = [
+        "linker error: undefined symbol can_init in module 12",
+        "build failed with exit code 2",
+        "missing dependency libfoo.so required by can_driver"
+    ]
+
+    async def scenario():
+        await cache.store(error_type, cached, "링커 오류 분석", 0.7)
+        subset = await cache.lookup(error_type, ["build failed with exit code 1"])
+        await cache.store(error_type + "-exit", cached[1:2], "종료 코드 분석", 0.7)
+        return subset, await cache.lookup(error_type + "-exit", cached)
+
+    subset, superset = asyncio.run(scenario())
+
+    assert subset is None
+    assert superset is None
+
+
+def test_cache_hit_skips_llm_and_manual_invalidation(cache, monkeypatch):
+    """같은 새 오류는 두 번째부터 LLM 없이 캐시로 응답, 무효화 후에는 다시 호출"""
+    calls = []
+
+    async def fake_llm(**kwargs):
+        calls.append(kwargs)
+        return {"analysis": "LLM 분석 " + uuid.uuid4().hex, "confidence": 0.55}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_llm)
+    marker = uuid.uuid4().hex[:12]  # 이전 실행의 캐시 항목과 유사하지 않도록 단어 대부분을 고유하게
+    logs = [f"job {name}\ngizmo {marker[:6]} error: {marker[6:]} stalled\n" for name in ("alpha", "beta")]
+
+    with TestClient(app) as client:
+        first = client.post("/analyze", json={"ci_log": logs[0], "repository": "repo-a"}).json()
+        second = client.post("/analyze", json={"ci_log": logs[1], "repository": "repo-b"}).json()
+
+        entries = [e for e in client.get("/llm-cache").json()["entries"] if any(marker[6:] in s for s in e["symptoms"])]
+        assert len(entries) == 1 and entries[0]["hit_count"] == 1
+
+        assert client.delete(f"/llm-cache/{entries[0]['id']}").json()["deleted"] == 1
+        assert client.delete(f"/llm-cache/{entries[0]['id']}").status_code == 404
+        third = client.post("/analyze", json={"ci_log": logs[0] + "retry\n", "repository": "repo-c"}).json()
+
+    assert len(calls) == 2
+    assert first["security_status"] == "llm_analyzed"
+    assert (second["security_status"], second["analysis"]) == ("llm_cached", first["analysis"])
+    assert third["security_status"] == "llm_analyzed"
+
+
+def test_approved_kb_entry_clears_cache(cache, monkeypatch):
+    """승인 시 해당 분석의 증상과 같은/유사한 캐시 항목 삭제"""
+    async def fake_llm(**kwargs):
+        return {"analysis": "LLM 분석 결과 " * 20, "confidence": 0.75}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_llm)
+    marker = uuid.uuid4().hex[:12]
+
+    with TestClient(app) as client:
+        response = client.post("/analyze", json={"ci_log": f"widget {marker[:6]} error: {marker[6:]} jammed\n"}).json()
+        assert any(marker[6:] in s for e in client.get("/llm-cache").json()["entries"] for s in e["symptoms"])
+
+        assert client.get(response["approval_url"].replace("http://localhost:8000", "")).status_code == 200
+        assert not any(marker[6:] in s for e in client.get("/llm-cache").json()["entries"] for s in e["symptoms"])
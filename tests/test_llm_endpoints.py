@@ -0,0 +1,118 @@
+"""
+LLM webhook 엔드포인트 풀 테스트
+"""
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.services.llm_client import LLMClient
+
+URLS = ["http://llm-0.test/webhook/llm-analyze", "http://llm-1.test/webhook/llm-analyze"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("LLM_WEBHOOK_URLS", ",".join(URLS))
+    return LLMClient()
+
+
+async def _analyze(client):
+    return await client.call_llm_analysis(ci_log="log", symptoms=["error"], error_type="unknown")
+
+
+async def test_least_outstanding_requests_routing(client):
+    """진행 중인 요청이 적은 엔드포인트로 분배"""
+    release = asyncio.Event()
+    hosts = []
+
+    async def handler(request):
+        hosts.append(request.url.host)
+        if request.url.host == "llm-0.test" and len(hosts) == 1:
+            await release.wait()  # 첫 요청은 llm-0에 머묾
+        return httpx.Response(200, json={"analysis": "ok", "confidence": 0.7})
+
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client.endpoints._rotation = iter(range(100))  # 첫 선택은 llm-0
+
+    slow = asyncio.create_task(_analyze(client))
+    await asyncio.sleep(0.01)
+    assert client.endpoints.endpoints[0].in_flight == 1
+
+    for _ in range(3):
+        await _analyze(client)
+    assert hosts[1:] == ["llm-1.test"] * 3
+
+    release.set()
+    await slow
+    assert [e.in_flight for e in client.endpoints.endpoints] == [0, 0]
+
+
+async def test_failing_endpoint_ejected_and_probed_back(client):
+    """연속 실패한 엔드포인트는 제외되고 /health 성공 시 다시 포함"""
+    healthy = {"llm-0.test": False, "llm-1.test": True}
+
+    def handler(request):
+        if request.url.path == "/health":
+            return httpx.Response(200 if healthy[request.url.host] else 503)
+        if not healthy[request.url.host]:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"analysis": request.url.host, "confidence": 0.7})
+
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    bad = client.endpoints.endpoints[0]
+    bad.breaker.failure_threshold = 2
+
+    results = []
+    for _ in range(8):
+        try:
+            results.append((await _analyze(client))["analysis"])
+        except HTTPException:
+            results.append("failed")
+
+    assert results.count("failed") == 2
+    assert results[-4:] == ["llm-1.test"] * 4
+    assert bad.breaker.state == "open"
+
+    await client.endpoints.probe(client._client)
+    assert bad.breaker.state == "open"
+
+    healthy["llm-0.test"] = True
+    await client.endpoints.probe(client._client)
+    assert bad.breaker.state == "closed"
+
+
+async def test_all_endpoints_ejected_fail_fast(client):
+    """모든 엔드포인트가 제외되면 요청 없이 바로 503"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    for endpoint in client.endpoints.endpoints:
+        endpoint.breaker.failure_threshold = 1
+
+    for _ in range(4):
+        with pytest.raises(HTTPException):
+            await _analyze(client)
+
+    assert len(calls) == 2
+    assert [e["circuit"] for e in client.endpoints.status()] == ["open", "open"]
+
+
+async def test_rate_limited_endpoint_not_ejected(client):
+    """429는 서킷 브레이커 실패로 세지 않고 Retry-After와 함께 429로 전달"""
+    def handler(request):
+        return httpx.Response(429, headers={"Retry-After": "7"})
+
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    for endpoint in client.endpoints.endpoints:
+        endpoint.breaker.failure_threshold = 1
+
+    for _ in range(4):
+        with pytest.raises(HTTPException) as exc:
+            await _analyze(client)
+        assert (exc.value.status_code, exc.value.headers["Retry-After"]) == (429, "7")
+
+    assert [e["circuit"] for e in client.endpoints.status()] == ["closed", "closed"]
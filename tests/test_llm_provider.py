@@ -0,0 +1,78 @@
+"""
+provider 클라이언트 재사용 / get_llm 메모 / 설정 파일 mtime 캐시 테스트
+"""
+import asyncio
+import os
+
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+
+from app.llm import provider
+from app.llm.provider import AzureOpenAIClient, PrivateLLMClient, get_llm
+from app.utils import config as config_module
+
+
+async def test_provider_holds_one_sdk_client():
+    """SDK 클라이언트는 처음 사용할 때 한 번만 생성 (Azure는 AsyncAzureOpenAI)"""
+    private = PrivateLLMClient(base_url="http://llm.test/v1", model="m", api_key="k")
+    azure = AzureOpenAIClient(endpoint="https://res.openai.azure.com", deployment_name="d", api_key="k")
+
+    assert private.client is private.client
+    assert isinstance(private.client, AsyncOpenAI)
+    assert isinstance(azure.client, AsyncAzureOpenAI)
+
+    await private.aclose()
+    assert private._sdk_client is None
+
+
+def test_get_llm_memoized_on_effective_config(monkeypatch):
+    """유효 설정이 같으면 같은 인스턴스, 바뀌면 새로 생성"""
+    monkeypatch.setattr(provider, "_llm_memo", None)
+    monkeypatch.setenv("LLM_PROVIDER", "private")
+    monkeypatch.setenv("PRIVATE_LLM_BASE_URL", "http://llm-a.test/v1")
+
+    first = get_llm()
+    assert get_llm() is first
+
+    monkeypatch.setenv("PRIVATE_LLM_BASE_URL", "http://llm-b.test/v1")
+    second = get_llm()
+    assert second is not first
+    assert second.base_url == "http://llm-b.test/v1"
+
+
+async def test_replaced_llm_client_is_closed(monkeypatch):
+    """설정이 바뀌어 교체된 클라이언트(hedged 쌍 포함)의 SDK 연결 풀은 유예 시간 뒤 닫힘"""
+    monkeypatch.setattr(provider, "_llm_memo", None)
+    monkeypatch.setattr(provider, "RETIRED_CLIENT_GRACE_SECONDS", 0)
+    monkeypatch.setattr(provider, "LLM_HEDGE_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_PROVIDER", "private")
+    monkeypatch.setenv("PRIVATE_LLM_BASE_URL", "http://llm-a.test/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+
+    first = get_llm()
+    first.primary.client, first.secondary.client
+    monkeypatch.setenv("PRIVATE_LLM_BASE_URL", "http://llm-b.test/v1")
+    assert get_llm() is not first
+    await asyncio.gather(*provider._retiring)
+
+    assert first.primary._sdk_client is None
+    assert first.secondary._sdk_client is None
+
+
+def test_config_reparsed_only_when_file_changes(tmp_path, monkeypatch):
+    """mtime/크기가 그대로면 다시 파싱하지 않고, 반환값 수정은 캐시에 영향 없음"""
+    path = tmp_path / "config.yaml"
+    path.write_text("openai:\n  model: a\n")
+    parses = []
+    real_load = config_module.yaml.safe_load
+    monkeypatch.setattr(config_module.yaml, "safe_load", lambda f: parses.append(1) or real_load(f))
+
+    first = config_module.load_config(str(path))
+    first["openai"]["model"] = "mutated"
+    assert config_module.load_config(str(path))["openai"]["model"] == "a"
+    assert len(parses) == 1
+
+    path.write_text("openai:\n  model: b\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert config_module.load_config(str(path))["openai"]["model"] == "b"
+    assert len(parses) == 2
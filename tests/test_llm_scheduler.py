@@ -0,0 +1,69 @@
+"""
+LLM 호출 우선순위 스케줄러 테스트
+"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.services import llm_scheduler
+from app.services.llm_scheduler import LLMScheduler
+
+
+def run_order(scheduler, waiters, advance=None):
+    """슬롯 하나를 점유한 상태에서 대기자를 등록한 뒤 슬롯이 배정된 순서 반환"""
+    order = []
+
+    async def wait(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+
+    async def main():
+        async with scheduler.slot(0):
+            tasks = []
+            for name, priority in waiters:
+                tasks.append(asyncio.create_task(wait(name, priority)))
+                await asyncio.sleep(0)
+                if advance:
+                    advance()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    return order
+
+
+def test_higher_priority_served_first_and_slots_bounded():
+    """슬롯이 차면 우선순위 순서로 배정, 같은 우선순위는 도착 순서"""
+    scheduler = LLMScheduler(slots=1, aging_per_sec=0.0)
+
+    assert run_order(scheduler, [("low", 0), ("high", 10), ("mid", 5), ("mid2", 5)]) == ["high", "mid", "mid2", "low"]
+    assert scheduler._in_flight == 0
+    assert scheduler.queue_depth == 0
+
+
+def test_aging_prevents_starvation(monkeypatch):
+    """오래 기다린 낮은 우선순위 요청이 늦게 온 높은 우선순위 요청을 앞지름"""
+    now = [100.0]
+    monkeypatch.setattr(llm_scheduler.time, "monotonic", lambda: now[0])
+
+    def advance():
+        now[0] += 30.0
+
+    scheduler = LLMScheduler(slots=1, aging_per_sec=0.5)
+    # old: 0 + 0.5 × 60 = 30, new: 10 + 0.5 × 30 = 25 (배정 시점 기준)
+    assert run_order(scheduler, [("old", 0), ("new", 10)], advance=advance) == ["old", "new"]
+
+
+def test_priority_from_request_fields():
+    """명시적 priority + 릴리스 브랜치 + 작업의 최신 빌드 가산점"""
+    scheduler = LLMScheduler(slots=1, aging_per_sec=0.0)
+
+    def request(**fields):
+        return SimpleNamespace(**{"priority": None, "branch": None, "job_name": None, "build_number": None, **fields})
+
+    assert scheduler.priority_for(request()) == 0
+    assert scheduler.priority_for(request(priority=3, branch="release/2.1")) == 3 + llm_scheduler.LLM_PRIORITY_RELEASE_BONUS
+    assert scheduler.priority_for(request(branch="feature/x")) == 0
+
+    recency = llm_scheduler.LLM_PRIORITY_RECENCY_BONUS
+    assert scheduler.priority_for(request(job_name="nightly", build_number=100)) == recency
+    assert scheduler.priority_for(request(job_name="nightly", build_number=98)) == recency - 2
+    assert scheduler.priority_for(request(job_name="nightly", build_number=50)) == 0
@@ -0,0 +1,82 @@
+"""
+LLM 분석 스트리밍(SSE) 테스트
+"""
+import json
+import uuid
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.main_simple import app
+from app.services.analysis_engine import analysis_engine
+from app.services.llm_client import LLMClient
+
+
+def _client_with(monkeypatch, handler) -> LLMClient:
+    monkeypatch.setenv("LLM_WEBHOOK_URL", "http://llm.test/webhook/llm-analyze")
+    client = LLMClient()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def _collect(client: LLMClient):
+    return [event async for event in client.stream_llm_analysis(ci_log="log", symptoms=["error"], error_type="unknown")]
+
+
+async def test_stream_parses_sse_events(monkeypatch):
+    """SSE token/done 이벤트를 순서대로 전달"""
+    def handler(request):
+        assert request.url.path == "/webhook/llm-analyze/stream"
+        body = (
+            'event: token\ndata: {"text": "원인: "}\n\n'
+            ": keep-alive\n\n"
+            'event: token\ndata: {"text": "메모리 부족"}\n\n'
+            'event: done\ndata: {"analysis": "원인: 메모리 부족", "confidence": 0.7}\n\n'
+        )
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    events = await _collect(_client_with(monkeypatch, handler))
+
+    assert [e["text"] for e in events if e["type"] == "token"] == ["원인: ", "메모리 부족"]
+    assert events[-1] == {"type": "done", "analysis": "원인: 메모리 부족", "confidence": 0.7}
+
+
+async def test_stream_falls_back_to_json_webhook(monkeypatch):
+    """스트리밍 미지원 webhook의 JSON 응답은 한 번에 전달"""
+    def handler(request):
+        return httpx.Response(200, json={"analysis": "전체 분석", "confidence": 0.8})
+
+    events = await _collect(_client_with(monkeypatch, handler))
+
+    assert events == [
+        {"type": "token", "text": "전체 분석"},
+        {"type": "done", "analysis": "전체 분석", "confidence": 0.8}
+    ]
+
+
+def test_analyze_stream_endpoint(monkeypatch):
+    """kb → token... → done(analysis_id) 순서로 이벤트 전송"""
+    async def fake_stream(**kwargs):
+        for text in ("첫 번째 ", "두 번째 ", "세 번째 조각"):
+            yield {"type": "token", "text": text}
+        yield {"type": "done", "analysis": "첫 번째 두 번째 세 번째 조각", "confidence": 0.7}
+
+    monkeypatch.setattr(analysis_engine.llm, "stream_llm_analysis", fake_stream)
+    log = f"Unknown tool {uuid.uuid4().hex}:\nstage 7 error: gadget 0xfeedface stalled\n"
+
+    with TestClient(app) as client:
+        with client.stream("POST", "/analyze/stream", json={"ci_log": log}) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            raw = "".join(response.iter_text())
+
+    events = []
+    for block in raw.strip().split("\n\n"):
+        lines = block.split("\n")
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+
+    assert events[0][0] == "kb"
+    assert "error_type" in events[0][1]
+    assert [data["text"] for event, data in events if event == "token"] == ["첫 번째 ", "두 번째 ", "세 번째 조각"]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["analysis_id"] > 0
+    assert events[-1][1]["security_status"] == "llm_analyzed"
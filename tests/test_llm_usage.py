@@ -0,0 +1,85 @@
+"""
+LLM 호출별 토큰 사용량 / 지연 시간 집계 테스트
+"""
+import asyncio
+import uuid
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.db.connection import SessionLocal
+from app.db.models import AnalysisHistory
+from app.main_simple import app
+from app.services import llm_usage
+from app.services.analysis_engine import analysis_engine
+from app.services.llm_client import LLMClient
+
+
+def _history(analysis_id: int) -> AnalysisHistory:
+    with SessionLocal() as db:
+        return db.get(AnalysisHistory, analysis_id)
+
+
+async def test_client_parses_token_usage(monkeypatch):
+    """LLM 서버 응답의 usage를 tokens_in/tokens_out으로 전달 (없으면 키 없음)"""
+    monkeypatch.setenv("LLM_WEBHOOK_URL", "http://llm.test/webhook/llm-analyze")
+    bodies = [
+        {"analysis": "분석", "confidence": 0.7, "usage": {"prompt_tokens": 812, "completion_tokens": 95}},
+        {"analysis": "분석", "confidence": 0.7}
+    ]
+    client = LLMClient()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=bodies.pop(0))))
+
+    with_usage = await client.call_llm_analysis(ci_log="log", symptoms=["error"], error_type="unknown")
+    without_usage = await client.call_llm_analysis(ci_log="log", symptoms=["error"], error_type="unknown")
+
+    assert (with_usage["tokens_in"], with_usage["tokens_out"]) == (812, 95)
+    assert "tokens_in" not in without_usage
+
+
+def test_stream_usage_stored_on_history(monkeypatch):
+    """스트리밍 분석은 TTFT/전체 시간/토큰을 이력에 저장하고 error_type·repository 별 히스토그램에 반영"""
+    async def fake_stream(**kwargs):
+        yield {"type": "token", "text": "첫 조각 "}
+        await asyncio.sleep(0.05)
+        yield {"type": "token", "text": "끝"}
+        yield {"type": "done", "analysis": "첫 조각 끝", "confidence": 0.55, "tokens_in": 300, "tokens_out": 2}
+
+    monkeypatch.setattr(analysis_engine.llm, "stream_llm_analysis", fake_stream)
+    repository = f"repo-{uuid.uuid4().hex[:8]}"
+    log = f"Unknown tool {uuid.uuid4().hex}:\nstage 3 error: widget 0xdeadbeef jammed\n"
+
+    with TestClient(app) as client:
+        with client.stream("POST", "/analyze/stream", json={"ci_log": log, "repository": repository}) as response:
+            raw = "".join(response.iter_text())
+
+    analysis_id = int(raw.split('"analysis_id": ')[1].split(",")[0])
+    history = _history(analysis_id)
+    assert (history.llm_tokens_in, history.llm_tokens_out) == (300, 2)
+    assert history.llm_ttft_seconds < 0.05 <= history.llm_total_seconds
+    assert history.llm_queue_seconds >= 0
+    assert llm_usage.LLM_TOTAL_SECONDS.count(error_type=history.error_type, repository=repository) == 1
+    assert llm_usage.LLM_TOKENS.count(direction="in", error_type=history.error_type, repository=repository) == 1
+
+
+def test_batch_usage_recorded_once_per_llm_call(monkeypatch):
+    """같은 증상으로 묶인 배치 요청은 LLM을 실제로 호출한 첫 이력에만 사용량 기록"""
+    calls = []
+
+    async def fake_call(**kwargs):
+        calls.append(kwargs)
+        return {"analysis": "LLM 분석 " + uuid.uuid4().hex, "confidence": 0.55, "tokens_in": 50, "tokens_out": 10}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_call)
+    log = f"Unknown tool {uuid.uuid4().hex}:\nstage 5 error: sprocket 0xcafebabe seized\n"
+
+    with TestClient(app) as client:
+        response = client.post("/analyze/batch", json={"requests": [
+            {"ci_log": log, "job_name": "USAGE-A", "build_number": 1},
+            {"ci_log": log, "job_name": "USAGE-B", "build_number": 1}
+        ]})
+
+    first, second = [_history(r["analysis_id"]) for r in response.json()["results"]]
+    assert len(calls) == 1
+    assert (first.llm_tokens_in, first.llm_total_seconds is not None) == (50, True)
+    assert (second.llm_tokens_in, second.llm_total_seconds) == (None, None)
@@ -0,0 +1,227 @@
+"""
+로컬 LLM 서버 (AsyncAzureOpenAI 공유 클라이언트, 동시 호출 제한, 배포별 TPM/RPM 스케줄러) 테스트
+"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from openai import RateLimitError
+
+import local_llm_server
+from app.llm.retry import RETRIES, RetryBudget
+from local_llm_server import AnalyzeRequest, ConcurrencyLimiter, Deployment, DeploymentScheduler
+
+
+class FakeStream:
+    def __init__(self, texts):
+        self._chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=t))]) for t in texts
+        ]
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+class FakeCompletions:
+    """동시 호출 수를 기록하는 가짜 chat.completions"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.streams = []
+
+    async def create(self, stream=False, **kwargs):
+        if stream:
+            self.streams.append(FakeStream(["## 분석", " 결과"]))
+            return self.streams[-1]
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        message = SimpleNamespace(content="x" * 350)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    completions = FakeCompletions()
+    monkeypatch.setattr(local_llm_server, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+def _request() -> AnalyzeRequest:
+    return AnalyzeRequest(ci_log="build failed", symptoms=["build failed"], error_type="build")
+
+
+async def test_concurrent_calls_capped_by_semaphore(fake_openai, monkeypatch):
+    """동시 요청이 많아도 Azure 호출은 max_concurrency 개까지만 진행"""
+    limiter = ConcurrencyLimiter(2)
+    monkeypatch.setattr(local_llm_server, "llm_limiter", limiter)
+
+    results = await asyncio.gather(*(local_llm_server.analyze_with_openai(_request()) for _ in range(6)))
+
+    assert fake_openai.peak == 2
+    assert all(r["confidence"] == 0.8 for r in results)
+    assert limiter.status() == {"limit": 2, "in_flight": 0, "waiting": 0}
+
+
+async def test_stream_endpoint_relays_tokens(fake_openai):
+    """스트리밍 엔드포인트는 token 이벤트 후 done 이벤트를 보내고 상위 스트림을 닫음"""
+    transport = httpx.ASGITransport(app=local_llm_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/webhook/llm-analyze/stream", json=_request().model_dump())
+
+    body = response.text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert body.index('"text": "## 분석"') < body.index('"text": " 결과"') < body.index("event: done")
+    assert '"analysis": "## 분석 결과"' in body
+    assert fake_openai.streams[0].closed
+    assert local_llm_server.llm_limiter.in_flight == 0
+
+
+async def test_missing_client_returns_503(monkeypatch):
+    """Azure 설정이 없으면 503"""
+    monkeypatch.setattr(local_llm_server, "openai_client", None)
+    transport = httpx.ASGITransport(app=local_llm_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/webhook/llm-analyze", json=_request().model_dump())
+
+    assert response.status_code == 503
+
+
+async def test_scheduler_spreads_budget_and_rejects_when_spent():
+    """TPM이 남은 배포로 분산하고, 모두 소진되면 Retry-After와 함께 429"""
+    scheduler = DeploymentScheduler(
+        [Deployment("a", tokens_per_minute=1000), Deployment("b", tokens_per_minute=1000)],
+        max_wait_seconds=0
+    )
+
+    first = await scheduler.acquire(600)
+    second = await scheduler.acquire(600)
+    with pytest.raises(HTTPException) as exc:
+        await scheduler.acquire(600)
+
+    assert {first.name, second.name} == {"a", "b"}
+    assert exc.value.status_code == 429
+    assert 59 <= int(exc.value.headers["Retry-After"]) <= 60
+
+
+async def test_waiting_request_does_not_block_other_deployments():
+    """한도를 기다리는 큰 요청이 있어도 여유가 있는 요청은 바로 배정"""
+    scheduler = DeploymentScheduler(
+        [Deployment("a", tokens_per_minute=1000), Deployment("b", tokens_per_minute=1000)],
+        max_wait_seconds=120
+    )
+    await scheduler.acquire(600)
+    await scheduler.acquire(600)
+
+    waiting = asyncio.create_task(scheduler.acquire(900))
+    await asyncio.sleep(0)
+    small = await asyncio.wait_for(scheduler.acquire(300), timeout=1)
+
+    assert small.name in ("a", "b")
+    assert scheduler.waiting == 1
+    waiting.cancel()
+
+
+async def test_retry_after_waiters_wake_with_jitter(monkeypatch):
+    """Retry-After를 기다리는 요청들은 같은 시각에 한꺼번에 깨어나지 않음"""
+    scheduler = DeploymentScheduler([Deployment("a")], max_wait_seconds=5)
+    scheduler.penalize(scheduler.deployments[0], retry_after=0.05)
+    delays = []
+    sleep = asyncio.sleep
+
+    async def recording_sleep(delay, *args, **kwargs):
+        if delay:
+            delays.append(delay)
+        return await sleep(delay, *args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+    await asyncio.gather(*(scheduler.acquire(10) for _ in range(8)))
+
+    assert len(delays) == 8
+    assert all(0.04 < delay <= 0.15 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+async def test_request_waiting_for_deployment_does_not_hold_slot(fake_openai, monkeypatch):
+    """배포 예산을 기다리는 동안에는 동시 호출 슬롯을 잡지 않음"""
+    limiter = ConcurrencyLimiter(1)
+    scheduler = DeploymentScheduler([Deployment("a")], max_wait_seconds=5)
+    scheduler.penalize(scheduler.deployments[0], retry_after=0.1)
+    monkeypatch.setattr(local_llm_server, "llm_limiter", limiter)
+    monkeypatch.setattr(local_llm_server, "deployment_scheduler", scheduler)
+
+    task = asyncio.create_task(local_llm_server.analyze_with_openai(_request()))
+    await asyncio.sleep(0.02)
+
+    assert scheduler.waiting == 1
+    assert limiter.status() == {"limit": 1, "in_flight": 0, "waiting": 0}
+    assert (await task)["confidence"] == 0.8
+    assert limiter.status()["in_flight"] == 0
+
+
+async def test_rate_limited_deployment_is_skipped_for_retry_after(fake_openai, monkeypatch):
+    """429를 받은 배포는 Retry-After 동안 제외하고 다른 배포로 재시도"""
+    scheduler = DeploymentScheduler([Deployment("a"), Deployment("b")], max_wait_seconds=5)
+    monkeypatch.setattr(local_llm_server, "deployment_scheduler", scheduler)
+    calls = []
+    create = fake_openai.create
+
+    async def create_or_throttle(model, **kwargs):
+        calls.append(model)
+        if model == "a":
+            response = httpx.Response(
+                429, headers={"retry-after-ms": "30000"}, request=httpx.Request("POST", "http://azure.test")
+            )
+            raise RateLimitError("rate limited", response=response, body=None)
+        return await create(model=model, **kwargs)
+
+    monkeypatch.setattr(fake_openai, "create", create_or_throttle)
+
+    await local_llm_server.analyze_with_openai(_request())
+    await local_llm_server.analyze_with_openai(_request())
+
+    assert calls == ["a", "b", "b"]
+    status = {d["name"]: d for d in scheduler.status()["deployments"]}
+    assert status["a"]["rate_limited"] == 1
+    # 거절된 요청의 예약은 반환되어 요청당 한 번만 집계
+    assert (status["a"]["used_requests"], status["b"]["used_requests"]) == (0, 2)
+    assert 29 < status["a"]["blocked_seconds"] <= 30
+
+
+async def test_rate_limit_retry_stops_when_budget_exhausted(fake_openai, monkeypatch):
+    """429 재시도는 공유 재시도 예산을 쓰고, 소진되면 재시도 없이 429 + 메트릭"""
+    scheduler = DeploymentScheduler([Deployment("a"), Deployment("b")], max_wait_seconds=5)
+    monkeypatch.setattr(local_llm_server, "deployment_scheduler", scheduler)
+    monkeypatch.setattr(local_llm_server, "retry_budget", RetryBudget(ratio=0, window_seconds=60, min_retries=0))
+    calls = []
+
+    async def throttle(model, **kwargs):
+        calls.append(model)
+        response = httpx.Response(429, headers={"retry-after": "7"}, request=httpx.Request("POST", "http://azure.test"))
+        raise RateLimitError("rate limited", response=response, body=None)
+
+    monkeypatch.setattr(fake_openai, "create", throttle)
+    exhausted = RETRIES.get(provider="azure", decision="budget_exhausted")
+
+    with pytest.raises(HTTPException) as exc:
+        await local_llm_server.analyze_with_openai(_request())
+
+    assert calls == ["a"]
+    assert (exc.value.status_code, exc.value.headers["Retry-After"]) == (429, "7")
+    assert RETRIES.get(provider="azure", decision="budget_exhausted") == exhausted + 1
@@ -0,0 +1,56 @@
+"""
+LLM 프롬프트용 로그 압축 테스트
+"""
+from app.utils.log_compress import compress_for_prompt, fold_stack_traces
+
+
+def test_collapses_template_identical_lines_and_drops_noise():
+    """숫자만 다른 줄은 반복 횟수로 합치고 진행률/다운로드 줄은 제거"""
+    log = "\n".join(
+        [f"Downloading https://repo.example.com/lib-{i}.jar" for i in range(5)]
+        + [f" {i * 10}% [=====>          ] 3.2MB/s" for i in range(5)]
+        + [f"warning: unused variable 'tmp{i}' at line {i}" for i in range(4)]
+        + ["main.c(45): error: code generation failed"]
+    )
+
+    compressed = compress_for_prompt(log)
+
+    assert "Downloading" not in compressed
+    assert "%" not in compressed
+    assert "warning: unused variable 'tmp0' at line 0  [×4]" in compressed
+    assert "main.c(45): error: code generation failed" in compressed
+    assert compressed.startswith("[로그 압축: 15줄 → 2줄]")
+    # 결정적 출력
+    assert compress_for_prompt(log) == compressed
+
+
+def test_folds_long_stack_trace_around_own_frames():
+    """긴 Java 스택은 처음/마지막과 우리 소스 프레임 주변만 유지"""
+    frames = [f"\tat org.framework.Layer{i}.invoke(Layer{i}.java:{i})" for i in range(20)]
+    frames[10] = "\tat com.acme.build.Main.run(src/com/acme/build/Main.java:42)"
+    lines = ["java.lang.IllegalStateException: boom"] + frames + ["BUILD FAILED"]
+
+    folded = fold_stack_traces(lines, max_frames=8)
+
+    assert folded[0] == "java.lang.IllegalStateException: boom"
+    assert folded[1] == frames[0]
+    assert folded[2] == "    ... (8 frames omitted)"
+    assert folded[3:6] == frames[9:12]
+    assert folded[6] == "    ... (7 frames omitted)"
+    assert folded[7:] == [frames[19], "BUILD FAILED"]
+
+
+def test_short_logs_are_returned_unchanged():
+    """줄일 것이 없으면 원본 그대로 (Python 프레임은 소스 줄과 함께 유지)"""
+    log = (
+        "Traceback (most recent call last):\n"
+        '  File "app/main.py", line 3, in <module>\n'
+        "    run()\n"
+        "ValueError: bad config"
+    )
+
+    assert compress_for_prompt(log) == log
+    assert fold_stack_traces(log.splitlines(), max_frames=0)[1:3] == [
+        '  File "app/main.py", line 3, in <module>',
+        "    run()",
+    ]
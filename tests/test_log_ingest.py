@@ -0,0 +1,161 @@
+"""
+CI 로그 스트리밍 수집 테스트
+"""
+import asyncio
+import gzip
+import uuid
+import zlib
+import multipart
+import pytest
+from fastapi.testclient import TestClient
+from app.main_simple import app
+from app.services import log_ingest
+from app.services.log_ingest import (
+    LogIngest,
+    LogTooLargeError,
+    MultipartFormError,
+    StreamDecoder,
+    UnsupportedEncodingError,
+    ingest_multipart
+)
+from app.services.log_store import decompress_log, hash_log
+from app.utils.text import extract_symptoms, log_fingerprint
+
+
+def _ingest(data: bytes, encoding=None, chunk_size=7, **kwargs):
+    ingest = LogIngest(**kwargs)
+    decoder = StreamDecoder(encoding, ingest.feed)
+    for i in range(0, len(data), chunk_size):
+        decoder.write(data[i:i + chunk_size])
+    decoder.close()
+    return ingest.finish()
+
+
+def test_ingest_matches_buffered_extraction(sample_ci_log):
+    """작은 청크로 나눠 수집해도 전체 로그 처리와 같은 결과"""
+    log = (sample_ci_log + "\r\n빌드 로그 한글\n") * 50
+    ingested = _ingest(gzip.compress(log.encode("utf-8")), encoding="gzip")
+
+    assert ingested.symptoms == extract_symptoms(log)
+    assert ingested.fingerprint == log_fingerprint(log)
+    assert ingested.digest == hash_log(log)
+    assert ingested.raw_size == len(log.encode("utf-8"))
+    assert decompress_log(ingested.codec, ingested.compressed) == log
+
+
+def test_ingest_excerpt_and_limits(sample_ci_log):
+    """발췌는 앞/뒤만 보관하고, 최대 크기 초과 시 중단"""
+    log = "head line\n" + "noise\n" * 1000 + sample_ci_log
+    ingested = _ingest(log.encode("utf-8"), excerpt_chars=100)
+
+    assert ingested.excerpt.startswith("head line")
+    assert ingested.excerpt.endswith(sample_ci_log[-100:])
+    assert "[truncated]" in ingested.excerpt
+
+    with pytest.raises(LogTooLargeError):
+        _ingest(zlib.compress(b"x" * 100000), encoding="deflate", max_bytes=1000)
+    with pytest.raises(UnsupportedEncodingError):
+        StreamDecoder("br", lambda data: None)
+
+
+def test_analyze_accepts_compressed_and_streamed_bodies(sample_ci_log):
+    """gzip JSON / 원본 octet-stream / multipart 업로드 모두 같은 로그로 저장"""
+    log = f"{sample_ci_log}\nrun {uuid.uuid4()}\n"
+    body = ('{"ci_log": %s, "repository": "test-repo"}' % repr(log).replace("'", '"')).encode("utf-8")
+
+    with TestClient(app) as client:
+        responses = [
+            client.post(
+                "/analyze",
+                content=gzip.compress(body),
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+            ),
+            client.post(
+                "/analyze?repository=test-repo&build_number=7",
+                content=log.encode("utf-8"),
+                headers={"Content-Type": "application/octet-stream"}
+            ),
+            client.post(
+                "/analyze",
+                data={"repository": "test-repo", "job_name": "UPLOAD"},
+                files={"ci_log": ("build.log.gz", gzip.compress(log.encode("utf-8")), "application/gzip")}
+            )
+        ]
+
+        for response in responses:
+            assert response.status_code == 200, response.text
+            data = response.json()
+            assert data["error_type"] == "tasking"
+            assert client.get(f"/history/{data['analysis_id']}/log").text == log
+
+        bad = client.post(
+            "/analyze",
+            content=b"not gzip",
+            headers={"Content-Type": "application/octet-stream", "Content-Encoding": "gzip"}
+        )
+        assert bad.status_code == 400
+
+
+def test_multipart_parsed_incrementally(sample_ci_log):
+    """multipart 본문을 작은 청크로 증분 파싱: 로그 파일 파트는 바로 수집, 뒤에 오는 필드도 수집"""
+    log = f"{sample_ci_log}\nrun {uuid.uuid4()}\n"
+    boundary = "xYzBoundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="ci_log"; filename="build.log.gz"\r\n'
+        "Content-Type: application/gzip\r\n\r\n"
+    ).encode("utf-8") + gzip.compress(log.encode("utf-8")) + (
+        f"\r\n--{boundary}\r\n"
+        'Content-Disposition: form-data; name="repository"\r\n\r\n'
+        f"test-repo\r\n--{boundary}--\r\n"
+    ).encode("utf-8")
+
+    async def chunks(data, size=7):
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+    fields, ingested = asyncio.run(ingest_multipart(chunks(body), f"multipart/form-data; boundary={boundary}"))
+
+    assert fields == {"repository": "test-repo"}
+    assert ingested.digest == hash_log(log)
+    assert ingested.symptoms == extract_symptoms(log)
+
+    fields_only = body[body.index(f"--{boundary}\r\nContent-Disposition: form-data; name=\"repository\"".encode("utf-8")):]
+    fields, ingested = asyncio.run(ingest_multipart(chunks(fields_only), f"multipart/form-data; boundary={boundary}"))
+    assert (fields, ingested) == ({"repository": "test-repo"}, None)
+    with pytest.raises(MultipartFormError):
+        asyncio.run(ingest_multipart(chunks(body), "multipart/form-data"))
+
+
+def test_multipart_parsed_in_pool_batches(sample_ci_log, monkeypatch):
+    """multipart 파싱은 이벤트 루프가 아니라 워커 풀에서 청크 묶음 단위로 실행"""
+    monkeypatch.setattr(log_ingest, "INGEST_BATCH_BYTES", 64)
+    log = f"{sample_ci_log}\nrun {uuid.uuid4()}\n"
+    boundary = "xYzBoundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="ci_log"; filename="build.log"\r\n\r\n'
+        f"{log}\r\n--{boundary}\r\n"
+        'Content-Disposition: form-data; name="repository"\r\n\r\n'
+        f"test-repo\r\n--{boundary}--\r\n"
+    ).encode("utf-8")
+    parsed = []
+
+    class RecordingPool:
+        async def run(self, fn, *args):
+            if isinstance(getattr(fn, "__self__", None), multipart.MultipartParser):
+                parsed.append(len(args[0]))
+            return fn(*args)
+
+    async def chunks(data, size=7):
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+    fields, ingested = asyncio.run(ingest_multipart(
+        chunks(body), f"multipart/form-data; boundary={boundary}", pool=RecordingPool()
+    ))
+
+    assert fields == {"repository": "test-repo"}
+    assert ingested.digest == hash_log(log)
+    assert sum(parsed) == len(body)
+    assert len(parsed) > 1 and all(size >= 64 for size in parsed[:-1])
@@ -0,0 +1,75 @@
+"""
+CI 로그 blob 저장소 테스트
+"""
+import asyncio
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from app.db.connection import AsyncSessionLocal, SessionLocal, init_db
+from app.db.models import AnalysisHistory, LogBlob
+from app.main_simple import app
+from app.services.log_store import (
+    DEFAULT_CODEC,
+    LOG_BLOBS_DEDUPED,
+    LOG_BLOBS_WRITTEN,
+    compress_log,
+    decompress_log,
+    hash_log,
+    store_blob
+)
+
+
+def test_compress_roundtrip(sample_ci_log):
+    """압축/해제 후 원본 복원"""
+    codec, data = compress_log(sample_ci_log * 100)
+    
+    assert codec == DEFAULT_CODEC
+    assert len(data) < len((sample_ci_log * 100).encode("utf-8"))
+    assert decompress_log(codec, data) == sample_ci_log * 100
+
+
+def test_gzip_fallback_roundtrip(sample_ci_log):
+    """gzip 코덱 압축/해제"""
+    codec, data = compress_log(sample_ci_log, codec="gzip")
+    assert codec == "gzip"
+    assert decompress_log(codec, data) == sample_ci_log
+
+
+def test_repeated_log_stored_once(sample_ci_log):
+    """같은 로그는 blob 하나를 공유하고, 조회 시 원본 반환"""
+    log = f"{sample_ci_log}\nrun {uuid.uuid4()}\n"
+    
+    with TestClient(app) as client:
+        first = client.post("/analyze", json={"ci_log": log}).json()
+        second = client.post("/analyze", json={"ci_log": log}).json()
+        
+        assert first["analysis_id"] != second["analysis_id"]
+        for analysis_id in (first["analysis_id"], second["analysis_id"]):
+            response = client.get(f"/history/{analysis_id}/log")
+            assert response.status_code == 200
+            assert response.text == log
+    
+    with SessionLocal() as db:
+        digest = hash_log(log)
+        assert db.scalar(select(func.count()).select_from(LogBlob).where(LogBlob.hash == digest)) == 1
+        assert db.scalar(select(func.count()).select_from(AnalysisHistory).where(AnalysisHistory.log_hash == digest)) == 2
+
+
+def test_store_blob_counts_only_inserted_rows(sample_ci_log):
+    """이미 있는 해시를 다시 저장하면 저장 수가 아니라 중복 수로 집계"""
+    init_db()
+    log = f"{sample_ci_log}\nrun {uuid.uuid4()}\n"
+    codec, data = compress_log(log)
+    written, deduped = LOG_BLOBS_WRITTEN.get(), LOG_BLOBS_DEDUPED.get()
+
+    async def store_twice():
+        for _ in range(2):
+            async with AsyncSessionLocal() as db:
+                await store_blob(db, hash_log(log), codec, data, raw_size=len(log.encode("utf-8")))
+                await db.commit()
+
+    asyncio.run(store_twice())
+
+    assert LOG_BLOBS_WRITTEN.get() == written + 1
+    assert LOG_BLOBS_DEDUPED.get() == deduped + 1
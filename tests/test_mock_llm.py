@@ -0,0 +1,80 @@
+"""
+Mock LLM backend (결정적 응답, 지연 프로필, 오류율, cassette) 테스트
+"""
+import random
+
+import httpx
+
+import mock_llm_server
+from app.llm.mock import LatencyProfile, MockLLMClient, MockLLMError, split_tokens
+
+
+PROMPT = "Build log\nmain.c(45): error: code generation failed\nlinking done"
+
+
+async def test_deterministic_analysis_and_token_stream():
+    """같은 프롬프트는 같은 분석, 스트림 토큰을 이어 붙이면 전체 분석"""
+    client = MockLLMClient(latency=LatencyProfile.parse("fixed:0"), tokens_per_second=0)
+
+    first = await client.achain(PROMPT)
+    tokens = [t async for t in client.astream(PROMPT)]
+
+    assert first == await MockLLMClient(latency=LatencyProfile("fixed"), tokens_per_second=0).achain(PROMPT)
+    assert "main.c(45): error: code generation failed" in first
+    assert "".join(tokens) == first and len(tokens) == len(split_tokens(first)) > 10
+
+
+async def test_latency_profiles_and_error_rate_are_seeded(tmp_path):
+    """lognormal 지연과 오류 발생은 seed로 재현 가능, replay는 기록된 지연을 순서대로 반복"""
+    samples = [LatencyProfile.parse("lognormal:1.0,0.5").sample(random.Random(7)) for _ in range(2)]
+    assert samples[0] == samples[1] and samples[0] > 0
+
+    timings = tmp_path / "timings.json"
+    timings.write_text("[0.1, 0.2]")
+    replay = LatencyProfile.parse(f"replay:{timings}")
+    assert [replay.sample(None) for _ in range(3)] == [0.1, 0.2, 0.1]
+
+    results = []
+    for _ in range(2):
+        client = MockLLMClient(latency=LatencyProfile("fixed"), error_rate=0.5, tokens_per_second=0, seed=3)
+        run = []
+        for _ in range(10):
+            try:
+                await client.achain(PROMPT)
+                run.append("ok")
+            except MockLLMError:
+                run.append("error")
+        results.append(run)
+    assert results[0] == results[1]
+    assert {"ok", "error"} == set(results[0])
+
+
+async def test_cassette_record_then_replay_via_webhook(tmp_path, monkeypatch):
+    """record 모드는 실제 provider 응답을 기록하고, replay 모드 webhook은 기록된 응답을 반환"""
+    cassette = str(tmp_path / "llm.jsonl")
+
+    class RealProvider:
+        calls = 0
+
+        async def achain(self, prompt):
+            RealProvider.calls += 1
+            return "실제 LLM 분석 " * 60
+
+    request = {"ci_log": "error: boom", "symptoms": ["error: boom"], "error_type": "build"}
+    recorder = MockLLMClient(
+        latency=LatencyProfile("fixed"), tokens_per_second=0, cassette=cassette,
+        cassette_mode="record", inner=RealProvider()
+    )
+    prompt = mock_llm_server.build_prompt(mock_llm_server.AnalyzeRequest(**request))
+    recorded = await recorder.achain(prompt)
+    await recorder.achain(prompt)
+
+    replayer = MockLLMClient(latency=LatencyProfile.parse("replay:"), tokens_per_second=0, cassette=cassette)
+    monkeypatch.setattr(mock_llm_server, "mock_client", replayer)
+    transport = httpx.ASGITransport(app=mock_llm_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/webhook/llm-analyze", json=request)
+
+    assert RealProvider.calls == 1
+    body = response.json()
+    assert (body["analysis"], body["confidence"]) == (recorded, 0.9)
@@ -0,0 +1,65 @@
+"""
+LLM provider 재시도 예산 / decorrelated jitter / 마감 시간 테스트
+"""
+import random
+
+import pytest
+
+from app.llm import retry
+from app.llm.retry import RetryBudget, call_with_retry, decorrelated_jitter, llm_deadline
+
+
+def _failing(calls, fail_times=100):
+    async def fn():
+        calls.append(1)
+        if len(calls) <= fail_times:
+            raise RuntimeError("upstream 503")
+        return "ok"
+    return fn
+
+
+def test_budget_caps_retries_to_ratio_of_recent_requests():
+    """재시도는 최소 여유분 + 비율 × 최근 요청 수까지만"""
+    budget = RetryBudget(ratio=0.1, window_seconds=60, min_retries=1)
+    for _ in range(20):
+        budget.record_request()
+
+    spent = [budget.try_spend() for _ in range(5)]
+
+    assert spent == [True, True, True, False, False]
+
+
+def test_decorrelated_jitter_bounds():
+    """대기 시간은 [base, min(cap, 이전 × 3)] 범위"""
+    rng = random.Random(7)
+    delay = 0.1
+    for _ in range(50):
+        nxt = decorrelated_jitter(delay, base=0.1, cap=2.0, rng=rng)
+        assert 0.1 <= nxt <= min(2.0, delay * 3)
+        delay = nxt
+
+
+async def test_retry_stops_on_exhausted_budget_or_deadline(monkeypatch):
+    """예산 소진 시 메트릭을 남기고 원래 오류를 올리며, 마감을 넘길 재시도는 하지 않음"""
+    async def no_sleep(_):
+        return None
+
+    monkeypatch.setattr(retry.asyncio, "sleep", no_sleep)
+
+    calls = []
+    result = await call_with_retry(_failing(calls, fail_times=2), name="t-ok", budget=RetryBudget(0, 60, 5), max_attempts=3)
+    assert (result, len(calls)) == ("ok", 3)
+
+    exhausted_before = retry.RETRIES.get(provider="t-budget", decision="budget_exhausted")
+    calls = []
+    with pytest.raises(RuntimeError):
+        await call_with_retry(_failing(calls), name="t-budget", budget=RetryBudget(0, 60, 1), max_attempts=5)
+    assert len(calls) == 2
+    assert retry.RETRIES.get(provider="t-budget", decision="budget_exhausted") == exhausted_before + 1
+
+    calls = []
+    with llm_deadline(0.5):
+        with pytest.raises(RuntimeError):
+            await call_with_retry(_failing(calls), name="t-deadline", budget=RetryBudget(0, 60, 5), base_delay=1, max_delay=1)
+    assert len(calls) == 1
+    assert retry.RETRIES.get(provider="t-deadline", decision="deadline") >= 1
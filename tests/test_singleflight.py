@@ -0,0 +1,65 @@
+"""
+Singleflight 요청 병합 및 결과 재사용 테스트
+"""
+import asyncio
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main_simple import app
+from app.services.analysis_engine import analysis_engine
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """같은 키의 동시 호출은 한 번만 실행"""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["result"] * 5
+    assert sum(1 for _, shared in results if shared) == 4
+
+
+def test_different_keys_run_separately():
+    """다른 키는 각각 실행"""
+    flight = SingleFlight("test")
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, result="a")),
+            flight.do("b", lambda: asyncio.sleep(0, result="b"))
+        )
+
+    assert [r for r, _ in asyncio.run(scenario())] == ["a", "b"]
+
+
+def test_identical_log_reuses_history(monkeypatch):
+    """재사용 기간 내 같은 템플릿 로그는 LLM을 다시 호출하지 않지만 analysis_id는 각자 받음"""
+    calls = []
+
+    async def fake_llm(**kwargs):
+        calls.append(kwargs)
+        return {"analysis": "fake llm analysis " * 10, "confidence": 0.9}
+
+    monkeypatch.setattr(analysis_engine.llm, "call_llm_analysis", fake_llm)
+    # 이전 실행의 이력과 겹치지 않도록 실행마다 다른 도구 이름 사용
+    log = f"Unknown tool {uuid.uuid4().hex}:\nstage 12 error: widget 0xdeadbeef exploded\n"
+
+    with TestClient(app) as client:
+        first = client.post("/analyze", json={"ci_log": log, "repository": "repo-a"}).json()
+        second = client.post("/analyze", json={"ci_log": log.replace("12", "13"), "repository": "repo-b"}).json()
+
+    assert len(calls) == 1
+    assert first["analysis"] == second["analysis"]
+    assert first["analysis_id"] != second["analysis_id"]
+    assert first["approval_token"] != second["approval_token"]
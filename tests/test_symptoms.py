@@ -2,7 +2,7 @@
 증상 추출 테스트
 """
 import pytest
-from app.utils.text import extract_symptoms
+from app.utils.text import SYMPTOM_KEYWORDS, SYMPTOM_PATTERNS, extract_symptoms, symptom_fingerprint
 
 
 def test_extract_symptoms_tasking(sample_ci_log):
@@ -45,3 +45,19 @@ def test_extract_symptoms_no_error():
     
     # fallback으로 마지막 5줄 반환
     assert len(symptoms) > 0
+
+
+def test_symptom_fingerprint_ignores_numbers():
+    """줄 번호/주소만 다른 증상은 같은 지문"""
+    a = symptom_fingerprint("tasking", ["main.c(45): error: code generation failed", "exit code 1"])
+    b = symptom_fingerprint("tasking", ["exit code 2", "main.c(46): error: code generation failed"])
+    c = symptom_fingerprint("nxp", ["main.c(45): error: code generation failed", "exit code 1"])
+    
+    assert a == b
+    assert a != c
+
+
+def test_symptom_patterns_have_keyword():
+    """모든 증상 패턴이 후보 줄 필터 키워드를 포함 (패턴 추가 시 키워드도 추가)"""
+    for pattern in SYMPTOM_PATTERNS:
+        assert any(keyword in pattern for keyword in SYMPTOM_KEYWORDS), pattern
@@ -0,0 +1,53 @@
+"""
+제한 워커 풀 및 메트릭 테스트
+"""
+import asyncio
+import threading
+import pytest
+from app.services.metrics import metrics
+from app.services.worker_pool import BoundedWorkerPool, PoolSaturatedError
+
+
+def test_run_returns_result():
+    """동기 함수 결과 반환"""
+    pool = BoundedWorkerPool(max_workers=2, max_queue=2, name="test-basic")
+    try:
+        assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_rejects():
+    """대기열이 가득 차면 PoolSaturatedError (Retry-After 포함)"""
+    pool = BoundedWorkerPool(max_workers=1, max_queue=1, name="test-saturated")
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 1
+        with pytest.raises(PoolSaturatedError) as exc_info:
+            await pool.run(sum, [1])
+        release.set()
+        await asyncio.gather(*blocked)
+        return exc_info.value
+
+    try:
+        error = asyncio.run(scenario())
+        assert error.retry_after >= 1
+        assert metrics.counter("analysis_pool_rejected_total", "").get(pool="test-saturated") == 1
+    finally:
+        pool.shutdown()
+
+
+def test_wait_time_exported():
+    """대기 시간 히스토그램이 /metrics 출력에 포함"""
+    pool = BoundedWorkerPool(max_workers=1, max_queue=4, name="test-wait")
+    try:
+        asyncio.run(pool.run(sum, [1]))
+    finally:
+        pool.shutdown()
+
+    output = metrics.render()
+    assert 'analysis_pool_wait_seconds_count{pool="test-wait"} 1' in output
+    assert "analysis_pool_queue_depth" in output